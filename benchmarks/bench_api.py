@@ -0,0 +1,178 @@
+"""
+Measure the throughput of the paginated client methods against a local mock server.
+
+Usage:
+    python benchmarks/bench_api.py --books 1000 --latency 0.01
+    python benchmarks/bench_api.py --save baseline.json
+    python benchmarks/bench_api.py --compare baseline.json
+
+Every scenario is run `--repeat` times for the best records per second and
+once more under tracemalloc for the peak memory. With `--compare` the
+results are checked against saved ones and the exit status is 1 when a
+scenario got slower, used more memory or sent more requests than the
+tolerance allows.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from typing import Callable, Iterable
+
+from mock_server import MockReadwise
+
+from readwise.api import Readwise, ReadwiseReader
+from readwise.builders import BulkModelBuilder, CompactModelBuilder, ModelBuilder
+
+BUILDERS = {
+    "validate": ModelBuilder,
+    "bulk": BulkModelBuilder,
+    "compact": CompactModelBuilder,
+}
+
+
+def count_highlights(books: Iterable) -> int:
+    return sum(
+        len(book["highlights"] if isinstance(book, dict) else book.highlights)
+        for book in books
+    )
+
+
+def count(records: Iterable) -> int:
+    return sum(1 for _ in records)
+
+
+def scenarios(client: Readwise, reader: ReadwiseReader, prefetch: int) -> dict:
+    """Return a function counting the records of every scenario."""
+    return {
+        "export": lambda: count_highlights(client.export_highlights(prefetch=prefetch)),
+        "export-raw": lambda: count_highlights(
+            client.export_highlights(raw=True, prefetch=prefetch)
+        ),
+        "export-stream": lambda: count_highlights(
+            client.export_highlights(stream=True)
+        ),
+        "highlights": lambda: count(client.get_highlights(prefetch=prefetch)),
+        "books": lambda: count(client.get_books("books", prefetch=prefetch)),
+        "documents": lambda: count(reader.get_documents(prefetch=prefetch)),
+    }
+
+
+def measure(run: Callable[[], int], server: MockReadwise, repeat: int) -> dict:
+    """Return the records per second, peak memory and requests of a run."""
+    run()  # Warm up the server's page cache and the imports.
+    best = None
+    for _ in range(repeat):
+        server.reset()
+        gc.collect()
+        start = time.perf_counter()
+        records = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    requests = sum(server.requests.values())
+    rate_limited = server.rate_limited
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "records": records,
+        "seconds": best,
+        "records_per_second": records / best,
+        "peak_memory": peak,
+        "requests": requests,
+        "rate_limited": rate_limited,
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a description of every result worse than the baseline."""
+    found = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["records_per_second"] < before["records_per_second"] * (
+            1 - tolerance
+        ):
+            found.append(
+                f"{name}: {result['records_per_second']:,.0f} records/s, "
+                f"was {before['records_per_second']:,.0f}"
+            )
+        if result["peak_memory"] > before["peak_memory"] * (1 + tolerance):
+            found.append(
+                f"{name}: {result['peak_memory'] / 1024 / 1024:,.1f} MiB peak, "
+                f"was {before['peak_memory'] / 1024 / 1024:,.1f}"
+            )
+        if result["requests"] > before["requests"]:
+            found.append(
+                f"{name}: {result['requests']} requests, was {before['requests']}"
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=1_000)
+    parser.add_argument("--per-book", type=int, default=100)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--builder", choices=BUILDERS, default="validate")
+    parser.add_argument("--prefetch", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="Scenarios to run.")
+    parser.add_argument("--save", help="Save the results to this JSON file.")
+    parser.add_argument("--compare", help="Compare with results saved before.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # Do not log every injected 429.
+    logging.basicConfig(level=logging.ERROR)
+
+    server = MockReadwise(
+        books=args.books,
+        highlights_per_book=args.per_book,
+        documents=args.documents,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+    )
+    options = {"rate_limiter": False, "builder": BUILDERS[args.builder]()}
+    with server, Readwise("token", **options) as client, ReadwiseReader(
+        "token", **options
+    ) as reader:
+        # Point the clients at the mock server instead of readwise.io.
+        client._url = f"{server.url}/api/v2"
+        reader._url = f"{server.url}/api/v3"
+
+        results = {}
+        for name, run in scenarios(client, reader, args.prefetch).items():
+            if args.only and name not in args.only:
+                continue
+            result = results[name] = measure(run, server, args.repeat)
+            print(
+                f"{name:>14}: {result['records']} records in "
+                f"{result['seconds']:.2f}s ({result['records_per_second']:,.0f}/s), "
+                f"{result['peak_memory'] / 1024 / 1024:,.1f} MiB peak, "
+                f"{result['requests']} requests "
+                f"({result['rate_limited']} rate limited)"
+            )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for regression in found:
+            print(f"Regression: {regression}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
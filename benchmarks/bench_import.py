@@ -0,0 +1,37 @@
+"""
+Measure the startup time of the package and of the command-line interface.
+
+Usage:
+    python benchmarks/bench_import.py --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "import readwise": [sys.executable, "-c", "import readwise"],
+    "readwise --help": [sys.executable, "-m", "readwise", "--help"],
+    "import Readwise": [sys.executable, "-c", "from readwise import Readwise"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    baseline = [sys.executable, "-c", "pass"]
+    for name, command in {"python": baseline, **COMMANDS}.items():
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        print(f"{name:>16}: {statistics.median(times) * 1000:,.0f} ms median")
+
+
+if __name__ == "__main__":
+    main()
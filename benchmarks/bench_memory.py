@@ -0,0 +1,60 @@
+"""
+Compare the memory held by pydantic and compact models of a synthetic export.
+
+Usage:
+    python benchmarks/bench_memory.py --highlights 500000
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from bench_models import export_page
+
+from readwise.builders import CompactModelBuilder, ModelBuilder
+
+BUILDERS = {
+    "pydantic": ModelBuilder,
+    "compact": CompactModelBuilder,
+}
+
+
+def retained(builder, pages: int, books_per_page: int, per_book: int) -> int:
+    """Return the bytes held by the models of the whole export."""
+    gc.collect()
+    tracemalloc.start()
+    books = []
+    for page in range(pages):
+        # Decode every page from JSON so that no strings are shared between
+        # pages, like records from the API.
+        records = json.loads(
+            json.dumps(export_page(books_per_page, per_book, page * 1_000_000))
+        )
+        books.extend(builder.export_results(records))
+        del records
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--highlights", type=int, default=500_000)
+    parser.add_argument("--per-book", type=int, default=100)
+    parser.add_argument("--books-per-page", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = args.highlights // (args.per_book * args.books_per_page)
+    count = pages * args.books_per_page * args.per_book
+    for name, builder in BUILDERS.items():
+        size = retained(builder(), pages, args.books_per_page, args.per_book)
+        print(
+            f"{name:>10}: {size / 1024 / 1024:,.0f} MiB for {count} highlights "
+            f"({size / count:,.0f} bytes per highlight)"
+        )
+
+
+if __name__ == "__main__":
+    main()
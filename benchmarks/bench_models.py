@@ -0,0 +1,92 @@
+"""
+Compare the model builders on a synthetic export.
+
+Usage:
+    python benchmarks/bench_models.py --highlights 100000
+"""
+
+import argparse
+import time
+
+from readwise.builders import BulkModelBuilder, ModelBuilder
+
+BUILDERS = {
+    "validate": ModelBuilder(),
+    "bulk": BulkModelBuilder(),
+}
+
+
+def export_page(books: int, highlights_per_book: int, first_id: int = 0) -> list:
+    """Return the `results` of a synthetic `/export/` page."""
+    return [
+        {
+            "user_book_id": book_id,
+            "title": f"Book {book_id}",
+            "author": "Author",
+            "readable_title": f"Book {book_id}",
+            "source": "kindle",
+            "cover_image_url": "https://example.com/cover.jpg",
+            "unique_url": None,
+            "category": "books",
+            "document_note": None,
+            "summary": None,
+            "readwise_url": f"https://readwise.io/bookreview/{book_id}",
+            "source_url": None,
+            "asin": None,
+            "book_tags": [{"id": 1, "name": "reading"}],
+            "highlights": [
+                {
+                    "id": first_id + book_id * highlights_per_book + index,
+                    "text": "The quick brown fox jumps over the lazy dog. " * 4,
+                    "location": index,
+                    "location_type": "location",
+                    "note": "",
+                    "color": "yellow",
+                    "highlighted_at": "2024-01-01T12:00:00+00:00",
+                    "created_at": "2024-01-01T12:00:00+00:00",
+                    "updated_at": "2024-01-02T12:00:00+00:00",
+                    "external_id": None,
+                    "end_location": None,
+                    "url": None,
+                    "book_id": book_id,
+                    "tags": [{"id": 2, "name": "favorite"}],
+                    "is_favorite": False,
+                    "is_discard": False,
+                    "readwise_url": "https://readwise.io/open/1",
+                }
+                for index in range(highlights_per_book)
+            ],
+        }
+        for book_id in range(books)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--highlights", type=int, default=100_000)
+    parser.add_argument("--per-book", type=int, default=100)
+    parser.add_argument("--books-per-page", type=int, default=10)
+    args = parser.parse_args()
+
+    books = args.highlights // args.per_book
+    pages = [
+        export_page(min(args.books_per_page, books - start), args.per_book)
+        for start in range(0, books, args.books_per_page)
+    ]
+
+    for name, builder in BUILDERS.items():
+        start = time.perf_counter()
+        count = sum(
+            len(book.highlights)
+            for page in pages
+            for book in builder.export_results(page)
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {count} highlights in {elapsed:.2f}s "
+            f"({count / elapsed:,.0f} highlights/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Serve a local stand-in of the Readwise API with synthetic data.
+
+Usage:
+    python benchmarks/mock_server.py --port 8000 --latency 0.05
+
+Emulates the paginated endpoints used by the benchmarks:
+`/api/v2/export/` and `/api/v3/list/` with cursor pagination,
+`/api/v2/highlights/` and `/api/v2/books/` with page numbers. Every response
+can be delayed, and every n-th request answered with 429 and a
+`Retry-After` header.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TIMESTAMP = "2024-01-01T12:00:00+00:00"
+
+
+class MockReadwise:
+    """
+    A Readwise API server on localhost, running in a background thread.
+
+    Pages are encoded once and then served from memory, so that the server
+    takes as little as possible of the CPU time measured by the benchmarks.
+    """
+
+    def __init__(
+        self,
+        books: int = 1_000,
+        highlights_per_book: int = 100,
+        documents: int = 10_000,
+        export_page_size: int = 100,
+        text_size: int = 200,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.01,
+        port: int = 0,
+    ):
+        """
+        Args:
+            books: Number of books
+            highlights_per_book: Number of highlights of every book
+            documents: Number of Reader documents
+            export_page_size: Number of books per `/export/` page
+            text_size: Number of characters of every highlight text
+            latency: Seconds to wait before answering a request
+            rate_limit_every: Answer every n-th request with 429, 0 never
+            retry_after: `Retry-After` seconds of the 429 responses
+            port: Port to listen on, by default a free one
+        """
+        self.books = books
+        self.highlights_per_book = highlights_per_book
+        self.documents = documents
+        self.export_page_size = export_page_size
+        self.text = ("The quick brown fox jumps over the lazy dog. " * 100)[:text_size]
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests: Counter[str] = Counter()
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._pages: dict[tuple, bytes] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def highlights(self) -> int:
+        """Number of highlights."""
+        return self.books * self.highlights_per_book
+
+    def start(self) -> "MockReadwise":
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockReadwise":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        """Reset the request counters."""
+        with self._lock:
+            self.requests.clear()
+            self.rate_limited = 0
+
+    def _highlight(self, highlight_id: int, book_id: int) -> dict:
+        return {
+            "id": highlight_id,
+            "text": self.text,
+            "note": "",
+            "location": highlight_id % 1000,
+            "location_type": "location",
+            "highlighted_at": TIMESTAMP,
+            "url": None,
+            "color": "yellow",
+            "updated": TIMESTAMP,
+            "book_id": book_id,
+            "tags": [{"id": 2, "name": "favorite"}],
+        }
+
+    def _export_highlight(self, highlight_id: int, book_id: int) -> dict:
+        return {
+            "id": highlight_id,
+            "text": self.text,
+            "location": highlight_id % 1000,
+            "location_type": "location",
+            "note": "",
+            "color": "yellow",
+            "highlighted_at": TIMESTAMP,
+            "created_at": TIMESTAMP,
+            "updated_at": TIMESTAMP,
+            "external_id": None,
+            "end_location": None,
+            "url": None,
+            "book_id": book_id,
+            "tags": [{"id": 2, "name": "favorite"}],
+            "is_favorite": False,
+            "is_discard": False,
+            "readwise_url": f"https://readwise.io/open/{highlight_id}",
+        }
+
+    def _export_book(self, book_id: int) -> dict:
+        first = book_id * self.highlights_per_book
+        return {
+            "user_book_id": book_id,
+            "title": f"Book {book_id}",
+            "author": "Author",
+            "readable_title": f"Book {book_id}",
+            "source": "kindle",
+            "cover_image_url": "https://example.com/cover.jpg",
+            "unique_url": None,
+            "category": "books",
+            "document_note": None,
+            "summary": None,
+            "readwise_url": f"https://readwise.io/bookreview/{book_id}",
+            "source_url": None,
+            "asin": None,
+            "book_tags": [{"id": 1, "name": "reading"}],
+            "highlights": [
+                self._export_highlight(first + index, book_id)
+                for index in range(self.highlights_per_book)
+            ],
+        }
+
+    def _book(self, book_id: int) -> dict:
+        return {
+            "id": book_id,
+            "title": f"Book {book_id}",
+            "author": "Author",
+            "category": "books",
+            "source": "kindle",
+            "num_highlights": self.highlights_per_book,
+            "last_highlight_at": TIMESTAMP,
+            "updated": TIMESTAMP,
+            "cover_image_url": "https://example.com/cover.jpg",
+            "highlights_url": f"https://readwise.io/bookreview/{book_id}",
+            "source_url": "https://example.com",
+            "asin": "",
+            "tags": [{"id": 1, "name": "reading"}],
+            "document_note": "",
+        }
+
+    def _document(self, document_id: int) -> dict:
+        return {
+            "id": f"doc{document_id}",
+            "url": f"https://read.readwise.io/read/doc{document_id}",
+            "source_url": f"https://example.com/{document_id}",
+            "title": f"Document {document_id}",
+            "author": "Author",
+            "source": "web",
+            "category": "article",
+            "location": "new",
+            "tags": {},
+            "site_name": "example.com",
+            "word_count": 1000,
+            "created_at": TIMESTAMP,
+            "updated_at": TIMESTAMP,
+            "notes": "",
+            "published_date": "2024-01-01",
+            "summary": self.text,
+            "image_url": "https://example.com/image.jpg",
+            "reading_progress": 0.0,
+            "parent_id": None,
+        }
+
+    def _cursor_page(self, cursor: str | None, total: int, size: int, record):
+        start = int(cursor or 0)
+        end = min(start + size, total)
+        return {
+            "count": total,
+            "nextPageCursor": str(end) if end < total else None,
+            "results": [record(index) for index in range(start, end)],
+        }
+
+    def _numbered_page(self, path: str, page: int, size: int, total: int, record):
+        start = (page - 1) * size
+        end = min(start + size, total)
+        return {
+            "count": total,
+            "next": f"{path}?page={page + 1}" if end < total else None,
+            "previous": f"{path}?page={page - 1}" if page > 1 else None,
+            "results": [record(index) for index in range(start, end)],
+        }
+
+    def page(self, path: str, query: dict[str, str]) -> bytes | None:
+        """Return the encoded page of an endpoint, or None if unknown."""
+        cursor = query.get("pageCursor")
+        number = int(query.get("page", 1))
+        size = min(int(query.get("page_size", 1000)), 1000)
+        key = (path, cursor, number, size)
+        with self._lock:
+            body = self._pages.get(key)
+        if body is not None:
+            return body
+        per_book = self.highlights_per_book
+        if path == "/api/v2/export/":
+            data = self._cursor_page(
+                cursor, self.books, self.export_page_size, self._export_book
+            )
+        elif path == "/api/v3/list/":
+            data = self._cursor_page(cursor, self.documents, 100, self._document)
+        elif path == "/api/v2/highlights/":
+            data = self._numbered_page(
+                path,
+                number,
+                size,
+                self.highlights,
+                lambda index: self._highlight(index, index // per_book),
+            )
+        elif path == "/api/v2/books/":
+            data = self._numbered_page(path, number, size, self.books, self._book)
+        else:
+            return None
+        body = json.dumps(data).encode()
+        with self._lock:
+            self._pages[key] = body
+        return body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                # The client sends an empty JSON body with every request,
+                # which has to be read to reuse the connection.
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                url = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with server._lock:
+                    server.requests[url.path] += 1
+                    count = sum(server.requests.values())
+                    limited = (
+                        server.rate_limit_every and count % server.rate_limit_every == 0
+                    )
+                    if limited:
+                        server.rate_limited += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if limited:
+                    self._send(429, b"{}", {"Retry-After": str(server.retry_after)})
+                    return
+                body = server.page(url.path, query)
+                if body is None:
+                    self._send(404, b'{"detail": "Not found."}')
+                else:
+                    self._send(200, body)
+
+            def _send(self, status: int, body: bytes, headers: dict = {}):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--books", type=int, default=1_000)
+    parser.add_argument("--per-book", type=int, default=100)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockReadwise(
+        books=args.books,
+        highlights_per_book=args.per_book,
+        documents=args.documents,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        port=args.port,
+    )
+    print(f"Serving the Readwise API on {server.url}")
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,34 @@
-from readwise.api import Readwise, ReadwiseReader
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from readwise.api import Readwise, ReadwiseReader
+    from readwise.async_api import AsyncReadwise, AsyncReadwiseReader
 
 __all__ = [
+    "AsyncReadwise",
+    "AsyncReadwiseReader",
     "Readwise",
     "ReadwiseReader",
 ]
+
+# The clients are imported on first use, so that importing the package, e.g.
+# for the CLI, does not load requests and pydantic.
+_LAZY = {
+    "AsyncReadwise": "readwise.async_api",
+    "AsyncReadwiseReader": "readwise.async_api",
+    "Readwise": "readwise.api",
+    "ReadwiseReader": "readwise.api",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
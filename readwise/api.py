@@ -1,93 +1,741 @@
 import logging
-from datetime import datetime
-from time import sleep
-from typing import Any, Generator, Literal
+import math
+from datetime import datetime, timezone
+from itertools import islice
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable, Generator, Iterable, Literal, Sequence, get_args
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.models import ChunkedEncodingError
 
+from readwise.builders import ModelBuilder, project
+from readwise.cache import CachedResponse, ResponseCache
+from readwise.checkpoint import (
+    CheckpointMismatchError,
+    ExportCheckpoint,
+    JSONCheckpointStore,
+)
+from readwise.concurrency import bounded_map, merge_iterators, read_ahead
+from readwise.hooks import HookList, Hooks, PageEvent, RequestEvent
+from readwise.jsonstream import iter_array
 from readwise.models import (
     DailyReviewHighlight,
     ReadwiseBook,
+    ReadwiseBulkCreateResult,
+    ReadwiseBulkSaveResult,
     ReadwiseDailyReview,
-    ReadwiseExportHighlight,
+    ReadwiseDocumentCreate,
     ReadwiseExportResults,
     ReadwiseHighlight,
+    ReadwiseHighlightBatch,
+    ReadwiseHighlightCreate,
     ReadwiseReaderDocument,
+    ReadwiseSaveResult,
+    ReadwiseSearchResult,
     ReadwiseTag,
 )
+from readwise.ratelimit import LIMITED_BUCKET, RateLimiter
+from readwise.retry import CircuitBreaker, RetryPolicy
+from readwise.store import LocalStore, account_id
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Seconds to wait for a connection and between bytes of a response.
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+BookCategory = Literal["articles", "books", "tweets", "podcasts", "supplementals"]
+BOOK_CATEGORIES = get_args(BookCategory)
+
+
+class ReadwiseRateLimitException(requests.HTTPError):
+    """
+    Raised when the Readwise API rate limit is exceeded. It is an HTTPError
+    carrying the last 429 response, so callers handling request errors
+    handle it too.
+    """
+
+
+def _next_cursor(data: dict | list, cursor: str | None) -> str | None:
+    """
+    Return the cursor of the next page of a cursor paginated response, or
+    None when this was the last page.
+    """
+    if isinstance(data, list):
+        return None
+    next_cursor = data.get("nextPageCursor")
+    if not next_cursor or next_cursor == cursor:
+        return None
+    return next_cursor
+
+
+def _metered(chunks: Iterable[bytes], meter: list) -> Generator[bytes, None, None]:
+    """
+    Pass chunks of a download through, adding their size and the time spent
+    waiting for them to `meter`, a `[bytes, seconds]` list.
+    """
+    chunks = iter(chunks)
+    while True:
+        started = perf_counter()
+        chunk = next(chunks, None)
+        meter[1] += perf_counter() - started
+        if chunk is None:
+            return
+        meter[0] += len(chunk)
+        yield chunk
+
+
+def _has_next_page(data: dict | list) -> bool:
+    """Return whether a page number paginated response has a next page."""
+    return not isinstance(data, list) and bool(data.get("next"))
+
+
+def _first_query(
+    params: dict, page_size: int, page_cursor: str | None, cursor: bool
+) -> dict:
+    """
+    Return the query parameters of the first page of a paginated endpoint.
+
+    Args:
+        params: Query parameters of the request
+        page_size: Number of items per page of a page number paginated
+            endpoint
+        page_cursor: Cursor of the page to start at of a cursor paginated
+            endpoint
+        cursor: Whether the endpoint is cursor paginated
+    """
+    if cursor:
+        return {**params, "pageCursor": page_cursor} if page_cursor else dict(params)
+    return {"page": 1, "page_size": page_size, **params}
+
+
+def _next_query(query: dict, data: dict | list) -> dict | None:
+    """
+    Return the query parameters of the page after the page of `query`, or
+    None when that was the last page. Shared by the sync and async clients.
+    """
+    if "page" in query:
+        if not _has_next_page(data):
+            return None
+        return {**query, "page": query["page"] + 1}
+    next_cursor = _next_cursor(data, query.get("pageCursor"))
+    return {**query, "pageCursor": next_cursor} if next_cursor else None
+
+
+def _page_count(data: dict, page_size: int) -> int:
+    """
+    Return the number of pages of a page number paginated endpoint from the
+    `count` reported on its first page.
+    """
+    per_page = len(data.get("results", [])) or page_size
+    return math.ceil(data["count"] / per_page)
+
+
+def _export_params(updated_after: str | None, ids: list[str] | None) -> dict:
+    """Build the query parameters for the `/export/` endpoint."""
+    params = {}
+    if updated_after:
+        params["updatedAfter"] = updated_after
+    if ids:
+        params["ids"] = ",".join(_id for _id in ids)
+    return params
+
+
+def _highlights_params(
+    book_ids: list[str] | None,
+    updated_after: datetime | None,
+    updated_before: datetime | None,
+    highlighted_at_after: datetime | None,
+    highlighted_at_before: datetime | None,
+) -> dict:
+    """Build the query parameters for the `/highlights/` endpoint."""
+    params = {}
+    if book_ids:
+        params["book_id"] = ", ".join(book_ids)
+    if updated_after:
+        params["updated__lt"] = updated_after.isoformat()
+    if updated_before:
+        params["updated__gt"] = updated_before.isoformat()
+    if highlighted_at_after:
+        params["highlighted_at__lt"] = highlighted_at_after.isoformat()
+    if highlighted_at_before:
+        params["highlighted_at__gt"] = highlighted_at_before.isoformat()
+    return params
+
+
+def _highlight_payload(
+    text: str,
+    title: str,
+    author: str | None,
+    highlighted_at: datetime | None,
+    source_url: str | None,
+    category: str,
+    note: str | None,
+) -> dict:
+    """Build the request body for a single highlight."""
+    payload = {"text": text, "title": title, "category": category}
+    if author:
+        payload["author"] = author
+    if highlighted_at:
+        payload["highlighted_at"] = highlighted_at.isoformat()
+    if source_url:
+        payload["source_url"] = source_url
+    if note:
+        payload["note"] = note
+    return payload
+
+
+def _highlight_create_payload(highlight: ReadwiseHighlightCreate | dict) -> dict:
+    """Build the request body for a highlight of a bulk creation."""
+    if isinstance(highlight, dict):
+        highlight = ReadwiseHighlightCreate.model_validate(highlight)
+    return highlight.model_dump(mode="json", exclude_none=True)
+
+
+def _document_payload(
+    url: str,
+    html: str | None,
+    should_clean_html: bool | None,
+    title: str | None,
+    author: str | None,
+    summary: str | None,
+    published_at: datetime | None,
+    image_url: str | None,
+    location: str,
+    saved_using: str | None,
+    tags: list[str],
+) -> dict[str, Any]:
+    """Build the request body for saving a Reader document."""
+    data: dict[str, Any] = {
+        "url": url,
+        "tags": tags,
+        "location": location,
+    }
+
+    if html:
+        data["html"] = html
+
+    if should_clean_html is not None:
+        data["should_clean_html"] = should_clean_html
+
+    if title:
+        data["title"] = title
+
+    if author:
+        data["author"] = author
+
+    if summary:
+        data["summary"] = summary
+
+    if published_at:
+        data["published_at"] = published_at.isoformat()
+
+    if image_url:
+        data["image_url"] = image_url
+
+    if saved_using:
+        data["saved_using"] = saved_using
+
+    return data
+
+
+def _document_create(
+    document: ReadwiseDocumentCreate | dict | str,
+) -> ReadwiseDocumentCreate:
+    """Build a ReadwiseDocumentCreate object from a URL or a dict."""
+    if isinstance(document, str):
+        return ReadwiseDocumentCreate(url=document)
+    if isinstance(document, dict):
+        return ReadwiseDocumentCreate.model_validate(document)
+    return document
+
+
+class _BaseClient:
+    """Connection handling shared by the Readwise API clients."""
 
-
-class ReadwiseRateLimitException(Exception):
-    """Raised when the Readwise API rate limit is exceeded."""
-
-    pass
-
-
-class Readwise:
     def __init__(
         self,
         token: str,
+        adapter: HTTPAdapter | None = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        builder: ModelBuilder | None = None,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        hooks: Hooks | Sequence[Hooks] | None = None,
     ):
-        """
-        Initialize a Readwise API client.
-
-        Documentation for the Readwise API can be found here:
-        https://readwise.io/api_deets
-
-        Args:
-            token: Readwise API token
-        """
         self._token = token
-        self._url = "https://readwise.io/api/v2"
+        self._account = account_id(token)
+        self._timeout = timeout
+        if isinstance(hooks, Hooks):
+            hooks = [hooks]
+        self._hooks = HookList(hooks) if hooks else None
+        self._builder = builder or ModelBuilder()
+        self._retry_policy = retry or RetryPolicy()
+        self._circuit_breaker = circuit_breaker
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._owns_adapter = adapter is None
+        self._adapter = adapter or HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session = self._create_session(keep_alive)
 
-    @property
-    def _session(self) -> requests.Session:
+    def _create_session(self, keep_alive: bool) -> requests.Session:
         """
-        Return a requests.Session object with the Readwise API token set as an
-        Authorization header.
+        Return a requests.Session object with the API token set as an
+        Authorization header and the connection pool mounted.
+
+        The session lives as long as the client, so connections are reused
+        between requests.
         """
         session = requests.Session()
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
         session.headers.update(
             {
                 "Accept": "application/json",
                 "Authorization": f"Token {self._token}",
             }
         )
+        if not keep_alive:
+            session.headers["Connection"] = "close"
         return session
 
     def _request(
-        self, method: str, endpoint: str, params: dict = {}, data: dict = {}
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = {},
+        data: dict = {},
+        rate_limit: str | None = None,
+        stream: bool = False,
+        idempotent: bool | None = None,
     ) -> requests.Response:
         """
-        Make a request to the Readwise API.
-
-        The Readwise API has a rate limit of 240 requests per minute. This
-        method will raise a ReadwiseRateLimitException if the rate limit is
-        exceeded.
+        Make a request to the API.
 
-        The Exception will be raised after 8 retries with exponential backoff.
+        Requests are paced by the client's rate limiter. Failed attempts are
+        retried as decided by the client's retry policy. When the server
+        answers with 429 the limiter is paused for the `Retry-After` period
+        before the retry.
 
         Args:
             method: HTTP method
             endpoint: API endpoint
             params: Query parameters
             data: Request body
+            rate_limit: Name of the rate limit bucket to use instead of the
+                one matching the endpoint
+            stream: Return before the body is downloaded, bypassing the
+                response cache
+            idempotent: Whether the request may be repeated after a server
+                error, by default whether the method is idempotent
 
         Returns:
             requests.Response
+
+        Raises:
+            ReadwiseRateLimitException: If the server still answers with 429
+                when the retry policy gives up
+            CircuitOpenError: If the circuit breaker is open
+        """
+        steps = self._request_steps(
+            method, endpoint, params, data, rate_limit, stream, idempotent
+        )
+        try:
+            step = next(steps)
+            while True:
+                if not isinstance(step, dict):
+                    sleep(step)
+                    step = steps.send(None)
+                    continue
+                try:
+                    response = self._session.request(**step)
+                except requests.RequestException as error:
+                    step = steps.throw(error)
+                else:
+                    step = steps.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    def _request_steps(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict,
+        data: dict,
+        rate_limit: str | None,
+        stream: bool,
+        idempotent: bool | None,
+    ) -> Generator[dict | float, requests.Response | None, requests.Response]:
+        """
+        Decide the steps of a request, shared by the sync and async clients,
+        which only do the I/O.
+
+        Yields:
+            The keyword arguments of `requests.Session.request` for every
+            attempt, to be answered with the response or thrown the
+            requests exception, or a number of seconds to sleep
+        Returns:
+            The response
         """
         url = self._url + endpoint
         logging.debug(f'Calling "{method}" on "{url}" with params: {params}')
-        response = self._session.request(method, url, params=params, json=data)
-        while response.status_code == 429:
-            seconds = int(response.headers["Retry-After"])
-            logging.warning(f"Rate limited by Readwise, retrying in {seconds} seconds")
-            sleep(seconds)
-            response = self._session.request(method, url, params=params, data=data)
+        entry, options = None, {"stream": True}
+        if not stream:
+            entry, options = self._cache_lookup(method, url, params)
+            if entry is not None and entry.fresh:
+                return entry.to_response()
+        hooks = self._hooks
+        started = monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self._circuit_breaker:
+                self._circuit_breaker.before_request()
+            bucket = None
+            if self._rate_limiter:
+                bucket = self._rate_limiter.bucket(method, endpoint, rate_limit)
+                waited = bucket.reserve()
+                if waited > 0:
+                    yield waited
+                    logging.debug(f"Waited {waited:.2f} seconds for rate limit")
+                    if hooks:
+                        hooks.throttled(endpoint, waited, "rate_limit")
+            if hooks:
+                event = RequestEvent(method, endpoint, attempt, perf_counter())
+                hooks.request_started(event)
+            try:
+                response = yield {
+                    "method": method,
+                    "url": url,
+                    "params": params,
+                    "json": data,
+                    "timeout": self._timeout,
+                    **options,
+                }
+            except requests.RequestException as error:
+                self._record_outcome(error=error)
+                if hooks:
+                    hooks.request_finished(event.finish(error=error))
+                delay = self._retry_policy.next_delay(
+                    method, attempt, started, error=error, idempotent=idempotent
+                )
+                if delay is None:
+                    raise
+                logging.warning(
+                    f'Error calling "{method}" on "{url}": {error}, '
+                    f"retrying in {delay:.1f} seconds"
+                )
+                if hooks:
+                    hooks.retry(event, delay)
+                yield delay
+                continue
+            self._record_outcome(response=response)
+            if hooks:
+                hooks.request_finished(event.finish(response, streamed=stream))
+            if bucket is not None:
+                self._rate_limiter.update(
+                    method,
+                    endpoint,
+                    response.status_code,
+                    response.headers,
+                    rate_limit,
+                )
+            if response.status_code < 400:
+                break
+            delay = self._retry_policy.next_delay(
+                method, attempt, started, response=response, idempotent=idempotent
+            )
+            if delay is None:
+                if response.status_code == 429:
+                    raise ReadwiseRateLimitException(
+                        f'Rate limited by Readwise on "{method}" "{url}" '
+                        f"after {attempt} attempts",
+                        response=response,
+                    )
+                break
+            if response.status_code == 429:
+                logging.warning(
+                    f"Rate limited by Readwise, retrying in {delay:.0f} seconds"
+                )
+            else:
+                logging.warning(
+                    f'Error {response.status_code} calling "{method}" on "{url}", '
+                    f"retrying in {delay:.1f} seconds"
+                )
+            if hooks:
+                hooks.retry(event, delay)
+            if stream:
+                response.close()
+            # After a 429 the rate limiter bucket was paused for the
+            # Retry-After period and waits before the next attempt.
+            if bucket is None or response.status_code != 429:
+                if hooks and response.status_code == 429:
+                    hooks.throttled(endpoint, delay, "retry_after")
+                yield delay
+        if not stream:
+            response = self._cache_update(method, url, params, response, entry)
         response.raise_for_status()
         return response
 
+    def _record_outcome(
+        self,
+        response: requests.Response | None = None,
+        error: Exception | None = None,
+    ):
+        """
+        Report the outcome of a request to the circuit breaker. Server errors,
+        timeouts and connection errors count as failures, all other responses
+        as successes.
+        """
+        if not self._circuit_breaker:
+            return
+        if response is not None and response.status_code < 500:
+            self._circuit_breaker.record_success()
+        else:
+            self._circuit_breaker.record_failure()
+
+    def _paginate(
+        self,
+        get_method: Literal["get", "get_with_limit_20"],
+        endpoint: str,
+        params: dict = {},
+        page_size: int = 1000,
+        max_workers: int = 1,
+        ordered: bool = True,
+        page_cursor: str | None = None,
+        cursor: bool = False,
+    ) -> Generator[dict, None, None]:
+        """
+        Get the pages of a paginated endpoint.
+
+        Page number paginated endpoints report the total `count` on the first
+        page. With `max_workers` above 1 the remaining pages are then fetched
+        concurrently, still paced by the rate limiter.
+
+        Args:
+            get_method: Method to use for making requests
+            endpoint: API endpoint
+            params: Query parameters
+            page_size: Number of items per page
+            max_workers: Number of pages to fetch concurrently
+            ordered: Yield concurrently fetched pages in page order instead
+                of as they complete
+            page_cursor: Cursor of the page to start at for cursor paginated
+                endpoints
+            cursor: Whether the endpoint is cursor paginated
+        Yields:
+            dict: Response data
+        """
+        get = getattr(self, get_method)
+
+        def get_page(query: dict) -> dict:
+            return self._page_data(endpoint, get(endpoint, params=query))
+
+        query = _first_query(params, page_size, page_cursor, cursor)
+        while query is not None:
+            data = get_page(query)
+            yield data
+            if (
+                max_workers > 1
+                and query.get("page") == 1
+                and _has_next_page(data)
+                and "count" in data
+            ):
+                queries = [
+                    {**query, "page": page}
+                    for page in range(2, _page_count(data, page_size) + 1)
+                ]
+                for _, data in bounded_map(get_page, queries, max_workers, ordered):
+                    yield data
+                return
+            query = _next_query(query, data)
+
+    def _page_data(self, endpoint: str, response: requests.Response) -> dict | list:
+        """
+        Decode a page of a paginated endpoint, reporting it to the hooks.
+        """
+        if not self._hooks:
+            return response.json()
+        started = perf_counter()
+        data = response.json()
+        records = data.get("results", ()) if isinstance(data, dict) else data
+        self._hooks.page_received(
+            PageEvent(
+                endpoint, len(records), len(response.content), perf_counter() - started
+            )
+        )
+        return data
+
+    def _build(
+        self,
+        kind: Literal["export_results", "highlights", "books", "documents"],
+        records: list[dict],
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+    ) -> list:
+        """
+        Build the models of a page with the client's builder, or project the
+        records with `raw` or `fields`.
+        """
+        if raw or fields:
+            return project(records, fields)
+        if not self._hooks:
+            return getattr(self._builder, kind)(records)
+        started = perf_counter()
+        built = getattr(self._builder, kind)(records)
+        self._hooks.records_built(kind, len(built), perf_counter() - started)
+        return built
+
+    def _cache_lookup(
+        self, method: str, url: str, params: dict
+    ) -> tuple[CachedResponse | None, dict]:
+        """
+        Look up a GET request in the response cache.
+
+        Returns:
+            The cached response, fresh or not, and the keyword arguments
+            that make the request conditional when it is not fresh
+        """
+        if self._cache is None or method != "GET":
+            return None, {}
+        entry = self._cache.lookup(url, params, self._account)
+        if entry is None:
+            return None, {}
+        if entry.fresh:
+            logging.debug(f'Serving "{url}" from cache')
+            return entry, {}
+        return entry, {"headers": entry.validators} if entry.validators else {}
+
+    def _cache_update(
+        self,
+        method: str,
+        url: str,
+        params: dict,
+        response: requests.Response,
+        entry: CachedResponse | None,
+    ) -> requests.Response:
+        """
+        Update the response cache with a response.
+
+        Args:
+            entry: The cached response found before the request, which a
+                304 Not Modified is answered from even if it was evicted
+                from the cache in the meantime
+        Returns:
+            The response, or the cached response when the server answered a
+            conditional request with 304 Not Modified
+        """
+        if self._cache is None:
+            return response
+        if method != "GET":
+            if response.ok:
+                self._cache.invalidate(url, self._account)
+            return response
+        if response.status_code == 304 and entry is not None:
+            logging.debug(f'"{url}" not modified, serving from cache')
+            self._cache.revalidated(url, params, entry, self._account)
+            return entry.to_response()
+        self._cache.store(url, params, response, self._account)
+        return response
+
+    def close(self):
+        """
+        Close the session and release its pooled connections.
+
+        An adapter passed in by the caller is shared with other clients and
+        is left open.
+        """
+        if not self._owns_adapter:
+            self._session.adapters.clear()
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Readwise(_BaseClient):
+    def __init__(
+        self,
+        token: str,
+        adapter: HTTPAdapter | None = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | Literal[False] | None = None,
+        cache: ResponseCache | None = None,
+        builder: ModelBuilder | None = None,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        hooks: Hooks | Sequence[Hooks] | None = None,
+    ):
+        """
+        Initialize a Readwise API client.
+
+        Documentation for the Readwise API can be found here:
+        https://readwise.io/api_deets
+
+        The client keeps a single session open for its whole lifetime. Call
+        `close()` or use the client as a context manager to release it.
+
+        Args:
+            token: Readwise API token
+            adapter: A requests HTTPAdapter to share a connection pool
+                between several clients
+            pool_connections: Number of connection pools to cache
+            pool_maxsize: Maximum number of connections kept per pool
+            pool_block: Whether to block when no free connection is available
+            keep_alive: Whether to reuse connections between requests
+            rate_limiter: Rate limiter pacing the requests, pass the same
+                limiter to several clients to share one budget or `False`
+                to disable client side rate limiting
+            cache: Response cache for GET requests, disabled by default
+            builder: Builds the models from the API records, e.g. a
+                BulkModelBuilder to validate whole pages at once
+            retry: Policy for retrying failed requests, by default up to 8
+                attempts with exponential backoff and jitter
+            circuit_breaker: Circuit breaker failing requests fast while the
+                API is down, disabled by default. Pass the same breaker to
+                several clients to share it.
+            timeout: Seconds to wait for a connection and for the server to
+                send data, as one number for both or a `(connect, read)`
+                tuple. None waits forever.
+            hooks: Hooks receiving the events of the HTTP layer, e.g. a
+                StatsCollector, or a list of them
+        """
+        super().__init__(
+            token,
+            adapter=adapter,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            rate_limiter=RateLimiter.for_readwise()
+            if rate_limiter is None
+            else rate_limiter or None,
+            cache=cache,
+            builder=builder,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+            hooks=hooks,
+        )
+        self._url = "https://readwise.io/api/v2"
+
     def get(self, endpoint: str, params: dict = {}) -> requests.Response:
         """
         Make a GET request to the Readwise API.
@@ -119,7 +767,8 @@ class Readwise:
         Returns:
             requests.Response
         """
-        return self.get(endpoint, params)
+        logging.debug(f'Getting "{endpoint}" with params: {params}')
+        return self._request("GET", endpoint, params=params, rate_limit=LIMITED_BUCKET)
 
     def post(self, endpoint: str, data: dict = {}) -> requests.Response:
         """
@@ -158,7 +807,7 @@ class Readwise:
         return self._request("DELETE", endpoint)
 
     def get_pagination(
-        self, endpoint: str, params: dict = {}
+        self, endpoint: str, params: dict = {}, prefetch: int = 0
     ) -> Generator[dict, None, None]:
         """
         Get a response from the Readwise API with pagination.
@@ -166,13 +815,23 @@ class Readwise:
         Args:
             endpoint: API endpoint
             params: Query parameters
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
         Yields:
             Response data
         """
-        yield from self._get_pagination("get", endpoint, params)
+        pages = self._get_pagination("get", endpoint, params)
+        yield from read_ahead(pages, prefetch) if prefetch else pages
 
     def get_pagination_limit_20(
-        self, endpoint: str, params: dict = {}, page_size: int = 1000
+        self,
+        endpoint: str,
+        params: dict = {},
+        page_size: int = 1000,
+        max_workers: int = 1,
+        ordered: bool = True,
+        page_cursor: str | None = None,
+        prefetch: int = 0,
     ) -> Generator[dict, None, None]:
         """
         Get a response from the Readwise API with pagination and a rate limit
@@ -182,12 +841,26 @@ class Readwise:
             endpoint: API endpoint
             params: Query parameters
             page_size: Number of items per page
+            max_workers: Number of pages to fetch concurrently
+            ordered: Yield concurrently fetched pages in page order instead
+                of as they complete
+            page_cursor: Cursor of the page to start at for cursor paginated
+                endpoints
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
         Yields:
             Response data
         """
-        yield from self._get_pagination(
-            "get_with_limit_20", endpoint, params, page_size
+        pages = self._get_pagination(
+            "get_with_limit_20",
+            endpoint,
+            params,
+            page_size,
+            max_workers,
+            ordered,
+            page_cursor,
         )
+        yield from read_ahead(pages, prefetch) if prefetch else pages
 
     def _get_pagination(
         self,
@@ -195,50 +868,117 @@ class Readwise:
         endpoint: str,
         params: dict = {},
         page_size: int = 1000,
+        max_workers: int = 1,
+        ordered: bool = True,
+        page_cursor: str | None = None,
     ) -> Generator[dict, None, None]:
         """
-        Get a response from the Readwise API with pagination.
+        Get the pages of a Readwise API endpoint, see `_paginate`. The
+        `/export/` endpoint is cursor paginated, the others by page number.
+        """
+        return self._paginate(
+            get_method,
+            endpoint,
+            params,
+            page_size,
+            max_workers,
+            ordered,
+            page_cursor,
+            cursor=endpoint == "/export/",
+        )
+
+    def _get_streamed_pagination(
+        self,
+        endpoint: str,
+        params: dict = {},
+        page_cursor: str | None = None,
+        on_page: Callable[[dict], None] | None = None,
+        deadline: float | None = None,
+    ) -> Generator[dict, None, None]:
+        """
+        Get the results of a cursor paginated endpoint one at a time, parsing
+        every page while it downloads instead of loading it at once.
 
         Args:
-            get_method: Method to use for making requests
             endpoint: API endpoint
             params: Query parameters
-            page_size: Number of items per page
+            page_cursor: Cursor of the page to start at
+            on_page: Called with the page data, without its results, once all
+                results of a page have been consumed
+            deadline: `time.monotonic()` after which no further page is
+                started
         Yields:
-            dict: Response data
+            The results of every page
         """
-        if endpoint == "/export/":
-            pageCursor = None
+        params = dict(params)
+        while True:
+            if page_cursor:
+                params["pageCursor"] = page_cursor
+            logging.debug(f'Streaming page with cursor "{page_cursor}"')
+            # Results already yielded before a broken download are skipped
+            # when the page is requested again.
+            yielded = 0
+            started = monotonic()
+            attempt = 0
             while True:
-                if pageCursor:
-                    params.update({"pageCursor": pageCursor})
-                logging.debug(f'Getting page with cursor "{pageCursor}"')
+                attempt += 1
+                response = self._request(
+                    "GET",
+                    endpoint,
+                    params=params,
+                    rate_limit=LIMITED_BUCKET,
+                    stream=True,
+                )
                 try:
-                    response = getattr(self, get_method)(endpoint, params=params)
-                except ChunkedEncodingError:
-                    logging.error(f'Error getting page with cursor "{pageCursor}"')
-                    sleep(5)
+                    chunks = response.iter_content(STREAM_CHUNK_SIZE)
+                    # Time spent in the parser minus the time spent waiting
+                    # for chunks is the parse time of the page.
+                    meter = [0, 0.0]
+                    parsing = 0.0
+                    if self._hooks:
+                        chunks = _metered(chunks, meter)
+                    results = iter_array(chunks)
+                    index = 0
+                    while True:
+                        parse_started = perf_counter()
+                        try:
+                            result = next(results)
+                        except StopIteration as stop:
+                            parsing += perf_counter() - parse_started
+                            data = stop.value
+                            break
+                        parsing += perf_counter() - parse_started
+                        if index >= yielded:
+                            yield result
+                            yielded += 1
+                        index += 1
+                except (ChunkedEncodingError, requests.ConnectionError) as error:
+                    # A read timeout while streaming is a ConnectionError.
+                    delay = self._retry_policy.next_delay(
+                        "GET", attempt, started, error=error
+                    )
+                    if delay is None:
+                        raise
+                    logging.error(
+                        f'Error streaming page with cursor "{page_cursor}", '
+                        f"retrying in {delay:.1f} seconds"
+                    )
+                    sleep(delay)
                     continue
-                data = response.json()
-                yield data
-                if (
-                    isinstance(data, list)
-                    or not data.get("nextPageCursor")
-                    or data.get("nextPageCursor") == pageCursor
-                ):
-                    break
-                pageCursor = data.get("nextPageCursor")
-        else:
-            page = 1
-            while True:
-                response = getattr(self, get_method)(
-                    endpoint, params={"page": page, "page_size": page_size, **params}
+                finally:
+                    response.close()
+                break
+            if self._hooks:
+                self._hooks.page_received(
+                    PageEvent(endpoint, index, meter[0], parsing - meter[1], True)
                 )
-                data = response.json()
-                yield data
-                if isinstance(data, list) or not data.get("next"):
-                    break
-                page += 1
+            if on_page is not None:
+                on_page(data)
+            page_cursor = _next_cursor(data, page_cursor)
+            if not page_cursor:
+                break
+            if deadline is not None and monotonic() >= deadline:
+                break
 
     def get_daily_review(self) -> ReadwiseDailyReview:
         """Get Readwise Daily Review.
@@ -261,47 +1001,133 @@ class Readwise:
             yield DailyReviewHighlight(**highlight)
 
     def export_highlights(
-        self, updated_after: str = None, ids: list[str] = None
-    ) -> Generator[ReadwiseExportResults, None, None]:
+        self,
+        updated_after: str = None,
+        ids: list[str] = None,
+        checkpoint: JSONCheckpointStore | None = None,
+        resume: bool = False,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        stream: bool = False,
+        prefetch: int = 0,
+        deadline: float | None = None,
+        page_cursor: str | None = None,
+    ) -> Generator[ReadwiseExportResults | dict, None, str | None]:
         """
         Export all highlights from Readwise.
 
+        With a checkpoint store the cursor of the next page is saved once all
+        books of a page have been consumed. An interrupted export can then be
+        continued with `resume=True`; it restarts at the first page that was
+        not completed, with the parameters of the interrupted export. When an
+        export completes, the time it started is saved as the `updated_after`
+        watermark for the next incremental export.
+
+        With `stream=True` every page is parsed while it downloads and each
+        book is yielded as soon as it is complete, so memory use is bounded by
+        the largest book instead of the largest page.
+
+        With `prefetch` the next pages are fetched in a background thread
+        while the books of the current page are consumed. A page counts as
+        completed for the checkpoint only once its books have been consumed.
+
+        With a `deadline` the export stops cleanly once the page being
+        consumed when the deadline passes is complete, and returns the cursor
+        of the next page. Pass it as `page_cursor`, or use `resume=True` with
+        a checkpoint store, to continue the export later.
+
         Args:
             updated_after: date highlight was last updated
             ids: A list of book ids
+            checkpoint: Store to save the export progress in
+            resume: Continue the export saved in the checkpoint store
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            stream: Parse the pages incrementally while they download
+            prefetch: Number of pages fetched ahead in a background thread;
+                ignored with `stream`, which already overlaps the download
+                with parsing
+            deadline: Seconds after which no further page is started
+            page_cursor: Cursor of the page to start at
         Yields:
-            A generator of ReadwiseExportResults objects
-        """
-        params = {}
-        if updated_after:
-            params["updatedAfter"] = updated_after
-        if ids:
-            params["ids"] = ",".join(_id for _id in ids)
-        for data in self.get_pagination_limit_20("/export/", params):
-            for book in data["results"]:
-                book_tags = [ReadwiseTag(**book_tag) for book_tag in book["book_tags"]]
-
-                highlights = [
-                    ReadwiseExportHighlight(
-                        tags=[ReadwiseTag(**tag) for tag in highlight["tags"]],
-                        **{
-                            key: value
-                            for key, value in highlight.items()
-                            if key != "tags"
-                        },
+            A generator of ReadwiseExportResults objects, or dicts with `raw`
+        Returns:
+            The cursor of the next page if the export stopped at the
+            deadline, None when it completed
+        Raises:
+            CheckpointMismatchError: If the export to resume was saved for
+                another account or with other `updated_after` or `ids`
+        """
+        deadline_at = monotonic() + deadline if deadline is not None else None
+        params = _export_params(updated_after, ids)
+        state = None
+        if checkpoint is not None:
+            state = checkpoint.load()
+            own = state is not None and state.account in (None, self._account)
+            if resume and state and not state.completed and state.page_cursor:
+                if not own:
+                    raise CheckpointMismatchError(
+                        f"The export in {checkpoint.path} belongs to another account"
                     )
-                    for highlight in book["highlights"]
-                ]
-
-                yield ReadwiseExportResults(
-                    **{
-                        key: value
-                        for key, value in book.items()
-                        if key not in ["book_tags", "highlights"]
-                    },
-                    book_tags=book_tags,
-                    highlights=highlights,
+                if params and params != state.params:
+                    raise CheckpointMismatchError(
+                        f"The export in {checkpoint.path} was started with "
+                        f"the parameters {state.params}, not {params}"
+                    )
+                logging.info(f'Resuming export at cursor "{state.page_cursor}"')
+                params = state.params
+            else:
+                state = ExportCheckpoint(
+                    account=self._account,
+                    params=params,
+                    started_at=datetime.now(timezone.utc),
+                    updated_after=state.updated_after if own else None,
                 )
+                checkpoint.save(state)
+
+        def save_cursor(data: dict):
+            nonlocal page_cursor
+            page_cursor = _next_cursor(data, page_cursor)
+            if state is not None:
+                state.page_cursor = data.get("nextPageCursor")
+                checkpoint.save(state)
+
+        def build(records: list[dict]) -> list[ReadwiseExportResults | dict]:
+            return self._build("export_results", records, raw, fields)
+
+        if state is not None and state.page_cursor:
+            page_cursor = state.page_cursor
+        if stream:
+            for book in self._get_streamed_pagination(
+                "/export/",
+                params,
+                page_cursor=page_cursor,
+                on_page=save_cursor,
+                deadline=deadline_at,
+            ):
+                yield build([book])[0]
+        else:
+            pages = self.get_pagination_limit_20(
+                "/export/", params, page_cursor=page_cursor, prefetch=prefetch
+            )
+            for data in pages:
+                for book in build(data["results"]):
+                    yield book
+                save_cursor(data)
+                if deadline_at is not None and monotonic() >= deadline_at:
+                    break
+            pages.close()
+
+        if page_cursor:
+            logging.info(
+                f'Export stopped at the deadline before cursor "{page_cursor}"'
+            )
+            return page_cursor
+        if state is not None:
+            state.page_cursor = None
+            state.completed = True
+            state.updated_after = state.started_at.isoformat()
+            checkpoint.save(state)
 
     def get_highlights(
         self,
@@ -310,7 +1136,11 @@ class Readwise:
         updated_before: datetime = None,
         highlighted_at_after: datetime = None,
         highlighted_at_before: datetime = None,
-    ) -> Generator[ReadwiseHighlight, None, None]:
+        max_workers: int = 1,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> Generator[ReadwiseHighlight | dict, None, None]:
         """
         Get all Readwise highlights.
 
@@ -320,122 +1150,160 @@ class Readwise:
             updated_before: Date and time the highlight was last updated
             highlighted_after: Date and time the highlight was created
             highlighted_before: Date and time the highlight was created
+            max_workers: Number of pages to fetch concurrently
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
 
         Returns:
-            A generator of ReadwiseHighlight objects
-        """
-        params = {}
-        if book_ids:
-            params["book_id"] = ", ".join(book_ids)
-        if updated_after:
-            params["updated__lt"] = updated_after.isoformat()
-        if updated_before:
-            params["updated__gt"] = updated_before.isoformat()
-        if highlighted_at_after:
-            params["highlighted_at__lt"] = highlighted_at_after.isoformat()
-        if highlighted_at_before:
-            params["highlighted_at__gt"] = highlighted_at_before.isoformat()
-
-        for data in self.get_pagination_limit_20("/highlights/", params):
-            for highlight in data["results"]:
-                yield ReadwiseHighlight(
-                    id=highlight["id"],
-                    text=highlight["text"],
-                    note=highlight["note"],
-                    location=highlight["location"],
-                    location_type=highlight["location_type"],
-                    highlighted_at=datetime.fromisoformat(highlight["highlighted_at"])
-                    if highlight["highlighted_at"]
-                    else None,
-                    url=highlight["url"],
-                    color=highlight["color"],
-                    updated=datetime.fromisoformat(highlight["updated"])
-                    if highlight["updated"]
-                    else None,
-                    book_id=highlight["book_id"],
-                    tags=[
-                        ReadwiseTag(id=tag["id"], name=tag["name"])
-                        for tag in highlight["tags"]
-                    ],
-                )
+            A generator of ReadwiseHighlight objects, or dicts with `raw`
+        """
+        params = _highlights_params(
+            book_ids,
+            updated_after,
+            updated_before,
+            highlighted_at_after,
+            highlighted_at_before,
+        )
+
+        for data in self.get_pagination_limit_20(
+            "/highlights/", params, max_workers=max_workers, prefetch=prefetch
+        ):
+            for highlight in self._build("highlights", data["results"], raw, fields):
+                yield highlight
 
     def get_books(
         self,
-        category: Literal["articles", "books", "tweets", "podcasts", "supplementals"],
-    ) -> Generator[ReadwiseBook, None, None]:
+        category: BookCategory | Sequence[BookCategory] | None = None,
+        max_workers: int = 1,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        dedup: bool = True,
+        prefetch: int = 0,
+    ) -> Generator[ReadwiseBook | dict, None, None]:
         """
         Get all Readwise books.
 
+        With several categories, every category is crawled in its own thread
+        under the shared rate limit and the books are yielded as their pages
+        arrive, so books of different categories are interleaved.
+
         Args:
-            category: Book category
+            category: Book category, a list of categories, or None or "all"
+                for every category
+            max_workers: Number of pages of each category to fetch
+                concurrently
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            dedup: Skip books whose ID was already yielded
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
 
         Returns:
-            A generator of ReadwiseBook objects
+            A generator of ReadwiseBook objects, or dicts with `raw`
         """
-        for data in self.get_pagination_limit_20(
-            "/books/", params={"category": category}
-        ):
-            for book in data["results"]:
-                yield ReadwiseBook(
-                    id=book["id"],
-                    title=book["title"],
-                    author=book["author"],
-                    category=book["category"],
-                    source=book["source"],
-                    num_highlights=book["num_highlights"],
-                    last_highlight_at=datetime.fromisoformat(book["last_highlight_at"])
-                    if book["last_highlight_at"]
-                    else None,
-                    updated=datetime.fromisoformat(book["updated"])
-                    if book["updated"]
-                    else None,
-                    cover_image_url=book["cover_image_url"],
-                    highlights_url=book["highlights_url"],
-                    source_url=book["source_url"],
-                    asin=book["asin"],
-                    tags=[
-                        ReadwiseTag(id=tag["id"], name=tag["name"])
-                        for tag in book["tags"]
-                    ],
-                    document_note=book["document_note"],
-                )
+        if category is None or category == "all":
+            categories = list(BOOK_CATEGORIES)
+        elif isinstance(category, str):
+            categories = [category]
+        else:
+            categories = list(dict.fromkeys(category))
+
+        crawls = [
+            self.get_pagination_limit_20(
+                "/books/",
+                params={"category": name},
+                max_workers=max_workers,
+                prefetch=prefetch,
+            )
+            for name in categories
+        ]
+        pages = crawls[0] if len(crawls) == 1 else merge_iterators(crawls)
+
+        seen = set()
+        for data in pages:
+            records = data["results"]
+            if dedup:
+                records = [
+                    record
+                    for record in records
+                    if record["id"] not in seen and not seen.add(record["id"])
+                ]
+            for book in self._build("books", records, raw, fields):
+                yield book
 
     def get_book_highlights(
-        self, book_id: str
-    ) -> Generator[ReadwiseHighlight, None, None]:
+        self,
+        book_id: str,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> Generator[ReadwiseHighlight | dict, None, None]:
         """
         Get all highlights for a Readwise book.
 
         Args:
             book_id: Readwise book ID
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
 
         Returns:
-            A generator of ReadwiseHighlight objects
+            A generator of ReadwiseHighlight objects, or dicts with `raw`
         """
         for data in self.get_pagination_limit_20(
-            "/highlights/", params={"book_id": book_id}
+            "/highlights/", params={"book_id": book_id}, prefetch=prefetch
         ):
-            for highlight in data["results"]:
-                yield ReadwiseHighlight(
-                    id=highlight["id"],
-                    text=highlight["text"],
-                    note=highlight["note"],
-                    location=highlight["location"],
-                    location_type=highlight["location_type"],
-                    highlighted_at=datetime.fromisoformat(highlight["highlighted_at"])
-                    if highlight["highlighted_at"]
-                    else None,
-                    url=highlight["url"],
-                    color=highlight["color"],
-                    updated=datetime.fromisoformat(highlight["updated"])
-                    if highlight["updated"]
-                    else None,
-                    book_id=highlight["book_id"],
-                    tags=[
-                        ReadwiseTag(id=tag["id"], name=tag["name"])
-                        for tag in highlight["tags"]
-                    ],
-                )
+            for highlight in self._build("highlights", data["results"], raw, fields):
+                yield highlight
+
+    def get_highlights_for_books(
+        self,
+        book_ids: Iterable[str | int],
+        max_workers: int = 4,
+        return_exceptions: bool = True,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+    ) -> Generator[
+        tuple[str | int, list[ReadwiseHighlight | dict] | Exception], None, None
+    ]:
+        """
+        Get the highlights of many books, fetching books concurrently.
+
+        Books are fetched on a pool of `max_workers` threads that share the
+        client's rate limiter, and yielded as each book completes, not in
+        the order of `book_ids`.
+
+        Examples:
+            >>> for book_id, highlights in client.get_highlights_for_books(ids):
+            ...     if isinstance(highlights, Exception):
+            ...         print(f"Book {book_id} failed: {highlights}")
+
+        Args:
+            book_ids: Readwise book IDs
+            max_workers: Number of books fetched concurrently
+            return_exceptions: Yield the error of a book whose request failed
+                in place of its highlights, and go on with the other books.
+                When False the error is raised.
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+        Yields:
+            Tuples of the book ID and a list of its highlights, or the
+            requests exception of a failed book
+        """
+
+        def fetch(book_id):
+            try:
+                return list(self.get_book_highlights(book_id, raw, fields))
+            except requests.RequestException as error:
+                if not return_exceptions:
+                    raise
+                logging.error(f"Error getting highlights of book {book_id}: {error}")
+                return error
+
+        yield from bounded_map(fetch, book_ids, max_workers, ordered=False)
 
     def create_highlight(
         self,
@@ -459,18 +1327,137 @@ class Readwise:
             category: Book category
             note: Highlight note
         """
-        payload = {"text": text, "title": title, "category": category}
-        if author:
-            payload["author"] = author
-        if highlighted_at:
-            payload["highlighted_at"] = highlighted_at.isoformat()
-        if source_url:
-            payload["source_url"] = source_url
-        if note:
-            payload["note"] = note
+        payload = _highlight_payload(
+            text, title, author, highlighted_at, source_url, category, note
+        )
 
         self.post("/highlights/", {"highlights": [payload]})
 
+    def create_highlights(
+        self,
+        highlights: Iterable[ReadwiseHighlightCreate | dict],
+        batch_size: int = 100,
+    ) -> ReadwiseBulkCreateResult:
+        """
+        Create many Readwise highlights with one request per batch.
+
+        The highlights are read lazily, one batch at a time, and every batch
+        is paced by the rate limiter. Readwise identifies a highlight by its
+        text, title, author and source URL and updates it when it is created
+        again, so a batch is idempotent and the client's `RetryPolicy`
+        retries it after connection errors and server errors. Batches that
+        still fail are reported in the result and can be retried with
+        `retry_failed_highlights`.
+
+        Examples:
+            >>> result = client.create_highlights(
+            ...     [{'text': 'foo', 'title': 'bar'}, {'text': 'baz', 'title': 'bar'}]
+            ... )
+            >>> result.created_ids, result.errors
+
+        Args:
+            highlights: ReadwiseHighlightCreate objects or dicts with the same
+                fields
+            batch_size: Number of highlights per request
+
+        Returns:
+            A ReadwiseBulkCreateResult
+        """
+        result = ReadwiseBulkCreateResult()
+        iterator = iter(highlights)
+        start = 0
+        while chunk := list(islice(iterator, batch_size)):
+            batch = ReadwiseHighlightBatch(
+                start=start, highlights=[_highlight_create_payload(h) for h in chunk]
+            )
+            start += len(chunk)
+            self._create_highlight_batch(batch)
+            result.batches.append(batch)
+        return result
+
+    def retry_failed_highlights(
+        self, result: ReadwiseBulkCreateResult
+    ) -> ReadwiseBulkCreateResult:
+        """
+        Post the failed batches of a bulk highlight creation again.
+
+        Args:
+            result: Result of `create_highlights`
+
+        Returns:
+            The same result, updated with the outcome of the retried batches
+        """
+        for batch in result.failed:
+            self._create_highlight_batch(batch)
+        return result
+
+    def _create_highlight_batch(self, batch: ReadwiseHighlightBatch):
+        """Post a batch of highlights and record the outcome on the batch."""
+        logging.debug(
+            f"Creating highlights {batch.start} to "
+            f"{batch.start + len(batch.highlights) - 1}"
+        )
+        try:
+            # Creating a highlight again updates it, so repeating is safe.
+            response = self._request(
+                "POST",
+                "/highlights/",
+                data={"highlights": batch.highlights},
+                idempotent=True,
+            )
+        except requests.RequestException as error:
+            logging.error(f"Error creating highlights from {batch.start}: {error}")
+            batch.error = str(error)
+            batch.status_code = (
+                error.response.status_code if error.response is not None else None
+            )
+            return
+        batch.error = None
+        batch.status_code = response.status_code
+        batch.highlight_ids = [
+            highlight_id
+            for book in response.json()
+            for highlight_id in book.get("modified_highlights", [])
+        ]
+
+    def search(
+        self,
+        query: str,
+        store: LocalStore,
+        tags: list[str] | None = None,
+        book_ids: list[int] | None = None,
+        limit: int = 20,
+        refresh: bool = False,
+        raw: bool = False,
+    ) -> list[ReadwiseSearchResult]:
+        """
+        Search the text and notes of highlights in the local full-text index.
+
+        The index is part of the local store filled by `SyncEngine` or
+        `readwise sync`, so searching does not need the network.
+
+        Examples:
+            >>> client.search('stoic*', store, tags=['philosophy'])
+
+        Args:
+            query: Words that all have to match, `stoic*` matches by prefix
+            store: Local store to search
+            tags: Only highlights with one of these tags
+            book_ids: Only highlights of these books
+            limit: Maximum number of results
+            refresh: Sync the highlights changed since the last sync first
+            raw: Pass `query` unchanged as SQLite FTS5 query
+
+        Returns:
+            ReadwiseSearchResult objects, best match first
+        """
+        if refresh:
+            # readwise.sync depends on this module.
+            from readwise.sync import SyncEngine
+
+            SyncEngine(store, readwise=self).sync_highlights()
+        return store.search(query, tags=tags, book_ids=book_ids, limit=limit, raw=raw)
+
     def get_book_tags(self, book_id: str) -> Generator[ReadwiseTag, None, None]:
         """
         Get all tags for a Readwise book.
@@ -516,10 +1503,22 @@ class Readwise:
         self.delete(f"/books/{book_id}/tags/{tag_id}")
 
 
-class ReadwiseReader:
+class ReadwiseReader(_BaseClient):
     def __init__(
         self,
         token: str,
+        adapter: HTTPAdapter | None = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | Literal[False] | None = None,
+        cache: ResponseCache | None = None,
+        builder: ModelBuilder | None = None,
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        hooks: Hooks | Sequence[Hooks] | None = None,
     ):
         """
         Readwise Reader API client.
@@ -529,51 +1528,47 @@ class ReadwiseReader:
 
         Args:
             token: Readwise Reader Connector token
+            adapter: A requests HTTPAdapter to share a connection pool
+                between several clients
+            pool_connections: Number of connection pools to cache
+            pool_maxsize: Maximum number of connections kept per pool
+            pool_block: Whether to block when no free connection is available
+            keep_alive: Whether to reuse connections between requests
+            rate_limiter: Rate limiter pacing the requests, pass the same
+                limiter to several clients to share one budget or `False`
+                to disable client side rate limiting
+            cache: Response cache for GET requests, disabled by default
+            builder: Builds the models from the API records, e.g. a
+                BulkModelBuilder to validate whole pages at once
+            retry: Policy for retrying failed requests, by default up to 8
+                attempts with exponential backoff and jitter
+            circuit_breaker: Circuit breaker failing requests fast while the
+                API is down, disabled by default. Pass the same breaker to
+                several clients to share it.
+            timeout: Seconds to wait for a connection and for the server to
+                send data, as one number for both or a `(connect, read)`
+                tuple. None waits forever.
+            hooks: Hooks receiving the events of the HTTP layer, e.g. a
+                StatsCollector, or a list of them
         """
-        self._token = token
-        self._url = "https://readwise.io/api/v3"
-
-    @property
-    def _session(self) -> requests.Session:
-        """
-        Session object for making requests.
-        The headers are set to include the token.
-        """
-        session = requests.Session()
-        session.headers.update(
-            {
-                "Accept": "application/json",
-                "Authorization": f"Token {self._token}",
-            }
+        super().__init__(
+            token,
+            adapter=adapter,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            rate_limiter=RateLimiter.for_reader()
+            if rate_limiter is None
+            else rate_limiter or None,
+            cache=cache,
+            builder=builder,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+            hooks=hooks,
         )
-        return session
-
-    def _request(
-        self, method: str, endpoint: str, params: dict = {}, data: dict = {}
-    ) -> requests.Response:
-        """
-        Make a request to the Readwise Reader API.
-        The request is rate limited to 20 calls per minute.
-
-        Args:
-            method: HTTP method
-            endpoint: API endpoints
-            params: Query parameters
-            data: Request body
-
-        Returns:
-            requests.Response
-        """
-        url = self._url + endpoint
-        logging.debug(f'Calling "{method}" on "{url}" with params: {params}')
-        response = self._session.request(method, url, params=params, json=data)
-        while response.status_code == 429:
-            seconds = int(response.headers["Retry-After"])
-            logging.warning(f"Rate limited by Readwise, retrying in {seconds} seconds")
-            sleep(seconds)
-            response = self._session.request(method, url, params=params, data=data)
-        response.raise_for_status()
-        return response
+        self._url = "https://readwise.io/api/v3"
 
     def get(self, endpoint: str, params: dict = {}) -> requests.Response:
         """
@@ -600,48 +1595,30 @@ class ReadwiseReader:
         Returns:
             requests.Response
         """
-        return self.get(endpoint, params)
+        logging.debug(f'Getting "{endpoint}" with params: {params}')
+        return self._request("GET", endpoint, params=params, rate_limit=LIMITED_BUCKET)
 
     def _get_pagination(
         self,
         get_method: Literal["get", "get_with_limit_20"],
         endpoint: str,
         params: dict = {},
+        page_cursor: str | None = None,
     ) -> Generator[dict, None, None]:
         """
-        Get a response from the Readwise Reader API with pagination.
-
-        Args:
-            get_method: Method to use for making requests
-            endpoint: API endpoint
-            params: Query parameters
-            page_size: Number of items per page
-        Yields:
-            dict: Response data
+        Get the pages of a cursor paginated Readwise Reader API endpoint,
+        see `_paginate`.
         """
-        pageCursor = None
-        while True:
-            if pageCursor:
-                params.update({"pageCursor": pageCursor})
-            logging.debug(f'Getting page with cursor "{pageCursor}"')
-            try:
-                response = getattr(self, get_method)(endpoint, params=params)
-            except ChunkedEncodingError:
-                logging.error(f'Error getting page with cursor "{pageCursor}"')
-                sleep(5)
-                continue
-            data = response.json()
-            yield data
-            if (
-                isinstance(data, list)
-                or not data.get("nextPageCursor")
-                or data.get("nextPageCursor") == pageCursor
-            ):
-                break
-            pageCursor = data.get("nextPageCursor")
+        return self._paginate(
+            get_method, endpoint, params, page_cursor=page_cursor, cursor=True
+        )
 
     def get_pagination_limit_20(
-        self, endpoint: str, params: dict = {}
+        self,
+        endpoint: str,
+        params: dict = {},
+        prefetch: int = 0,
+        page_cursor: str | None = None,
     ) -> Generator[dict, None, None]:
         """
         Get a response from the Readwise Reader API with pagination and a rate limit
@@ -650,11 +1627,14 @@ class ReadwiseReader:
         Args:
             endpoint: API endpoint
             params: Query parameters
-            page_size: Number of items per page
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
+            page_cursor: Cursor of the page to start at
         Yields:
             Response data
         """
-        yield from self._get_pagination("get_with_limit_20", endpoint, params)
+        pages = self._get_pagination("get_with_limit_20", endpoint, params, page_cursor)
+        yield from read_ahead(pages, prefetch) if prefetch else pages
 
     def post(self, endpoint: str, data: dict = {}) -> requests.Response:
         """
@@ -706,61 +1686,175 @@ class ReadwiseReader:
         Returns:
             requests.Response
         """
-        data: dict[str, Any] = {
-            "url": url,
-            "tags": tags,
-            "location": location,
-        }
+        data = _document_payload(
+            url,
+            html,
+            should_clean_html,
+            title,
+            author,
+            summary,
+            published_at,
+            image_url,
+            location,
+            saved_using,
+            tags,
+        )
 
-        if html:
-            data["html"] = html
+        return self.post("/save/", data)
 
-        if should_clean_html is not None:
-            data["should_clean_html"] = should_clean_html
+    def iter_save_documents(
+        self,
+        documents: Iterable[ReadwiseDocumentCreate | dict | str],
+        max_workers: int = 4,
+        queue_size: int | None = None,
+        dedup: bool = True,
+        store: LocalStore | None = None,
+    ) -> Generator[ReadwiseSaveResult, None, None]:
+        """
+        Save many documents in Readwise Reader, yielding the outcome of every
+        document as soon as it is known.
 
-        if title:
-            data["title"] = title
+        The documents are read lazily into a bounded queue and saved by
+        `max_workers` threads. Every request waits for the rate limiter, so
+        the workers keep saving at the rate limit instead of sleeping on
+        `429 Too Many Requests` answers. Reader saves a URL only once, so
+        saves are idempotent and the client's `RetryPolicy` retries them
+        after connection errors and server errors too.
 
-        if author:
-            data["author"] = author
+        With `dedup`, URLs that appeared earlier in `documents` are skipped,
+        and so are the URLs of the documents in `store` when given. Reader
+        itself answers a save of a URL it already has with `exists`, so the
+        library is not listed to look them up.
 
-        if summary:
-            data["summary"] = summary
+        Examples:
+            >>> for result in client.iter_save_documents(urls, store=store):
+            ...     print(result.status, result.url)
 
-        if published_at:
-            data["published_at"] = published_at.isoformat()
+        Args:
+            documents: URLs, ReadwiseDocumentCreate objects or dicts with the
+                same fields
+            max_workers: Number of documents saved concurrently
+            queue_size: Maximum number of documents read ahead of the
+                results, defaults to twice `max_workers`
+            dedup: Skip URLs that are already saved
+            store: Local store to look up the saved URLs in before saving
+        Yields:
+            ReadwiseSaveResult objects, in the order the saves complete
+        """
+        known = set()
+        if dedup and store is not None:
+            known = {document.source_url for document in store.documents()}
+
+        def queue() -> Generator[tuple[ReadwiseDocumentCreate, bool], None, None]:
+            for document in documents:
+                document = _document_create(document)
+                yield document, dedup and document.url in known
+                known.add(document.url)
+
+        def save(item: tuple[ReadwiseDocumentCreate, bool]) -> ReadwiseSaveResult:
+            document, duplicate = item
+            if duplicate:
+                return ReadwiseSaveResult(url=document.url, status="skipped")
+            return self._save_document(document)
+
+        for _, result in bounded_map(
+            save, queue(), max_workers, ordered=False, max_pending=queue_size
+        ):
+            logging.info(f'Saving "{result.url}": {result.status}')
+            yield result
 
-        if image_url:
-            data["image_url"] = image_url
+    def save_documents(
+        self,
+        documents: Iterable[ReadwiseDocumentCreate | dict | str],
+        max_workers: int = 4,
+        queue_size: int | None = None,
+        dedup: bool = True,
+        store: LocalStore | None = None,
+    ) -> ReadwiseBulkSaveResult:
+        """
+        Save many documents in Readwise Reader.
 
-        if saved_using:
-            data["saved_using"] = saved_using
+        See `iter_save_documents` for the arguments.
 
-        return self.post("/save/", data)
+        Returns:
+            A ReadwiseBulkSaveResult
+        """
+        return ReadwiseBulkSaveResult(
+            results=list(
+                self.iter_save_documents(
+                    documents,
+                    max_workers=max_workers,
+                    queue_size=queue_size,
+                    dedup=dedup,
+                    store=store,
+                )
+            )
+        )
+
+    def _save_document(self, document: ReadwiseDocumentCreate) -> ReadwiseSaveResult:
+        """Save a document and record the outcome."""
+        data = _document_payload(**document.model_dump())
+        try:
+            # Reader dedups saves by URL, so repeating one is safe.
+            response = self._request("POST", "/save/", data=data, idempotent=True)
+        except requests.RequestException as error:
+            logging.error(f'Error saving "{document.url}": {error}')
+            return ReadwiseSaveResult(
+                url=document.url,
+                status="failed",
+                status_code=(
+                    error.response.status_code if error.response is not None else None
+                ),
+                error=str(error),
+            )
+        return ReadwiseSaveResult(
+            url=document.url,
+            status="created" if response.status_code == 201 else "exists",
+            id=response.json().get("id"),
+            status_code=response.status_code,
+        )
 
     def get_documents(
-        self, params: dict = {}
-    ) -> Generator[ReadwiseReaderDocument, None, None]:
-        for data in self.get_pagination_limit_20("/list/", params=params):
-            for document in data["results"]:
-                yield ReadwiseReaderDocument(
-                    id=document["id"],
-                    url=document["url"],
-                    source_url=document["source_url"],
-                    title=document["title"],
-                    author=document["author"],
-                    source=document["source"],
-                    category=document["category"],
-                    location=document["location"],
-                    tags=document["tags"],
-                    site_name=document["site_name"],
-                    word_count=document["word_count"],
-                    created_at=datetime.fromisoformat(document["created_at"]),
-                    updated_at=datetime.fromisoformat(document["updated_at"]),
-                    notes=document["notes"],
-                    published_date=document["published_date"],
-                    summary=document["summary"],
-                    image_url=document["image_url"],
-                    parent_id=document["parent_id"],
-                    reading_progress=document["reading_progress"],
+        self,
+        params: dict = {},
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+        deadline: float | None = None,
+        page_cursor: str | None = None,
+    ) -> Generator[ReadwiseReaderDocument | dict, None, str | None]:
+        """
+        Get all documents from Readwise Reader.
+
+        With a `deadline` the listing stops cleanly once the page being
+        consumed when the deadline passes is complete, and returns the cursor
+        of the next page to continue from with `page_cursor`.
+
+        Args:
+            params: Query parameters
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background thread
+                while the current page is processed
+            deadline: Seconds after which no further page is started
+            page_cursor: Cursor of the page to start at
+        Yields:
+            ReadwiseReaderDocument objects, or dicts with `raw`
+        Returns:
+            The cursor of the next page if the listing stopped at the
+            deadline, None when it completed
+        """
+        deadline_at = monotonic() + deadline if deadline is not None else None
+        pages = self.get_pagination_limit_20(
+            "/list/", params=params, prefetch=prefetch, page_cursor=page_cursor
+        )
+        for data in pages:
+            for document in self._build("documents", data["results"], raw, fields):
+                yield document
+            page_cursor = _next_cursor(data, page_cursor)
+            if page_cursor and deadline_at is not None and monotonic() >= deadline_at:
+                pages.close()
+                logging.info(
+                    f'Listing stopped at the deadline before cursor "{page_cursor}"'
                 )
+                return page_cursor
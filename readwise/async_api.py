@@ -0,0 +1,636 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable, Literal, Sequence, TypeVar
+
+import requests
+
+from readwise.api import (
+    Readwise,
+    ReadwiseReader,
+    _BaseClient,
+    _document_payload,
+    _export_params,
+    _highlight_payload,
+    _highlights_params,
+    _first_query,
+    _next_query,
+)
+from readwise.models import (
+    DailyReviewHighlight,
+    ReadwiseBook,
+    ReadwiseDailyReview,
+    ReadwiseExportResults,
+    ReadwiseHighlight,
+    ReadwiseReaderDocument,
+    ReadwiseTag,
+)
+from readwise.ratelimit import LIMITED_BUCKET
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def _advance(step: Callable[[Any], T], value: Any) -> T | StopIteration:
+    """
+    Advance the steps of a request, returning the StopIteration at the end
+    instead of raising it, as it cannot be raised through a future.
+    """
+    try:
+        return step(value)
+    except StopIteration as stop:
+        return stop
+
+
+async def _read_ahead(
+    items: AsyncGenerator[T, None], size: int
+) -> AsyncGenerator[T, None]:
+    """
+    Consume an async generator in a background task, at most `size` items
+    ahead of the caller. Closing the generator early cancels the task.
+    """
+    queue: asyncio.Queue = asyncio.Queue(max(size, 1))
+
+    async def fill():
+        try:
+            async for item in items:
+                await queue.put((item, None))
+        except Exception as error:
+            await queue.put((_DONE, error))
+        else:
+            await queue.put((_DONE, None))
+
+    task = asyncio.create_task(fill())
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class _AsyncBaseClient:
+    """
+    Request handling shared by the asyncio Readwise API clients.
+
+    The async clients wrap a sync client and reuse its pooled session and
+    rate limiter. Waiting for the rate limit happens on the event loop. The
+    blocking HTTP call and the steps deciding the request, which may lock
+    a rate limiter state file or read a disk cache, run in worker threads.
+    """
+
+    def __init__(self, client: _BaseClient):
+        self._client = client
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict = {},
+        data: dict = {},
+        rate_limit: str | None = None,
+        idempotent: bool | None = None,
+    ) -> requests.Response:
+        """
+        Make a request to the API, retrying failed attempts as decided by
+        the retry policy of the wrapped client.
+
+        The steps of the request are decided by the wrapped client in a
+        worker thread; only the waits and the HTTP call differ.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            params: Query parameters
+            data: Request body
+            rate_limit: Name of the rate limit bucket to use instead of the
+                one matching the endpoint
+            idempotent: Whether the request may be repeated after a server
+                error, by default whether the method is idempotent
+
+        Returns:
+            requests.Response
+
+        Raises:
+            ReadwiseRateLimitException: If the server still answers with 429
+                when the retry policy gives up
+            CircuitOpenError: If the circuit breaker is open
+        """
+        client = self._client
+        steps = client._request_steps(
+            method, endpoint, params, data, rate_limit, False, idempotent
+        )
+        step = await asyncio.to_thread(_advance, steps.send, None)
+        while not isinstance(step, StopIteration):
+            if not isinstance(step, dict):
+                await asyncio.sleep(step)
+                step = await asyncio.to_thread(_advance, steps.send, None)
+                continue
+            try:
+                response = await asyncio.to_thread(client._session.request, **step)
+            except requests.RequestException as error:
+                step = await asyncio.to_thread(_advance, steps.throw, error)
+            else:
+                step = await asyncio.to_thread(_advance, steps.send, response)
+        return step.value
+
+    async def get(self, endpoint: str, params: dict = {}) -> requests.Response:
+        """
+        Make a GET request to the API.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+
+        Returns:
+            requests.Response
+        """
+        logging.debug(f'Getting "{endpoint}" with params: {params}')
+        return await self._request("GET", endpoint, params=params)
+
+    async def get_with_limit_20(
+        self, endpoint: str, params: dict = {}
+    ) -> requests.Response:
+        """
+        Get a response from the API with a rate limit of 20 requests per
+        minute.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+
+        Returns:
+            requests.Response
+        """
+        logging.debug(f'Getting "{endpoint}" with params: {params}')
+        return await self._request(
+            "GET", endpoint, params=params, rate_limit=LIMITED_BUCKET
+        )
+
+    async def post(self, endpoint: str, data: dict = {}) -> requests.Response:
+        """
+        Make a POST request to the API.
+
+        Args:
+            endpoint: API endpoint
+            data: Request body
+
+        Returns:
+            requests.Response
+        """
+        logging.debug(f'Posting "{endpoint}" with data: {data}')
+        return await self._request("POST", endpoint, data=data)
+
+    async def _paginate(
+        self,
+        get_method: Literal["get", "get_with_limit_20"],
+        endpoint: str,
+        params: dict = {},
+        page_size: int = 1000,
+        cursor: bool = False,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Get the pages of a paginated endpoint.
+
+        Args:
+            get_method: Method to use for making requests
+            endpoint: API endpoint
+            params: Query parameters
+            page_size: Number of items per page
+            cursor: Whether the endpoint is cursor paginated
+        Yields:
+            dict: Response data
+        """
+        get = getattr(self, get_method)
+        query = _first_query(params, page_size, None, cursor)
+        while query is not None:
+            response = await get(endpoint, params=query)
+            data = self._client._page_data(endpoint, response)
+            yield data
+            query = _next_query(query, data)
+
+    async def close(self):
+        """Close the underlying session."""
+        self._client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncReadwise(_AsyncBaseClient):
+    def __init__(self, token: str, **kwargs):
+        """
+        Initialize an asyncio Readwise API client.
+
+        The client has the same methods as `Readwise`, as coroutines and
+        async generators.
+
+        Args:
+            token: Readwise API token
+            **kwargs: Passed on to `Readwise`
+        """
+        super().__init__(Readwise(token, **kwargs))
+
+    async def delete(self, endpoint: str) -> requests.Response:
+        """
+        Make a DELETE request to the Readwise API.
+
+        Args:
+            endpoint: API endpoint
+
+        Returns:
+            requests.Response
+        """
+        logging.debug(f'Deleting "{endpoint}"')
+        return await self._request("DELETE", endpoint)
+
+    async def get_pagination(
+        self, endpoint: str, params: dict = {}, prefetch: int = 0
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Get a response from the Readwise API with pagination.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            Response data
+        """
+        pages = self._get_pagination("get", endpoint, params)
+        if prefetch:
+            pages = _read_ahead(pages, prefetch)
+        async for data in pages:
+            yield data
+
+    async def get_pagination_limit_20(
+        self,
+        endpoint: str,
+        params: dict = {},
+        page_size: int = 1000,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Get a response from the Readwise API with pagination and a rate limit
+        of 20 requests per minute.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            page_size: Number of items per page
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            Response data
+        """
+        pages = self._get_pagination("get_with_limit_20", endpoint, params, page_size)
+        if prefetch:
+            pages = _read_ahead(pages, prefetch)
+        async for data in pages:
+            yield data
+
+    def _get_pagination(
+        self,
+        get_method: Literal["get", "get_with_limit_20"],
+        endpoint: str,
+        params: dict = {},
+        page_size: int = 1000,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Get the pages of a Readwise API endpoint, see `_paginate`. The
+        `/export/` endpoint is cursor paginated, the others by page number.
+        """
+        return self._paginate(
+            get_method, endpoint, params, page_size, cursor=endpoint == "/export/"
+        )
+
+    async def get_daily_review(self) -> ReadwiseDailyReview:
+        """Get Readwise Daily Review.
+
+        Returns:
+            A ReadwiseDailyReview object
+        """
+        return ReadwiseDailyReview(**(await self.get("/review/")).json())
+
+    async def get_daily_review_highlights(
+        self,
+    ) -> AsyncGenerator[DailyReviewHighlight, None]:
+        """Get Readwise Daily Review.
+
+        Yields:
+            DailyReviewHighlight objects
+        """
+        daily_review = await self.get_daily_review()
+        for highlight in daily_review.highlights:
+            yield DailyReviewHighlight(**highlight)
+
+    async def export_highlights(
+        self,
+        updated_after: str = None,
+        ids: list[str] = None,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[ReadwiseExportResults | dict, None]:
+        """
+        Export all highlights from Readwise.
+
+        Args:
+            updated_after: date highlight was last updated
+            ids: A list of book ids
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            ReadwiseExportResults objects, or dicts with `raw`
+        """
+        params = _export_params(updated_after, ids)
+        async for data in self.get_pagination_limit_20(
+            "/export/", params, prefetch=prefetch
+        ):
+            for book in self._client._build(
+                "export_results", data["results"], raw, fields
+            ):
+                yield book
+
+    async def get_highlights(
+        self,
+        book_ids: list[str] = None,
+        updated_after: datetime = None,
+        updated_before: datetime = None,
+        highlighted_at_after: datetime = None,
+        highlighted_at_before: datetime = None,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[ReadwiseHighlight | dict, None]:
+        """
+        Get all Readwise highlights.
+
+        Args:
+            book_ids: Readwise book IDs
+            updated_after: Date and time the highlight was last updated
+            updated_before: Date and time the highlight was last updated
+            highlighted_at_after: Date and time the highlight was created
+            highlighted_at_before: Date and time the highlight was created
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            ReadwiseHighlight objects, or dicts with `raw`
+        """
+        params = _highlights_params(
+            book_ids,
+            updated_after,
+            updated_before,
+            highlighted_at_after,
+            highlighted_at_before,
+        )
+        async for data in self.get_pagination_limit_20(
+            "/highlights/", params, prefetch=prefetch
+        ):
+            for highlight in self._client._build(
+                "highlights", data["results"], raw, fields
+            ):
+                yield highlight
+
+    async def get_books(
+        self,
+        category: Literal["articles", "books", "tweets", "podcasts", "supplementals"],
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[ReadwiseBook | dict, None]:
+        """
+        Get all Readwise books.
+
+        Args:
+            category: Book category
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            ReadwiseBook objects, or dicts with `raw`
+        """
+        async for data in self.get_pagination_limit_20(
+            "/books/", params={"category": category}, prefetch=prefetch
+        ):
+            for book in self._client._build("books", data["results"], raw, fields):
+                yield book
+
+    async def get_book_highlights(
+        self,
+        book_id: str,
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[ReadwiseHighlight | dict, None]:
+        """
+        Get all highlights for a Readwise book.
+
+        Args:
+            book_id: Readwise book ID
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            ReadwiseHighlight objects, or dicts with `raw`
+        """
+        async for data in self.get_pagination_limit_20(
+            "/highlights/", params={"book_id": book_id}, prefetch=prefetch
+        ):
+            for highlight in self._client._build(
+                "highlights", data["results"], raw, fields
+            ):
+                yield highlight
+
+    async def create_highlight(
+        self,
+        text: str,
+        title: str,
+        author: str | None = None,
+        highlighted_at: datetime | None = None,
+        source_url: str | None = None,
+        category: str = "articles",
+        note: str | None = None,
+    ):
+        """
+        Create a Readwise highlight.
+
+        Args:
+            text: Highlight text
+            title: Book title
+            author: Book author
+            highlighted_at: Date and time the highlight was created
+            source_url: URL of the book
+            category: Book category
+            note: Highlight note
+        """
+        payload = _highlight_payload(
+            text, title, author, highlighted_at, source_url, category, note
+        )
+
+        await self.post("/highlights/", {"highlights": [payload]})
+
+    async def get_book_tags(self, book_id: str) -> AsyncGenerator[ReadwiseTag, None]:
+        """
+        Get all tags for a Readwise book.
+
+        Args:
+            book_id: Readwise book ID
+        Yields:
+            ReadwiseTag objects
+        """
+        async for data in self.get_pagination_limit_20(
+            f"/books/{book_id}/tags/", params={"book_id": book_id}
+        ):
+            for tag in data:
+                yield ReadwiseTag(id=tag["id"], name=tag["name"])
+
+    async def add_tag(self, book_id: str, tag: str):
+        """
+        Add a tag to a Readwise book.
+
+        Args:
+            book_id: Readwise book ID
+            tag: Tag name
+        """
+        logging.debug(f'Adding tag "{tag}" to book "{book_id}"')
+        await self.post(f"/books/{book_id}/tags/", {"name": tag})
+
+    async def delete_tag(self, book_id: str, tag_id: str):
+        """
+        Delete a tag from a Readwise book.
+
+        Args:
+            book_id: Readwise book ID
+            tag_id: Readwise tag ID
+        """
+        logging.debug(f'Deleting tag "{tag_id}"')
+        await self.delete(f"/books/{book_id}/tags/{tag_id}")
+
+
+class AsyncReadwiseReader(_AsyncBaseClient):
+    def __init__(self, token: str, **kwargs):
+        """
+        Initialize an asyncio Readwise Reader API client.
+
+        The client has the same methods as `ReadwiseReader`, as coroutines
+        and async generators.
+
+        Args:
+            token: Readwise Reader Connector token
+            **kwargs: Passed on to `ReadwiseReader`
+        """
+        super().__init__(ReadwiseReader(token, **kwargs))
+
+    async def get_pagination_limit_20(
+        self, endpoint: str, params: dict = {}, prefetch: int = 0
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Get a response from the Readwise Reader API with pagination and a rate
+        limit of 20 requests per minute.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            Response data
+        """
+        pages = self._paginate("get_with_limit_20", endpoint, params, cursor=True)
+        if prefetch:
+            pages = _read_ahead(pages, prefetch)
+        async for data in pages:
+            yield data
+
+    async def create_document(
+        self,
+        url: str,
+        html: str | None = None,
+        should_clean_html: bool | None = None,
+        title: str | None = None,
+        author: str | None = None,
+        summary: str | None = None,
+        published_at: datetime | None = None,
+        image_url: str | None = None,
+        location: Literal["new", "later", "archive", "feed"] = "new",
+        saved_using: str | None = None,
+        tags: list[str] = [],
+    ) -> requests.Response:
+        """
+        Create a document in Readwise Reader.
+
+        Args:
+            url: Document URL
+            html: Document HTML
+            should_clean_html: Whether to clean the HTML
+            title: Document title
+            author: Document author
+            summary: Document summary
+            published_at: Date and time the document was published
+            image_url: An image URL to use as cover image
+            location: Document location
+            saved_using: How the document was saved
+            tags: List of tags
+
+        Returns:
+            requests.Response
+        """
+        data = _document_payload(
+            url,
+            html,
+            should_clean_html,
+            title,
+            author,
+            summary,
+            published_at,
+            image_url,
+            location,
+            saved_using,
+            tags,
+        )
+
+        return await self.post("/save/", data)
+
+    async def get_documents(
+        self,
+        params: dict = {},
+        raw: bool = False,
+        fields: Sequence[str] | None = None,
+        prefetch: int = 0,
+    ) -> AsyncGenerator[ReadwiseReaderDocument | dict, None]:
+        """
+        Get all documents from Readwise Reader.
+
+        Args:
+            params: Query parameters
+            raw: Yield the parsed JSON records instead of models
+            fields: Only keep these keys of every record, implies `raw`
+            prefetch: Number of pages fetched ahead in a background task
+                while the current page is processed
+        Yields:
+            ReadwiseReaderDocument objects, or dicts with `raw`
+        """
+        async for data in self.get_pagination_limit_20(
+            "/list/", params=params, prefetch=prefetch
+        ):
+            for document in self._client._build(
+                "documents", data["results"], raw, fields
+            ):
+                yield document
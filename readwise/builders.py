@@ -0,0 +1,269 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from sys import intern
+from typing import List, Sequence
+
+from pydantic import TypeAdapter
+
+from readwise.models import (
+    CompactExportHighlight,
+    CompactExportResults,
+    CompactHighlight,
+    CompactTag,
+    ReadwiseBook,
+    ReadwiseExportHighlight,
+    ReadwiseExportResults,
+    ReadwiseHighlight,
+    ReadwiseReaderDocument,
+    ReadwiseTag,
+)
+
+
+def _datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _intern(value: str | None) -> str | None:
+    return intern(value) if value else value
+
+
+def project(records: list[dict], fields: Sequence[str] | None = None) -> list[dict]:
+    """
+    Return API records as they were parsed, without building models.
+
+    Args:
+        records: Records of a page of API results
+        fields: Only keep these keys of every record
+    """
+    if not fields:
+        return records
+    return [{key: record[key] for key in fields if key in record} for record in records]
+
+
+class ModelBuilder:
+    """
+    Builds models from the records of a page of API results.
+
+    This builder validates every field of every record. It is the default
+    builder of the clients.
+    """
+
+    def export_results(self, records: list[dict]) -> list[ReadwiseExportResults]:
+        """Build ReadwiseExportResults objects from `/export/` records."""
+        return [self._export_result(record) for record in records]
+
+    def highlights(self, records: list[dict]) -> list[ReadwiseHighlight]:
+        """Build ReadwiseHighlight objects from `/highlights/` records."""
+        return [self._highlight(record) for record in records]
+
+    def books(self, records: list[dict]) -> list[ReadwiseBook]:
+        """Build ReadwiseBook objects from `/books/` records."""
+        return [self._book(record) for record in records]
+
+    def documents(self, records: list[dict]) -> list[ReadwiseReaderDocument]:
+        """Build ReadwiseReaderDocument objects from Reader `/list/` records."""
+        return [self._document(record) for record in records]
+
+    @staticmethod
+    def _export_result(book: dict) -> ReadwiseExportResults:
+        book_tags = [ReadwiseTag(**book_tag) for book_tag in book["book_tags"]]
+
+        highlights = [
+            ReadwiseExportHighlight(
+                tags=[ReadwiseTag(**tag) for tag in highlight["tags"]],
+                **{key: value for key, value in highlight.items() if key != "tags"},
+            )
+            for highlight in book["highlights"]
+        ]
+
+        return ReadwiseExportResults(
+            **{
+                key: value
+                for key, value in book.items()
+                if key not in ["book_tags", "highlights"]
+            },
+            book_tags=book_tags,
+            highlights=highlights,
+        )
+
+    @staticmethod
+    def _highlight(highlight: dict) -> ReadwiseHighlight:
+        return ReadwiseHighlight(
+            id=highlight["id"],
+            text=highlight["text"],
+            note=highlight["note"],
+            location=highlight["location"],
+            location_type=highlight["location_type"],
+            highlighted_at=_datetime(highlight["highlighted_at"]),
+            url=highlight["url"],
+            color=highlight["color"],
+            updated=_datetime(highlight["updated"]),
+            book_id=highlight["book_id"],
+            tags=[
+                ReadwiseTag(id=tag["id"], name=tag["name"]) for tag in highlight["tags"]
+            ],
+        )
+
+    @staticmethod
+    def _book(book: dict) -> ReadwiseBook:
+        return ReadwiseBook(
+            id=book["id"],
+            title=book["title"],
+            author=book["author"],
+            category=book["category"],
+            source=book["source"],
+            num_highlights=book["num_highlights"],
+            last_highlight_at=_datetime(book["last_highlight_at"]),
+            updated=_datetime(book["updated"]),
+            cover_image_url=book["cover_image_url"],
+            highlights_url=book["highlights_url"],
+            source_url=book["source_url"],
+            asin=book["asin"],
+            tags=[ReadwiseTag(id=tag["id"], name=tag["name"]) for tag in book["tags"]],
+            document_note=book["document_note"],
+        )
+
+    @staticmethod
+    def _document(document: dict) -> ReadwiseReaderDocument:
+        return ReadwiseReaderDocument(
+            id=document["id"],
+            url=document["url"],
+            source_url=document["source_url"],
+            title=document["title"],
+            author=document["author"],
+            source=document["source"],
+            category=document["category"],
+            location=document["location"],
+            tags=document["tags"],
+            site_name=document["site_name"],
+            word_count=document["word_count"],
+            created_at=datetime.fromisoformat(document["created_at"]),
+            updated_at=datetime.fromisoformat(document["updated_at"]),
+            notes=document["notes"],
+            published_date=document["published_date"],
+            summary=document["summary"],
+            image_url=document["image_url"],
+            parent_id=document["parent_id"],
+            reading_progress=document["reading_progress"],
+        )
+
+
+class BulkModelBuilder(ModelBuilder):
+    """
+    Validates a whole page of records in one call of a pydantic TypeAdapter.
+
+    The records are still fully validated, but the nested models and dates
+    are built by pydantic-core instead of in Python.
+    """
+
+    _export_results_adapter = TypeAdapter(List[ReadwiseExportResults])
+    _highlights_adapter = TypeAdapter(List[ReadwiseHighlight])
+    _books_adapter = TypeAdapter(List[ReadwiseBook])
+    _documents_adapter = TypeAdapter(List[ReadwiseReaderDocument])
+
+    def export_results(self, records: list[dict]) -> list[ReadwiseExportResults]:
+        return self._export_results_adapter.validate_python(records)
+
+    def highlights(self, records: list[dict]) -> list[ReadwiseHighlight]:
+        return self._highlights_adapter.validate_python(records)
+
+    def books(self, records: list[dict]) -> list[ReadwiseBook]:
+        return self._books_adapter.validate_python(records)
+
+    def documents(self, records: list[dict]) -> list[ReadwiseReaderDocument]:
+        return self._documents_adapter.validate_python(records)
+
+
+class CompactModelBuilder(ModelBuilder):
+    """
+    Builds compact models, slotted dataclasses without validation, for
+    highlights and exports. Books and documents are built as usual.
+
+    Equal tag lists are built once and shared, and strings that repeat across
+    records, such as colors and categories, are interned, so that a whole
+    library fits in a fraction of the memory of the pydantic models. The
+    shared tag lists are kept in a least recently used cache, so that a
+    long-running client does not keep every tag combination it has seen.
+    """
+
+    def __init__(self, max_tag_lists: int = 4096):
+        """
+        Args:
+            max_tag_lists: Maximum number of distinct tag lists kept to share
+        """
+        self.max_tag_lists = max_tag_lists
+        self._tags: OrderedDict[tuple, tuple[CompactTag, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tag_tuple(self, tags: list[dict]) -> tuple[CompactTag, ...]:
+        key = tuple((tag["id"], tag["name"]) for tag in tags)
+        with self._lock:
+            shared = self._tags.get(key)
+            if shared is not None:
+                self._tags.move_to_end(key)
+                return shared
+            shared = self._tags[key] = tuple(
+                CompactTag(id, intern(name)) for id, name in key
+            )
+            if len(self._tags) > self.max_tag_lists:
+                self._tags.popitem(last=False)
+            return shared
+
+    def _export_result(self, book: dict) -> CompactExportResults:
+        return CompactExportResults(
+            user_book_id=book["user_book_id"],
+            title=book["title"],
+            author=book["author"],
+            readable_title=book["readable_title"],
+            source=_intern(book["source"]),
+            cover_image_url=book["cover_image_url"],
+            unique_url=book["unique_url"],
+            category=_intern(book["category"]),
+            document_note=book["document_note"],
+            summary=book["summary"],
+            readwise_url=book["readwise_url"],
+            source_url=book["source_url"],
+            book_tags=self._tag_tuple(book["book_tags"]),
+            highlights=[
+                self._export_highlight(highlight) for highlight in book["highlights"]
+            ],
+            asin=book.get("asin"),
+        )
+
+    def _export_highlight(self, highlight: dict) -> CompactExportHighlight:
+        return CompactExportHighlight(
+            id=highlight["id"],
+            text=highlight["text"],
+            location=highlight["location"],
+            location_type=_intern(highlight["location_type"]),
+            note=highlight["note"],
+            color=_intern(highlight["color"]),
+            highlighted_at=_datetime(highlight["highlighted_at"]),
+            created_at=_datetime(highlight["created_at"]),
+            updated_at=_datetime(highlight["updated_at"]),
+            external_id=highlight["external_id"],
+            book_id=highlight["book_id"],
+            readwise_url=highlight["readwise_url"],
+            tags=self._tag_tuple(highlight["tags"]),
+            is_favorite=highlight.get("is_favorite", False),
+            is_discard=highlight.get("is_discard", False),
+            is_deleted=highlight.get("is_deleted", False),
+            url=highlight.get("url"),
+            end_location=highlight.get("end_location"),
+        )
+
+    def _highlight(self, highlight: dict) -> CompactHighlight:
+        return CompactHighlight(
+            id=highlight["id"],
+            text=highlight["text"],
+            note=highlight["note"],
+            location=highlight["location"],
+            location_type=_intern(highlight["location_type"]),
+            highlighted_at=_datetime(highlight["highlighted_at"]),
+            url=highlight["url"],
+            color=_intern(highlight["color"]),
+            updated=_datetime(highlight["updated"]),
+            book_id=highlight["book_id"],
+            tags=self._tag_tuple(highlight["tags"]),
+        )
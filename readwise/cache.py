@@ -0,0 +1,366 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Mapping, Protocol
+from urllib.parse import urlsplit
+
+import requests
+from pydantic import BaseModel, ConfigDict
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTLS = {
+    "/books/": 300,
+    "/books/*/tags/": 300,
+    "/review/": 600,
+    "/highlights/[0-9]*": 300,
+}
+
+DEFAULT_RELATED = {
+    "/highlights/": ["/books/", "/review/"],
+}
+
+
+class CachedResponse(BaseModel):
+    """Represents a response kept in the response cache."""
+
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64")
+
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the response can be used without asking the server."""
+        return time.time() < self.expires_at
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """Headers to revalidate the response with a conditional request."""
+        headers = CaseInsensitiveDict(self.headers)
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    def to_response(self) -> requests.Response:
+        """Build a requests.Response from the cached response."""
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        return response
+
+
+class CacheBackend(Protocol):
+    """Storage of a ResponseCache."""
+
+    def get(self, key: str) -> CachedResponse | None:
+        ...
+
+    def set(self, key: str, entry: CachedResponse):
+        ...
+
+    def delete_prefix(self, prefix: str):
+        ...
+
+    def clear(self):
+        ...
+
+
+class MemoryCache:
+    """
+    An in-memory least recently used cache, bounded by number of entries and
+    total size of the response bodies.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of responses to keep
+            max_bytes: Maximum total size of the response bodies
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += len(entry.content)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+
+
+class DiskCache:
+    """
+    A least recently used cache kept in a SQLite file, bounded by the total
+    size of the response bodies.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Maximum total size of the response bodies
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                entry TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT entry FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._connection.commit()
+            return CachedResponse.model_validate_json(row[0])
+
+    def set(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, entry.model_dump_json(), len(entry.content), time.time()),
+            )
+            (size,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            rows = self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at"
+            )
+            evict = []
+            for old_key, old_size in rows:
+                if size <= self.max_bytes:
+                    break
+                evict.append((old_key,))
+                size -= old_size
+            self._connection.executemany("DELETE FROM responses WHERE key = ?", evict)
+            self._connection.commit()
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM responses WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+
+def _namespace(account: str) -> str:
+    """Return the prefix of the cache keys of an account."""
+    return f"{account}:" if account else ""
+
+
+class ResponseCache:
+    """
+    Caches GET responses by URL and query parameters.
+
+    A response is served from the cache until the TTL of its endpoint has
+    passed. After that, responses with an `ETag` or `Last-Modified` header
+    are revalidated with a conditional request, and a `304 Not Modified`
+    answer serves the cached body again.
+
+    A successful POST, PUT, PATCH or DELETE drops the cached responses of
+    the collection it changed, e.g. adding a tag to a book drops the cached
+    tags of that book.
+
+    Clients of several accounts can share a cache: the responses are kept
+    apart by the `account` passed along with every request, e.g. the
+    `readwise.store.account_id` of the token.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttls: Mapping[str, float] = DEFAULT_TTLS,
+        default_ttl: float = 0,
+        related: Mapping[str, list[str]] = DEFAULT_RELATED,
+    ):
+        """
+        Args:
+            backend: Storage for the responses, defaults to a MemoryCache
+            ttls: Seconds a response stays fresh, by endpoint pattern in
+                `fnmatch` syntax
+            default_ttl: Seconds a response of any other endpoint stays fresh
+            related: Endpoints whose cached responses are also dropped after
+                a change to an endpoint, e.g. the books list after creating
+                a highlight
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.related = dict(related)
+
+    @staticmethod
+    def key(url: str, params: Mapping | None = None, account: str = "") -> str:
+        """Return the cache key of a GET request of an account."""
+        query = json.dumps(dict(params or {}), sort_keys=True, default=str)
+        return _namespace(account) + url + "?" + query
+
+    def ttl(self, path: str) -> float:
+        """Return the number of seconds responses of a path stay fresh."""
+        for pattern, ttl in self.ttls.items():
+            # Patterns are relative to the API root, e.g. "/api/v2".
+            if fnmatchcase(path, "*" + pattern):
+                return ttl
+        return self.default_ttl
+
+    def lookup(
+        self, url: str, params: Mapping | None = None, account: str = ""
+    ) -> CachedResponse | None:
+        """
+        Return the cached response of a GET request, fresh or not.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            account: Account the request was made for
+        """
+        return self.backend.get(self.key(url, params, account))
+
+    def store(
+        self,
+        url: str,
+        params: Mapping | None,
+        response: requests.Response,
+        account: str = "",
+    ) -> CachedResponse | None:
+        """
+        Cache the response of a GET request.
+
+        Responses that are not 200 OK, are marked `no-store`, or that can
+        neither stay fresh nor be revalidated are not cached.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            response: The response
+            account: Account the request was made for
+
+        Returns:
+            The CachedResponse or None when the response was not cached
+        """
+        if response.status_code != 200:
+            return None
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return None
+        ttl = self.ttl(urlsplit(url).path)
+        headers = dict(response.headers)
+        now = time.time()
+        entry = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            headers=headers,
+            content=response.content,
+            stored_at=now,
+            expires_at=now + ttl,
+        )
+        if ttl <= 0 and not entry.validators:
+            return None
+        self.backend.set(self.key(url, params, account), entry)
+        return entry
+
+    def revalidated(
+        self,
+        url: str,
+        params: Mapping | None,
+        entry: CachedResponse,
+        account: str = "",
+    ):
+        """
+        Mark a cached response as fresh again after the server answered a
+        conditional request with `304 Not Modified`.
+        """
+        now = time.time()
+        entry = entry.model_copy(
+            update={"stored_at": now, "expires_at": now + self.ttl(urlsplit(url).path)}
+        )
+        self.backend.set(self.key(url, params, account), entry)
+
+    def invalidate(self, url: str, account: str = ""):
+        """
+        Drop the cached responses of an account affected by a change to a URL.
+
+        Args:
+            url: URL of the POST, PUT, PATCH or DELETE request
+            account: Account the request was made for
+        """
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}"
+        path = parts.path
+        # "/books/1/tags/2" changes the collection "/books/1/tags/".
+        collection = (
+            re.sub(r"[^/]+/?$", "", path) if re.search(r"/\d+/?$", path) else path
+        )
+        prefixes = {collection}
+        for endpoint, related in self.related.items():
+            if collection.endswith(endpoint):
+                root = collection[: -len(endpoint)]
+                prefixes.update(root + other for other in related)
+        for prefix in prefixes:
+            self.backend.delete_prefix(_namespace(account) + base + prefix)
+
+    def clear(self):
+        """Drop all cached responses."""
+        self.backend.clear()
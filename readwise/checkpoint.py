@@ -0,0 +1,66 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CheckpointMismatchError(ValueError):
+    """The saved export does not match the export asked to resume it."""
+
+
+class ExportCheckpoint(BaseModel):
+    """Represents the progress of a Readwise export."""
+
+    account: Optional[str] = None
+    params: Dict[str, str] = Field(default_factory=dict)
+    page_cursor: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed: bool = False
+    updated_after: Optional[str] = None
+
+
+class JSONCheckpointStore:
+    """
+    Keeps an export checkpoint in a JSON file.
+
+    The file is replaced atomically, so a crash while saving leaves the
+    previous checkpoint intact.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Args:
+            path: Path of the JSON file
+        """
+        self.path = Path(path)
+
+    def load(self) -> ExportCheckpoint | None:
+        """
+        Load the checkpoint.
+
+        Returns:
+            The saved ExportCheckpoint or None when there is none
+        """
+        try:
+            return ExportCheckpoint.model_validate_json(self.path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint: ExportCheckpoint):
+        """
+        Save the checkpoint.
+
+        Args:
+            checkpoint: Checkpoint to save
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        temporary.write_text(json.dumps(checkpoint.model_dump(mode="json")))
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        """Remove the checkpoint."""
+        self.path.unlink(missing_ok=True)
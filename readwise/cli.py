@@ -1,12 +1,29 @@
+import csv
 import datetime
 import json
 import os
+import time
 from collections import Counter
+from itertools import islice
 
 import click
 from click_default_group import DefaultGroup
 
-from readwise.api import Readwise, ReadwiseReader
+from readwise.writers import (
+    BOOK_COLUMNS,
+    DOCUMENT_COLUMNS,
+    HIGHLIGHT_COLUMNS,
+    HIGHLIGHT_LIST_COLUMNS,
+    flatten_book,
+    flatten_document,
+    flatten_export,
+    flatten_highlight,
+    open_writer,
+    select_columns,
+)
+
+# Pages fetched ahead while the output of the current page is written.
+PREFETCH = 2
 
 
 @click.group(cls=DefaultGroup, default="highlights")
@@ -15,6 +32,88 @@ def cli():
     """A command-line interface for the Readwise API."""
 
 
+def output_options(command):
+    """Add the options to choose the format, fields and file of the output."""
+    command = click.option(
+        "--output",
+        "-o",
+        default="-",
+        type=click.Path(dir_okay=False, allow_dash=True),
+        help="File to write to, stdout by default. Required for parquet and arrow.",
+    )(command)
+    command = click.option(
+        "--fields",
+        help="Comma separated list of fields to output. json and table output "
+        "a few fields by default, the other formats all of them.",
+    )(command)
+    return click.option(
+        "--format",
+        "-f",
+        "output_format",
+        type=click.Choice(["json", "ndjson", "table", "csv", "parquet", "arrow"]),
+        default="json",
+        help="Output format; ndjson writes one compact JSON object per line.",
+    )(command)
+
+
+def write_rows(rows, columns, default_fields, output_format, output, fields):
+    """
+    Write flattened rows in the format chosen with `output_options`.
+
+    Args:
+        rows: Rows with the `columns`, a generator is closed at the end
+        columns: Column names and types, e.g. HIGHLIGHT_COLUMNS
+        default_fields: Fields written by the json and table formats when
+            `fields` is not given
+        output_format: Value of --format
+        output: Value of --output
+        fields: Value of --fields
+    """
+    if fields:
+        fields = [field.strip() for field in fields.split(",")]
+    elif output_format in ("json", "table"):
+        fields = default_fields
+
+    try:
+        columns = select_columns(columns, fields)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--fields")
+    try:
+        writer = open_writer(output_format, output, columns)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+    try:
+        with writer:
+            writer.write_all(rows)
+    finally:
+        # Stop the background threads prefetching pages for the rows.
+        if hasattr(rows, "close"):
+            rows.close()
+
+
+def stats_option(command):
+    """Add the option to print request statistics at the end of a command."""
+    return click.option(
+        "--stats",
+        is_flag=True,
+        help="Print request, throttling and parsing statistics to stderr.",
+    )(command)
+
+
+def offline_options(command):
+    """Add the options to answer a command from the local database."""
+    command = click.option(
+        "--db",
+        type=click.Path(dir_okay=False),
+        help="Local database used by --offline, filled by `readwise sync`.",
+    )(command)
+    return click.option(
+        "--offline",
+        is_flag=True,
+        help="Answer from the local database instead of the API.",
+    )(command)
+
+
 @cli.group(
     name="highlights",
 )
@@ -33,10 +132,79 @@ def highlights():
     "--updated_after", "-u", help="Only export highlights updated after this date."
 )
 @click.option("--days", "-d", help="Only export highlights updated in the last N days.")
-def export_highlights(token, book_ids, updated_after, days):
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Save the export progress, and continue an interrupted export from "
+    "the last completed page.",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    show_default="export-<account>.json in the app directory with --resume",
+    help="File to save the export progress in.",
+)
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help="Only export highlights changed since the last incremental run.",
+)
+@click.option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    help="Local database used by --incremental.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Parse export pages while they download to save memory.",
+)
+@stats_option
+@output_options
+def export_highlights(
+    token,
+    book_ids,
+    updated_after,
+    days,
+    resume,
+    checkpoint,
+    incremental,
+    db,
+    stream,
+    stats,
+    output_format,
+    output,
+    fields,
+):
     """Export highlights."""
-
-    client = Readwise(check_token(token))
+    from readwise.api import Readwise
+    from readwise.checkpoint import CheckpointMismatchError, JSONCheckpointStore
+    from readwise.hooks import StatsCollector
+    from readwise.store import LocalStore, account_id, default_path
+    from readwise.sync import SyncEngine
+
+    token = check_token(token)
+    collector = StatsCollector() if stats else None
+    client = Readwise(token, hooks=collector)
+
+    if incremental:
+        ignored = [
+            option
+            for option, value in [
+                ("--book_ids", book_ids),
+                ("--updated_after", updated_after),
+                ("--days", days),
+                ("--resume", resume),
+                ("--checkpoint", checkpoint),
+                ("--stream", stream),
+            ]
+            if value
+        ]
+        if ignored:
+            raise click.UsageError(
+                f"--incremental cannot be combined with {', '.join(ignored)}."
+            )
 
     if book_ids:
         book_ids = book_ids.split(",")
@@ -46,14 +214,38 @@ def export_highlights(token, book_ids, updated_after, days):
             datetime.datetime.now() - datetime.timedelta(days=int(days))
         ).isoformat()
 
-    for results in client.export_highlights(ids=book_ids, updated_after=updated_after):
-        for highlight in results.highlights:
-            click.echo(
-                highlight.model_dump_json(
-                    include={"id", "book_id", "text", "note", "tags", "highlighted_at"},
-                    indent=4,
-                )
-            )
+    if incremental:
+        store = LocalStore(db or default_path(token, app_dir()))
+        exported = SyncEngine(store, readwise=client).iter_highlights()
+    else:
+        if checkpoint is None and resume:
+            checkpoint = os.path.join(app_dir(), f"export-{account_id(token)}.json")
+        exported = client.export_highlights(
+            ids=book_ids,
+            updated_after=updated_after,
+            checkpoint=JSONCheckpointStore(checkpoint) if checkpoint else None,
+            resume=resume,
+            stream=stream,
+            raw=True,
+            prefetch=PREFETCH,
+        )
+
+    try:
+        write_rows(
+            (row for book in exported for row in flatten_export(book)),
+            HIGHLIGHT_COLUMNS,
+            ["id", "book_id", "text", "note", "tags", "highlighted_at"],
+            output_format,
+            output,
+            fields,
+        )
+    except CheckpointMismatchError as error:
+        raise click.UsageError(
+            f"{error}. Resume it without --book_ids, --updated_after and "
+            "--days, or start a new export without --resume."
+        )
+    if collector:
+        click.echo(collector.format(), err=True)
 
 
 @highlights.command(name="list")
@@ -90,6 +282,8 @@ def export_highlights(token, book_ids, updated_after, days):
     "-t",
     help="Readwise API token.",
 )
+@offline_options
+@output_options
 def list_highlights(
     book_ids,
     updated_after,
@@ -98,38 +292,155 @@ def list_highlights(
     highlighted_at_before,
     limit,
     token,
+    offline,
+    db,
+    output_format,
+    output,
+    fields,
 ):
     """Get highlights."""
+    from readwise.api import Readwise
+    from readwise.store import LocalStore, default_path
+
+    token = check_token(token)
+
+    if book_ids:
+        book_ids = book_ids.split(",")
+
+    if offline:
+        highlights = LocalStore(db or default_path(token, app_dir())).highlights(
+            book_ids=[int(book_id) for book_id in book_ids or []],
+            updated_after=updated_after,
+            updated_before=updated_before,
+            highlighted_at_after=highlighted_at_after,
+            highlighted_at_before=highlighted_at_before,
+        )
+    else:
+        highlights = Readwise(token).get_highlights(
+            book_ids=book_ids,
+            updated_after=updated_after,
+            updated_before=updated_before,
+            highlighted_at_after=highlighted_at_after,
+            highlighted_at_before=highlighted_at_before,
+            raw=True,
+            prefetch=PREFETCH,
+        )
+
+    write_rows(
+        (flatten_highlight(h) for h in islice(highlights, limit or None)),
+        HIGHLIGHT_LIST_COLUMNS,
+        ["id", "book_id", "text", "note", "tags", "highlighted_at"],
+        output_format,
+        output,
+        fields,
+    )
+
+
+@highlights.command(name="import")
+@click.argument("file", type=click.File("r"), default="-")
+@click.option(
+    "--format",
+    "-f",
+    "file_format",
+    type=click.Choice(["jsonl", "csv"]),
+    help="Format of the file, guessed from its extension by default.",
+)
+@click.option("--batch-size", type=int, default=100, help="Highlights per request.")
+@click.option(
+    "--token",
+    "-t",
+    help="Readwise API token.",
+)
+def import_highlights(file, file_format, batch_size, token):
+    """Create highlights from a JSONL or CSV file, or stdin."""
+    from readwise.api import Readwise
+
     client = Readwise(check_token(token))
 
-    if highlighted_at_after:
-        highlighted_at_after = datetime.datetime.strptime(
-            highlighted_at_after, "%Y-%m-%d"
-        ).isoformat()
+    if file_format is None:
+        file_format = "csv" if file.name.endswith(".csv") else "jsonl"
 
-    if highlighted_at_before:
-        highlighted_at_before = datetime.datetime.strptime(
-            highlighted_at_before, "%Y-%m-%d"
-        ).isoformat()
+    if file_format == "csv":
+        rows = (
+            {key: value for key, value in row.items() if value}
+            for row in csv.DictReader(file)
+        )
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
 
-    for highlight in client.get_highlights(
-        book_ids=book_ids,
-        updated_after=updated_after,
-        updated_before=updated_before,
-        highlighted_at_after=highlighted_at_after,
-        highlighted_at_before=highlighted_at_before,
-    ):
-        click.echo(
-            highlight.model_dump_json(
-                include={"id", "book_id", "text", "note", "tags", "highlighted_at"},
-                indent=4,
-            )
+    result = client.create_highlights(rows, batch_size=batch_size)
+    print(
+        json.dumps(
+            {
+                "created": len(result.created_ids),
+                "failed": len(result.errors),
+                "errors": result.errors,
+            },
+            indent=2,
         )
+    )
 
-        if limit:
-            limit -= 1
-            if limit == 0:
-                break
+
+@highlights.command(name="search")
+@click.argument("query")
+@click.option("--tags", "-g", help="Comma separated list of tags.")
+@click.option("--book_ids", "-i", help="Comma separated list of book IDs.")
+@click.option("--limit", "-l", type=int, default=20, help="Maximum number of results.")
+@click.option(
+    "--refresh",
+    "-r",
+    is_flag=True,
+    help="Sync the highlights changed since the last sync before searching.",
+)
+@click.option(
+    "--raw",
+    is_flag=True,
+    help="Use QUERY as SQLite FTS5 query, e.g. '\"deep work\" OR focus'.",
+)
+@click.option("--db", type=click.Path(dir_okay=False), help="Local database.")
+@click.option(
+    "--token",
+    "-t",
+    help="Readwise API token.",
+)
+def search_highlights(query, tags, book_ids, limit, refresh, raw, db, token):
+    """Search highlights and notes in the local database."""
+    import sqlite3
+
+    from readwise.api import Readwise
+    from readwise.store import LocalStore, default_path
+
+    token = check_token(token)
+    client = Readwise(token)
+    store = LocalStore(db or default_path(token, app_dir()))
+
+    try:
+        results = client.search(
+            query,
+            store,
+            tags=tags.split(",") if tags else None,
+            book_ids=[int(book_id) for book_id in book_ids.split(",")]
+            if book_ids
+            else None,
+            limit=limit,
+            refresh=refresh,
+            raw=raw,
+        )
+    except sqlite3.OperationalError as error:
+        raise click.UsageError(f"Invalid search query: {error}")
+    for result in results:
+        print(
+            json.dumps(
+                {
+                    "id": result.highlight.id,
+                    "book_id": result.highlight.book_id,
+                    "title": result.book_title,
+                    "snippet": result.snippet,
+                    "rank": result.rank,
+                },
+                indent=2,
+            )
+        )
 
 
 @highlights.command(name="details")
@@ -141,6 +452,8 @@ def list_highlights(
 )
 def details_highlight(highlight_id, token):
     """Get highlight details."""
+    from readwise.api import Readwise
+
     client = Readwise(check_token(token))
 
     highlight = client.get("/highlights/{}".format(highlight_id))
@@ -164,6 +477,8 @@ def details_highlight(highlight_id, token):
 @click.option("--api-token", "-t", help="Readwise API token.")
 def highlights_tags_list(highlight_id, token):
     """Get tags."""
+    from readwise.api import Readwise
+
     client = Readwise(check_token(token))
 
     tags = client.get("highlights/{}".format(highlight_id))
@@ -179,6 +494,8 @@ def highlights_tags_list(highlight_id, token):
 )
 def daily_review(token):
     """Get daily review highlights."""
+    from readwise.api import Readwise
+
     client = Readwise(check_token(token))
 
     for highlight in client.get_daily_review_highlights():
@@ -202,12 +519,12 @@ def books():
 
 @books.command(name="list")
 @click.argument(
-    "category",
+    "categories",
+    nargs=-1,
     type=click.Choice(
-        ["articles", "books", "tweets", "podcasts", "supplementals"],
+        ["articles", "books", "tweets", "podcasts", "supplementals", "all"],
         case_sensitive=False,
     ),
-    default="articles",
 )
 @click.option("--limit", "-l", type=int, help="Limit the number of books to return.")
 @click.option(
@@ -215,32 +532,76 @@ def books():
     "-t",
     help="Readwise API token.",
 )
-def books_list(category, limit, token):
-    """Get books."""
-    client = Readwise(check_token(token))
-
-    for book in client.get_books(category):
-        print(
-            json.dumps(
-                {
-                    "id": book.id,
-                    "title": book.title,
-                    "author": book.author,
-                    "category": book.category,
-                    "source": book.source,
-                    "num_highlights": book.num_highlights,
-                    "cover_image_url": book.cover_image_url,
-                    "highlights_url": book.highlights_url,
-                    "source_url": book.source_url,
-                    "document_note": book.document_note,
-                },
-                indent=2,
-            )
+@offline_options
+@output_options
+def books_list(categories, limit, token, offline, db, output_format, output, fields):
+    """
+    Get books of one or more categories, articles by default.
+
+    Pass "all" to list the books of every category. Several categories are
+    fetched concurrently.
+    """
+    from readwise.api import Readwise
+    from readwise.store import LocalStore, default_path
+
+    token = check_token(token)
+    categories = [category.lower() for category in categories] or ["articles"]
+    if "all" in categories:
+        categories = None
+
+    if offline:
+        books = offline_books(
+            LocalStore(db or default_path(token, app_dir())), categories
         )
-        if limit:
-            limit -= 1
-            if limit == 0:
-                break
+    else:
+        books = Readwise(token).get_books(categories, raw=True, prefetch=PREFETCH)
+
+    write_rows(
+        (flatten_book(book) for book in islice(books, limit or None)),
+        BOOK_COLUMNS,
+        [
+            "id",
+            "title",
+            "author",
+            "category",
+            "source",
+            "num_highlights",
+            "cover_image_url",
+            "highlights_url",
+            "source_url",
+            "document_note",
+        ],
+        output_format,
+        output,
+        fields,
+    )
+
+
+def offline_books(store, categories=None):
+    """
+    Yield the books of the local database in the format of `books list`.
+
+    Args:
+        store: LocalStore to read the books from
+        categories: Categories of the books, None for all
+    """
+    num_highlights = store.count_highlights()
+    books = (
+        book for category in categories or [None] for book in store.books(category)
+    )
+    for book in books:
+        yield {
+            "id": book.user_book_id,
+            "title": book.title,
+            "author": book.author,
+            "category": book.category,
+            "source": book.source,
+            "num_highlights": num_highlights.get(book.user_book_id, 0),
+            "cover_image_url": book.cover_image_url,
+            "highlights_url": book.readwise_url,
+            "source_url": book.source_url,
+            "document_note": book.document_note,
+        }
 
 
 @books.command(name="tags")
@@ -248,6 +609,8 @@ def books_list(category, limit, token):
 @click.option("--token", "-t", help="Readwise API token.")
 def book_tags(book_id, token):
     """Get book tags."""
+    from readwise.api import Readwise
+
     client = Readwise(check_token(token))
 
     for tag in client.get_book_tags(book_id):
@@ -265,15 +628,21 @@ def tags():
     "-t",
     help="Readwise API token.",
 )
-def tags_list(token):
+@offline_options
+def tags_list(token, offline, db):
     """Get tags."""
-    client = Readwise(check_token(token))
+    from readwise.api import Readwise
+    from readwise.store import LocalStore, default_path
 
-    tags = Counter()
+    token = check_token(token)
 
-    for results in client.export_highlights():
-        for highlight in results.highlights:
-            tags.update(tag.name for tag in highlight.tags)
+    if offline:
+        tags = LocalStore(db or default_path(token, app_dir())).tag_counts()
+    else:
+        tags = Counter()
+        for results in Readwise(token).export_highlights():
+            for highlight in results.highlights:
+                tags.update(tag.name for tag in highlight.tags)
 
     for tag, count in tags.items():
         print(f"{tag}: {count}")
@@ -290,28 +659,178 @@ def reader():
     "-t",
     help="Readwise API token.",
 )
-def reader_list(token):
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help="Only list documents changed since the last incremental run.",
+)
+@click.option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    help="Local database used by --incremental and --offline.",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Answer from the local database instead of the API.",
+)
+@output_options
+def reader_list(token, incremental, db, offline, output_format, output, fields):
     """List documents in Readwise Reader."""
-    client = ReadwiseReader(check_token(token))
+    from readwise.api import ReadwiseReader
+    from readwise.store import LocalStore, default_path
+    from readwise.sync import SyncEngine
+
+    token = check_token(token)
+    client = ReadwiseReader(token)
+
+    if offline:
+        documents = LocalStore(db or default_path(token, app_dir())).documents()
+    elif incremental:
+        store = LocalStore(db or default_path(token, app_dir()))
+        documents = SyncEngine(store, reader=client).iter_documents()
+    else:
+        documents = client.get_documents(raw=True, prefetch=PREFETCH)
+
+    write_rows(
+        (flatten_document(document) for document in documents),
+        DOCUMENT_COLUMNS,
+        [
+            "id",
+            "title",
+            "author",
+            "category",
+            "location",
+            "source",
+            "url",
+            "source_url",
+            "word_count",
+            "reading_progress",
+        ],
+        output_format,
+        output,
+        fields,
+    )
 
-    for document in client.get_documents():
-        print(
-            json.dumps(
-                {
-                    "id": document.id,
-                    "title": document.title,
-                    "author": document.author,
-                    "category": document.category,
-                    "source": document.source,
-                    "num_highlights": document.num_highlights,
-                    "cover_image_url": document.cover_image_url,
-                    "highlights_url": document.highlights_url,
-                    "source_url": document.source_url,
-                    "document_note": document.document_note,
-                },
-                indent=2,
-            )
+
+@reader.command(name="save")
+@click.argument("file", type=click.File("r"), default="-")
+@click.option(
+    "--token",
+    "-t",
+    help="Readwise API token.",
+)
+@click.option(
+    "--workers", "-w", type=int, default=4, help="Documents saved concurrently."
+)
+@click.option(
+    "--dedup/--no-dedup",
+    default=True,
+    help="Skip URLs that are already saved in Reader.",
+)
+@click.option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    show_default="the database of `readwise sync` if there is one",
+    help="Local database to look up saved URLs in before saving.",
+)
+def reader_save(file, token, workers, dedup, db):
+    """
+    Save documents in Readwise Reader from a file or stdin.
+
+    Every line is either a URL or a JSON object with the fields of a document.
+    """
+    from readwise.api import ReadwiseReader
+    from readwise.store import LocalStore, default_path
+
+    token = check_token(token)
+    client = ReadwiseReader(token)
+    if db is None and default_path(token, app_dir()).exists():
+        db = default_path(token, app_dir())
+    store = LocalStore(db) if db else None
+
+    documents = (
+        json.loads(line) if line.startswith("{") else line
+        for line in (line.strip() for line in file)
+        if line
+    )
+
+    counts = Counter()
+    for result in client.iter_save_documents(
+        documents, max_workers=workers, dedup=dedup, store=store
+    ):
+        counts[result.status] += 1
+        click.echo(result.model_dump_json(exclude_none=True))
+    click.echo(json.dumps(dict(counts)), err=True)
+
+
+@cli.command(name="sync")
+@click.option(
+    "--token",
+    "-t",
+    help="Readwise API token.",
+)
+@click.option(
+    "--db",
+    type=click.Path(dir_okay=False),
+    help="Local database to sync into.",
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Download everything instead of only the changes since the last sync.",
+)
+@click.option(
+    "--highlights/--no-highlights",
+    default=True,
+    help="Sync books and highlights.",
+)
+@click.option(
+    "--documents/--no-documents",
+    default=True,
+    help="Sync Readwise Reader documents.",
+)
+@click.option(
+    "--deadline",
+    type=float,
+    help="Stop after the current page once this many seconds have passed. "
+    "The next sync continues where this one stopped.",
+)
+@stats_option
+def sync(token, db, full, highlights, documents, deadline, stats):
+    """Sync the account into a local database."""
+    from readwise.api import Readwise, ReadwiseReader
+    from readwise.hooks import StatsCollector
+    from readwise.store import LocalStore, default_path
+    from readwise.sync import SyncEngine
+
+    token = check_token(token)
+    started = time.monotonic()
+
+    def remaining():
+        if deadline is None:
+            return None
+        return max(deadline - (time.monotonic() - started), 0.0)
+
+    collector = StatsCollector() if stats else None
+    with LocalStore(db or default_path(token, app_dir())) as store:
+        engine = SyncEngine(
+            store,
+            readwise=Readwise(token, hooks=collector),
+            reader=ReadwiseReader(token, hooks=collector),
         )
+        if highlights:
+            click.echo(engine.sync_highlights(full, remaining()).model_dump_json())
+        if documents:
+            click.echo(engine.sync_documents(full, remaining()).model_dump_json())
+    if collector:
+        click.echo(collector.format(), err=True)
+
+
+def app_dir():
+    """Return the directory of the local databases and export checkpoints."""
+    return click.get_app_dir("readwise")
 
 
 def check_token(token):
@@ -0,0 +1,149 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Generator, Iterable, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+    ordered: bool = True,
+    max_pending: int | None = None,
+) -> Generator[tuple[T, R], None, None]:
+    """
+    Call `func` for every item on a pool of at most `max_workers` threads.
+
+    Items are read lazily: at most `max_pending` calls are submitted ahead
+    of the results consumed. Pending calls are cancelled when the generator
+    is closed early.
+
+    Args:
+        func: Function to call for every item
+        items: Items to call the function with
+        max_workers: Maximum number of concurrent calls
+        ordered: Yield results in the order of `items` instead of as they
+            complete
+        max_pending: Maximum number of submitted calls whose results have
+            not been yielded yet, defaults to twice `max_workers`
+    Yields:
+        Tuples of the item and its result
+    """
+    max_pending = max(max_pending or 2 * max_workers, 1)
+    iterator = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending: deque[tuple[Future[R], T]] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append((executor.submit(func, item), item))
+            if not pending:
+                break
+            if ordered:
+                future, item = pending.popleft()
+            else:
+                done, _ = wait([f for f, _ in pending], return_when=FIRST_COMPLETED)
+                index = next(i for i, (f, _) in enumerate(pending) if f in done)
+                future, item = pending[index]
+                del pending[index]
+            yield item, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+_DONE = object()
+
+
+def _put(queue: Queue, item: Any, stop: Event) -> bool:
+    """Put an item in a bounded queue unless `stop` is set while waiting."""
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def merge_iterators(
+    iterables: Sequence[Iterable[T]], max_pending: int = 16
+) -> Generator[T, None, None]:
+    """
+    Consume several iterables concurrently, one thread each, and yield their
+    items in the order they arrive.
+
+    At most `max_pending` items are buffered; the threads wait while the
+    buffer is full. The first exception raised by an iterable is raised
+    here. Closing the generator early stops the threads after their
+    current item.
+
+    Args:
+        iterables: Iterables to consume
+        max_pending: Maximum number of items produced but not yielded yet
+    Yields:
+        The items of all iterables
+    """
+    items: Queue = Queue(max(max_pending, 1))
+    stop = Event()
+
+    def drain(iterable: Iterable[T]):
+        error = None
+        try:
+            for item in iterable:
+                if not _put(items, (item, None), stop):
+                    return
+        except BaseException as exc:
+            error = exc
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+        _put(items, (_DONE, error), stop)
+
+    # Daemon threads, so that a generator that is never closed does not
+    # keep the interpreter from exiting.
+    threads = [
+        Thread(target=drain, args=(iterable,), daemon=True) for iterable in iterables
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        remaining = len(threads)
+        while remaining:
+            item, error = items.get()
+            if item is not _DONE:
+                yield item
+                continue
+            remaining -= 1
+            if error is not None:
+                raise error
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def read_ahead(iterable: Iterable[T], size: int) -> Generator[T, None, None]:
+    """
+    Consume an iterable in a background thread, at most `size` items ahead
+    of the caller, e.g. to fetch the next pages of an API while the current
+    one is processed.
+
+    Closing the generator early stops the thread after its current item.
+
+    Args:
+        iterable: Iterable to consume
+        size: Maximum number of items produced but not yielded yet
+    Yields:
+        The items of the iterable, in order
+    """
+    return merge_iterators([iterable], size)
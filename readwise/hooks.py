@@ -0,0 +1,470 @@
+import logging
+import re
+import threading
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Iterable, Literal
+
+if TYPE_CHECKING:
+    import requests
+
+ThrottleReason = Literal["rate_limit", "retry_after"]
+
+
+def route(endpoint: str) -> str:
+    """
+    Return the endpoint with numeric IDs replaced by `{id}`, e.g.
+    `/books/{id}/tags/`, to group the requests of an endpoint in metrics.
+    """
+    return re.sub(r"/\d+(?=/|$)", "/{id}", endpoint)
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    """One attempt of a request to the API."""
+
+    method: str
+    endpoint: str
+    attempt: int
+    started: float
+    status: int | None = None
+    error: Exception | None = None
+    elapsed: float | None = None
+    bytes_received: int | None = None
+    streamed: bool = False
+
+    def finish(
+        self,
+        response: "requests.Response | None" = None,
+        error: Exception | None = None,
+        streamed: bool = False,
+    ) -> "RequestEvent":
+        """
+        Record the outcome of the attempt.
+
+        The elapsed time and size of a streamed response cover the headers
+        only, its body is reported with the page.
+        """
+        self.elapsed = perf_counter() - self.started
+        self.error = error
+        self.streamed = streamed
+        if response is not None:
+            self.status = response.status_code
+            if not streamed:
+                self.bytes_received = len(response.content or b"")
+        return self
+
+
+@dataclass(slots=True)
+class PageEvent:
+    """
+    A page of results received from a paginated endpoint.
+
+    The bytes of a page that was not streamed were already reported with its
+    request.
+    """
+
+    endpoint: str
+    records: int
+    bytes_received: int
+    parse_seconds: float
+    streamed: bool = False
+
+
+class Hooks:
+    """
+    Receives events from the HTTP layer of a client.
+
+    Subclass it and override the methods of the events you are interested
+    in, all of them do nothing by default. Hooks are called synchronously
+    from the thread making the request, possibly from several threads at
+    once, so they should be quick and thread safe.
+    """
+
+    def request_started(self, event: RequestEvent):
+        """Called before every attempt of a request is sent."""
+
+    def request_finished(self, event: RequestEvent):
+        """
+        Called after every attempt of a request, with its status or the
+        exception raised instead of a response.
+        """
+
+    def retry(self, event: RequestEvent, delay: float):
+        """
+        Called when a failed attempt is retried after `delay` seconds. After
+        a 429 the wait is also reported by `throttled`.
+        """
+
+    def throttled(self, endpoint: str, seconds: float, reason: ThrottleReason):
+        """
+        Called after waiting before a request because of rate limiting:
+        for the client's rate limiter (`rate_limit`), or for the
+        `Retry-After` period of a 429 response when the client has no rate
+        limiter (`retry_after`).
+        """
+
+    def page_received(self, event: PageEvent):
+        """Called when a page of results has been received and decoded."""
+
+    def records_built(self, kind: str, records: int, seconds: float):
+        """
+        Called when the models of a page have been built, with the name of
+        the builder method, e.g. `highlights`.
+        """
+
+
+class HookList(Hooks):
+    """
+    Calls several hooks in order. An exception raised by a hook is logged
+    instead of failing the request.
+    """
+
+    def __init__(self, hooks: Iterable[Hooks]):
+        self.hooks = list(hooks)
+
+    def _call(self, name: str, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(*args)
+            except Exception:
+                logging.exception(f"Error in hook {hook!r} for {name}")
+
+    def request_started(self, event: RequestEvent):
+        self._call("request_started", event)
+
+    def request_finished(self, event: RequestEvent):
+        self._call("request_finished", event)
+
+    def retry(self, event: RequestEvent, delay: float):
+        self._call("retry", event, delay)
+
+    def throttled(self, endpoint: str, seconds: float, reason: ThrottleReason):
+        self._call("throttled", endpoint, seconds, reason)
+
+    def page_received(self, event: PageEvent):
+        self._call("page_received", event)
+
+    def records_built(self, kind: str, records: int, seconds: float):
+        self._call("records_built", kind, records, seconds)
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return a percentile of sorted values by the nearest-rank method."""
+    index = max(int(len(values) * percent / 100 + 0.5) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+class StatsCollector(Hooks):
+    """
+    Collects request, throttling and parsing statistics in memory.
+
+    Request latencies are kept per endpoint, up to the last `max_samples`
+    of each, to report percentiles.
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        """
+        Args:
+            max_samples: Number of latencies kept per endpoint
+        """
+        self._lock = threading.Lock()
+        self.max_samples = max_samples
+        self.reset()
+
+    def reset(self):
+        """Forget all collected statistics."""
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.statuses: Counter[int] = Counter()
+            self.bytes_received = 0
+            self.request_seconds = 0.0
+            self.backoff_seconds = 0.0
+            self.throttled_seconds: Counter[str] = Counter()
+            self.pages = 0
+            self.records = 0
+            self.parse_seconds = 0.0
+            self.build_seconds = 0.0
+            self._latencies: dict[str, deque] = defaultdict(
+                lambda: deque(maxlen=self.max_samples)
+            )
+
+    def request_finished(self, event: RequestEvent):
+        with self._lock:
+            self.requests += 1
+            if event.error is not None:
+                self.errors += 1
+            else:
+                self.statuses[event.status] += 1
+            self.bytes_received += event.bytes_received or 0
+            self.request_seconds += event.elapsed
+            self._latencies[route(event.endpoint)].append(event.elapsed)
+
+    def retry(self, event: RequestEvent, delay: float):
+        with self._lock:
+            self.retries += 1
+            if event.status != 429:
+                self.backoff_seconds += delay
+
+    def throttled(self, endpoint: str, seconds: float, reason: ThrottleReason):
+        with self._lock:
+            self.throttled_seconds[reason] += seconds
+
+    def page_received(self, event: PageEvent):
+        with self._lock:
+            self.pages += 1
+            self.records += event.records
+            if event.streamed:
+                self.bytes_received += event.bytes_received
+            self.parse_seconds += event.parse_seconds
+
+    def records_built(self, kind: str, records: int, seconds: float):
+        with self._lock:
+            self.build_seconds += seconds
+
+    def latency(self, endpoint: str | None = None) -> dict[str, float]:
+        """
+        Return the count, median, 90th and 99th percentile and maximum of the
+        request latencies in seconds, of one endpoint or of all.
+        """
+        with self._lock:
+            if endpoint is None:
+                samples = [s for d in self._latencies.values() for s in d]
+            else:
+                samples = list(self._latencies.get(route(endpoint), ()))
+        if not samples:
+            return {"count": 0}
+        samples.sort()
+        return {
+            "count": len(samples),
+            "p50": _percentile(samples, 50),
+            "p90": _percentile(samples, 90),
+            "p99": _percentile(samples, 99),
+            "max": samples[-1],
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Return all statistics as a JSON serializable dict."""
+        with self._lock:
+            endpoints = list(self._latencies)
+            summary = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "bytes_received": self.bytes_received,
+                "pages": self.pages,
+                "records": self.records,
+                "request_seconds": self.request_seconds,
+                "backoff_seconds": self.backoff_seconds,
+                "throttled_seconds": dict(self.throttled_seconds),
+                "parse_seconds": self.parse_seconds,
+                "build_seconds": self.build_seconds,
+            }
+        summary["latency"] = {
+            endpoint: self.latency(endpoint) for endpoint in sorted(endpoints)
+        }
+        return summary
+
+    def format(self) -> str:
+        """Return a human readable report of the statistics."""
+        summary = self.summary()
+        throttled = sum(summary["throttled_seconds"].values())
+        lines = [
+            f"{summary['requests']} requests, {summary['errors']} errors, "
+            f"{summary['retries']} retries, "
+            f"{summary['bytes_received'] / 1024 / 1024:.1f} MiB received",
+            f"{summary['pages']} pages, {summary['records']} records",
+            f"requests {summary['request_seconds']:.2f}s, "
+            f"throttled {throttled:.2f}s, backoff {summary['backoff_seconds']:.2f}s, "
+            f"parsing {summary['parse_seconds']:.2f}s, "
+            f"building {summary['build_seconds']:.2f}s",
+        ]
+        for endpoint, latency in summary["latency"].items():
+            lines.append(
+                f"{endpoint}: {latency['count']} requests, "
+                f"p50 {latency['p50'] * 1000:.0f} ms, "
+                f"p99 {latency['p99'] * 1000:.0f} ms, "
+                f"max {latency['max'] * 1000:.0f} ms"
+            )
+        return "\n".join(lines)
+
+
+class PrometheusHooks(Hooks):
+    """
+    Records the events as Prometheus metrics with prometheus_client.
+
+    Endpoints are labelled by `route`, so that IDs in paths do not create a
+    time series each.
+    """
+
+    def __init__(self, registry=None, namespace: str = "readwise"):
+        """
+        Args:
+            registry: prometheus_client CollectorRegistry to register the
+                metrics in, by default the global registry
+            namespace: Prefix of the metric names
+        """
+        try:
+            import prometheus_client as prom
+        except ImportError as error:
+            raise ImportError(
+                "Prometheus metrics need prometheus_client: "
+                "pip install prometheus-client"
+            ) from error
+
+        if registry is None:
+            registry = prom.REGISTRY
+        options = {"namespace": namespace, "registry": registry}
+        self.requests = prom.Counter(
+            "requests",
+            "Requests sent to the API, by outcome",
+            ["method", "endpoint", "status"],
+            **options,
+        )
+        self.request_duration = prom.Histogram(
+            "request_duration_seconds",
+            "Time until the response of a request was received",
+            ["method", "endpoint"],
+            **options,
+        )
+        self.received = prom.Counter(
+            "received_bytes",
+            "Bytes of response bodies received",
+            ["endpoint"],
+            **options,
+        )
+        self.retries = prom.Counter(
+            "retries", "Failed requests that were retried", ["endpoint"], **options
+        )
+        self.throttled = prom.Counter(
+            "throttled_seconds",
+            "Time spent waiting because of rate limiting",
+            ["reason"],
+            **options,
+        )
+        self.parse_duration = prom.Histogram(
+            "page_parse_seconds",
+            "Time spent decoding a page of results",
+            ["endpoint"],
+            **options,
+        )
+        self.records = prom.Counter(
+            "records", "Records received in pages", ["endpoint"], **options
+        )
+        self.build_duration = prom.Histogram(
+            "build_seconds",
+            "Time spent building the models of a page",
+            ["kind"],
+            **options,
+        )
+
+    def request_finished(self, event: RequestEvent):
+        endpoint = route(event.endpoint)
+        status = "error" if event.error is not None else str(event.status)
+        self.requests.labels(event.method, endpoint, status).inc()
+        self.request_duration.labels(event.method, endpoint).observe(event.elapsed)
+        if event.bytes_received:
+            self.received.labels(endpoint).inc(event.bytes_received)
+
+    def retry(self, event: RequestEvent, delay: float):
+        self.retries.labels(route(event.endpoint)).inc()
+
+    def throttled(self, endpoint: str, seconds: float, reason: ThrottleReason):
+        self.throttled.labels(reason).inc(seconds)
+
+    def page_received(self, event: PageEvent):
+        endpoint = route(event.endpoint)
+        self.parse_duration.labels(endpoint).observe(event.parse_seconds)
+        self.records.labels(endpoint).inc(event.records)
+        if event.streamed:
+            self.received.labels(endpoint).inc(event.bytes_received)
+
+    def records_built(self, kind: str, records: int, seconds: float):
+        self.build_duration.labels(kind).observe(seconds)
+
+
+class OpenTelemetryHooks(Hooks):
+    """
+    Traces every attempt of a request as an OpenTelemetry client span.
+
+    Retries, rate limit waits and pages are added as events to the span
+    that is current when they happen, e.g. the span of the caller's sync.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Args:
+            tracer: OpenTelemetry tracer to create the spans with, by default
+                the tracer named `readwise` of the global tracer provider
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as error:
+            raise ImportError(
+                "OpenTelemetry tracing needs opentelemetry-api: "
+                "pip install opentelemetry-api"
+            ) from error
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("readwise")
+        self._lock = threading.Lock()
+        self._spans: dict[int, Any] = {}
+
+    def request_started(self, event: RequestEvent):
+        span = self.tracer.start_span(
+            f"{event.method} {route(event.endpoint)}",
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={
+                "http.request.method": event.method,
+                "url.path": event.endpoint,
+                "http.request.resend_count": event.attempt - 1,
+            },
+        )
+        with self._lock:
+            self._spans[id(event)] = span
+
+    def request_finished(self, event: RequestEvent):
+        with self._lock:
+            span = self._spans.pop(id(event), None)
+        if span is None:
+            return
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        else:
+            span.set_attribute("http.response.status_code", event.status)
+            if event.status >= 500:
+                span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        if event.bytes_received is not None:
+            span.set_attribute("http.response.body.size", event.bytes_received)
+        span.end()
+
+    def _add_event(self, name: str, attributes: dict):
+        self._trace.get_current_span().add_event(name, attributes)
+
+    def retry(self, event: RequestEvent, delay: float):
+        self._add_event(
+            "readwise.retry",
+            {"url.path": event.endpoint, "attempt": event.attempt, "delay": delay},
+        )
+
+    def throttled(self, endpoint: str, seconds: float, reason: ThrottleReason):
+        self._add_event(
+            "readwise.throttled",
+            {"url.path": endpoint, "seconds": seconds, "reason": reason},
+        )
+
+    def page_received(self, event: PageEvent):
+        self._add_event(
+            "readwise.page",
+            {
+                "url.path": event.endpoint,
+                "records": event.records,
+                "bytes": event.bytes_received,
+                "parse_seconds": event.parse_seconds,
+            },
+        )
@@ -0,0 +1,154 @@
+import codecs
+import json
+import re
+from typing import Any, Generator, Iterable
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that can continue a number, e.g. the `5` of a chunk `1.`.
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+_DECODER = json.JSONDecoder()
+
+
+class _Incomplete(Exception):
+    """The value continues in the next chunk."""
+
+
+def _decode(text: str, index: int, final: bool) -> tuple[Any, int]:
+    """Decode the JSON value starting at `index`."""
+    try:
+        value, end = _DECODER.raw_decode(text, index)
+    except json.JSONDecodeError:
+        if final:
+            raise
+        raise _Incomplete
+    # A number at the end of the text may continue in the next chunk, also
+    # when its decoded part is followed by a `.`, `e` or sign.
+    if not final and (
+        end == len(text)
+        or type(value) in (int, float)
+        and _NUMBER_TAIL.match(text, end)
+    ):
+        raise _Incomplete
+    return value, end
+
+
+def _with_end(chunks: Iterable[bytes]) -> Generator[bytes | None, None, None]:
+    """Yield the chunks followed by None."""
+    yield from chunks
+    yield None
+
+
+class _Frame:
+    """An object or array that is being parsed."""
+
+    __slots__ = ("value", "name", "state")
+
+    def __init__(self, value: dict | list, name: Any):
+        self.value = value
+        self.name = name
+        self.state = "key" if isinstance(value, dict) else "item"
+
+
+def iter_array(
+    chunks: Iterable[bytes], key: str = "results", max_depth: int = 4
+) -> Generator[Any, None, dict]:
+    """
+    Parse a JSON object incrementally, yielding the items of one of its
+    array members as soon as they are complete.
+
+    Only the item being built and the unparsed part of the current chunk
+    are kept in memory, not the whole document. Objects and arrays nested
+    up to `max_depth` levels are walked here; deeper values, e.g. single
+    highlights of an exported book, are decoded in one call to the C scanner
+    of the `json` module.
+
+    Examples:
+        >>> items = iter_array(response.iter_content(65536), "results")
+
+    Args:
+        chunks: The JSON document in chunks of bytes
+        key: Name of the top-level array member to stream
+        max_depth: Number of nesting levels walked before values are
+            decoded at once
+    Yields:
+        The decoded items of the array
+    Returns:
+        The other members of the object, with the array left empty
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    stack: list[_Frame] = []
+    root = None
+    text = ""
+    pending: list[str] = []
+    pending_size = 0
+    retry_at = 0
+
+    for chunk in _with_end(chunks):
+        final = chunk is None
+        pending.append(decoder.decode(chunk or b"", final=final))
+        pending_size += len(pending[-1])
+        # A value that did not fit in the text is decoded again only once the
+        # text has doubled, so that large values are not decoded per chunk.
+        if len(text) + pending_size < retry_at and not final:
+            continue
+        text += "".join(pending)
+        pending, pending_size = [], 0
+
+        index = 0
+        try:
+            while (index := _WHITESPACE.match(text, index).end()) < len(text):
+                char = text[index]
+                if not stack:
+                    if root is not None:
+                        raise json.JSONDecodeError("Extra data", text, index)
+                    if char != "{":
+                        raise json.JSONDecodeError("Expecting '{'", text, index)
+                    root = {}
+                    stack.append(_Frame(root, None))
+                    index += 1
+                    continue
+
+                frame = stack[-1]
+                if char in "}]":
+                    index += 1
+                    stack.pop()
+                    if not stack:
+                        continue
+                    value = frame.value
+                elif char == ",":
+                    index += 1
+                    continue
+                elif frame.state == "key":
+                    frame.name, index = _decode(text, index, final)
+                    frame.state = "colon"
+                    continue
+                elif frame.state == "colon":
+                    if char != ":":
+                        raise json.JSONDecodeError("Expecting ':'", text, index)
+                    frame.state = "value"
+                    index += 1
+                    continue
+                elif char in "{[" and len(stack) < max_depth:
+                    name = frame.name if frame.state == "value" else None
+                    stack.append(_Frame({} if char == "{" else [], name))
+                    index += 1
+                    continue
+                else:
+                    value, index = _decode(text, index, final)
+
+                # A value of the current frame is complete.
+                parent = stack[-1]
+                if len(stack) == 2 and parent.name == key:
+                    yield value
+                elif parent.state == "item":
+                    parent.value.append(value)
+                else:
+                    parent.value[parent.name] = value
+                    parent.state = "key"
+        except _Incomplete:
+            retry_at = 2 * (len(text) - index)
+        text = text[index:]
+
+    if root is None or stack:
+        raise json.JSONDecodeError("Unexpected end of document", text, len(text))
+    return root
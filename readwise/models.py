@@ -1,5 +1,6 @@
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -54,7 +55,7 @@ class ReadwiseExportHighlight(BaseModel):
     location: int | None
     location_type: str | None
     note: str
-    color: str
+    color: str | None
     highlighted_at: datetime | None
     created_at: datetime | None
     updated_at: datetime | None
@@ -64,6 +65,7 @@ class ReadwiseExportHighlight(BaseModel):
     tags: List[ReadwiseTag] = Field(default_factory=list)
     is_favorite: bool = False
     is_discard: bool = False
+    is_deleted: bool = False
     url: Optional[str] = None
     end_location: Optional[int] = None
 
@@ -75,10 +77,10 @@ class ReadwiseExportResults(BaseModel):
     title: str
     author: str
     readable_title: str
-    source: str
+    source: str | None
     cover_image_url: str
     unique_url: str | None
-    category: str
+    category: str | None
     document_note: str | None
     summary: str | None
     readwise_url: str
@@ -88,6 +90,71 @@ class ReadwiseExportResults(BaseModel):
     asin: Optional[str] = None
 
 
+class ReadwiseSearchResult(BaseModel):
+    """Represents a highlight found by a local full-text search."""
+
+    highlight: ReadwiseExportHighlight
+    book_title: Optional[str] = None
+    rank: float
+    snippet: str
+
+
+class ReadwiseHighlightCreate(BaseModel):
+    """Represents a highlight to create in Readwise."""
+
+    text: str
+    title: Optional[str] = None
+    author: Optional[str] = None
+    image_url: Optional[str] = None
+    source_url: Optional[str] = None
+    source_type: Optional[str] = None
+    category: Optional[str] = None
+    note: Optional[str] = None
+    location: Optional[int] = None
+    location_type: Optional[str] = None
+    highlighted_at: Optional[datetime] = None
+    highlight_url: Optional[str] = None
+
+
+class ReadwiseHighlightBatch(BaseModel):
+    """Represents one request of a bulk highlight creation."""
+
+    start: int
+    highlights: List[Dict[str, Any]]
+    highlight_ids: List[int] = Field(default_factory=list)
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ReadwiseBulkCreateResult(BaseModel):
+    """Represents the outcome of a bulk highlight creation."""
+
+    batches: List[ReadwiseHighlightBatch] = Field(default_factory=list)
+
+    @property
+    def created_ids(self) -> List[int]:
+        """IDs of the highlights created or updated by all batches."""
+        return [_id for batch in self.batches for _id in batch.highlight_ids]
+
+    @property
+    def failed(self) -> List[ReadwiseHighlightBatch]:
+        """Batches that could not be created."""
+        return [batch for batch in self.batches if not batch.ok]
+
+    @property
+    def errors(self) -> Dict[int, str]:
+        """Error for the index of every highlight that could not be created."""
+        return {
+            batch.start + offset: batch.error
+            for batch in self.failed
+            for offset in range(len(batch.highlights))
+        }
+
+
 class DailyReviewHighlight(BaseModel):
     """Represents a Readwise Daily Review highlight."""
 
@@ -139,3 +206,124 @@ class ReadwiseReaderDocument(BaseModel):
     image_url: str
     reading_progress: float
     parent_id: Optional[str] = None
+
+
+class ReadwiseDocumentCreate(BaseModel):
+    """Represents a document to save in Readwise Reader."""
+
+    url: str
+    html: Optional[str] = None
+    should_clean_html: Optional[bool] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    summary: Optional[str] = None
+    published_at: Optional[datetime] = None
+    image_url: Optional[str] = None
+    location: Literal["new", "later", "archive", "feed"] = "new"
+    saved_using: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+
+
+class ReadwiseSaveResult(BaseModel):
+    """Represents the outcome of saving one document in Readwise Reader."""
+
+    url: str
+    status: Literal["created", "exists", "skipped", "failed"]
+    id: Optional[str] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ReadwiseBulkSaveResult(BaseModel):
+    """Represents the outcome of saving many documents in Readwise Reader."""
+
+    results: List[ReadwiseSaveResult] = Field(default_factory=list)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Number of documents by status."""
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        return counts
+
+    @property
+    def failed(self) -> List[ReadwiseSaveResult]:
+        """Documents that could not be saved."""
+        return [result for result in self.results if result.status == "failed"]
+
+
+@dataclass(slots=True, frozen=True)
+class CompactTag:
+    """
+    A lightweight Readwise tag.
+
+    Compact models are slotted dataclasses without validation, built by
+    `readwise.builders.CompactModelBuilder`. Equal tags are shared between
+    the objects built by one builder, so they must not be modified.
+    """
+
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class CompactHighlight:
+    """A lightweight ReadwiseHighlight."""
+
+    id: int
+    text: str
+    note: str
+    location: int
+    location_type: Optional[str]
+    highlighted_at: Optional[datetime]
+    url: Optional[str]
+    color: Optional[str]
+    updated: Optional[datetime]
+    book_id: int
+    tags: Tuple[CompactTag, ...]
+
+
+@dataclass(slots=True)
+class CompactExportHighlight:
+    """A lightweight ReadwiseExportHighlight."""
+
+    id: int
+    text: str
+    location: Optional[int]
+    location_type: Optional[str]
+    note: str
+    color: Optional[str]
+    highlighted_at: Optional[datetime]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    external_id: Optional[str]
+    book_id: int
+    readwise_url: str
+    tags: Tuple[CompactTag, ...] = ()
+    is_favorite: bool = False
+    is_discard: bool = False
+    is_deleted: bool = False
+    url: Optional[str] = None
+    end_location: Optional[int] = None
+
+
+@dataclass(slots=True)
+class CompactExportResults:
+    """A lightweight ReadwiseExportResults."""
+
+    user_book_id: int
+    title: str
+    author: str
+    readable_title: str
+    source: Optional[str]
+    cover_image_url: str
+    unique_url: Optional[str]
+    category: Optional[str]
+    document_note: Optional[str]
+    summary: Optional[str]
+    readwise_url: str
+    source_url: Optional[str]
+    book_tags: Tuple[CompactTag, ...] = ()
+    highlights: List[CompactExportHighlight] = field(default_factory=list)
+    asin: Optional[str] = None
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Mapping
+
+from readwise.hooks import route
+from readwise.retry import _parse_retry_after
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+DEFAULT_BUCKET = "default"
+LIMITED_BUCKET = "limited"
+
+
+class TokenBucket:
+    """
+    A token bucket that paces calls to a steady rate.
+
+    Every call reserves a token up front. When the bucket is empty the
+    reservation is queued behind the others and the caller is told how long
+    to wait, so concurrent callers are spread out evenly instead of all
+    waking up at once.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: float | None = None):
+        """
+        Args:
+            rate: Number of calls allowed per period
+            per: Length of the period in seconds
+            capacity: Maximum burst size, defaults to `rate`
+        """
+        self._lock = threading.Lock()
+        self._per = per
+        self.capacity = capacity if capacity is not None else rate
+        self.rate = rate / per
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = max(now - self._updated, 0.0)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket.
+
+        Returns:
+            Number of seconds the caller has to wait before using the token
+        """
+        with self._lock:
+            now = self._now()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Wait without blocking the event loop until a token is available.
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """
+        Hand out no tokens for the next `seconds` seconds and empty the
+        bucket, e.g. after the server answered with a `Retry-After` header.
+        """
+        with self._lock:
+            now = self._now()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+
+    def set_rate(self, rate: float):
+        """
+        Change the number of calls allowed per period.
+
+        Args:
+            rate: Number of calls allowed per period
+        """
+        with self._lock:
+            self._refill(self._now())
+            self.rate = rate / self._per
+            self.capacity = rate
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    A token bucket whose state is kept in a file, so that several processes
+    using the same file share one budget.
+
+    The file is locked with `fcntl.flock` while a token is taken or the
+    rate is changed.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        rate: float,
+        per: float = 60.0,
+        capacity: float | None = None,
+    ):
+        """
+        Args:
+            path: File used to store the bucket state
+            rate: Number of calls allowed per period
+            per: Length of the period in seconds
+            capacity: Maximum burst size, defaults to `rate`
+        """
+        if fcntl is None:
+            raise RuntimeError("FileTokenBucket requires fcntl (POSIX only)")
+        super().__init__(rate, per, capacity)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+
+    def _now(self) -> float:
+        return time.time()
+
+    def _locked(self, update):
+        with self._lock, open(self.path, "r+") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                content = file.read()
+                if content:
+                    state = json.loads(content)
+                    self._tokens = state["tokens"]
+                    self._updated = state["updated"]
+                    self._blocked_until = state["blocked_until"]
+                    self.rate = state.get("rate", self.rate)
+                    self.capacity = state.get("capacity", self.capacity)
+                else:
+                    self._updated = self._now()
+                result = update()
+                file.seek(0)
+                file.truncate()
+                json.dump(
+                    {
+                        "tokens": self._tokens,
+                        "updated": self._updated,
+                        "blocked_until": self._blocked_until,
+                        "rate": self.rate,
+                        "capacity": self.capacity,
+                    },
+                    file,
+                )
+                return result
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def reserve(self) -> float:
+        def update():
+            now = self._now()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+        return self._locked(update)
+
+    def pause(self, seconds: float):
+        def update():
+            now = self._now()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+
+        self._locked(update)
+
+    def set_rate(self, rate: float):
+        def update():
+            self._refill(self._now())
+            self.rate = rate / self._per
+            self.capacity = rate
+
+        self._locked(update)
+
+
+class RateLimiter:
+    """
+    A set of token buckets, one per class of endpoint.
+
+    Requests are mapped to a bucket by method and endpoint, e.g.
+    `"GET /export/"`. Requests that do not match use the `default` bucket.
+    The same limiter can be passed to several clients to share one budget.
+
+    When the server reports a different limit for an endpoint in the
+    `default` bucket, the route of the endpoint, e.g. `/books/{id}/tags/`,
+    gets a bucket of its own, so that the limit of one endpoint does not
+    change the pace of all the others.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, float],
+        endpoints: Mapping[str, str] | None = None,
+        per: float = 60.0,
+        state_dir: str | Path | None = None,
+    ):
+        """
+        Args:
+            limits: Calls allowed per period for each bucket name
+            endpoints: Bucket name for each `"METHOD /endpoint/"` key
+            per: Length of the period in seconds
+            state_dir: Directory to keep the bucket state in, to share the
+                limits between processes
+        """
+        self._endpoints = dict(endpoints or {})
+        self._per = per
+        self._state_dir = state_dir
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {
+            name: self._new_bucket(name, rate) for name, rate in limits.items()
+        }
+
+    def _new_bucket(self, name: str, rate: float) -> TokenBucket:
+        if self._state_dir is None:
+            return TokenBucket(rate, self._per)
+        filename = re.sub(r"\W+", "-", name).strip("-")
+        return FileTokenBucket(
+            Path(self._state_dir) / f"{filename}.json", rate, self._per
+        )
+
+    @classmethod
+    def for_readwise(cls, state_dir: str | Path | None = None) -> "RateLimiter":
+        """
+        Limiter for the Readwise API: 240 requests per minute, and 20 per
+        minute for the list endpoints that return a lot of data.
+
+        Args:
+            state_dir: Directory to keep the bucket state in
+        """
+        return cls(
+            {DEFAULT_BUCKET: 240, LIMITED_BUCKET: 20},
+            {
+                "GET /export/": LIMITED_BUCKET,
+                "GET /highlights/": LIMITED_BUCKET,
+                "GET /books/": LIMITED_BUCKET,
+            },
+            state_dir=state_dir,
+        )
+
+    @classmethod
+    def for_reader(cls, state_dir: str | Path | None = None) -> "RateLimiter":
+        """
+        Limiter for the Readwise Reader API: 20 requests per minute, and 50
+        per minute for saving documents.
+
+        Args:
+            state_dir: Directory to keep the bucket state in
+        """
+        return cls(
+            {DEFAULT_BUCKET: 20, "save": 50},
+            {"GET /list/": DEFAULT_BUCKET, "POST /save/": "save"},
+            state_dir=state_dir,
+        )
+
+    def bucket(
+        self, method: str, endpoint: str, name: str | None = None
+    ) -> TokenBucket:
+        """
+        Return the bucket used for a request.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            name: Use this bucket instead of looking up the endpoint
+        """
+        if name is None:
+            method = method.upper()
+            name = self._endpoints.get(f"{method} {endpoint}") or self._endpoints.get(
+                f"{method} {route(endpoint)}", DEFAULT_BUCKET
+            )
+        return self._buckets.get(name) or self._buckets[DEFAULT_BUCKET]
+
+    def update(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: int,
+        headers: Mapping,
+        name: str | None = None,
+    ):
+        """
+        Adapt the bucket of a request to the rate limit information sent by
+        the server.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            status_code: HTTP status code of the response
+            headers: Response headers
+            name: Bucket used instead of looking up the endpoint
+        """
+        bucket = self.bucket(method, endpoint, name)
+        if "X-RateLimit-Limit" in headers:
+            limit = float(headers["X-RateLimit-Limit"])
+            if limit != bucket.capacity:
+                bucket = self._set_limit(method, endpoint, name, limit)
+        if status_code == 429:
+            retry_after = _parse_retry_after(headers.get("Retry-After"))
+            bucket.pause(60.0 if retry_after is None else retry_after)
+
+    def _set_limit(
+        self, method: str, endpoint: str, name: str | None, limit: float
+    ) -> TokenBucket:
+        """Set the limit of the bucket of a request, return the bucket."""
+        with self._lock:
+            bucket = self.bucket(method, endpoint, name)
+            if bucket is not self._buckets[DEFAULT_BUCKET]:
+                bucket.set_rate(limit)
+                return bucket
+            key = name
+            if key in (None, DEFAULT_BUCKET):
+                # One bucket per route, not per ID in the path.
+                key = f"{method.upper()} {route(endpoint)}"
+                self._endpoints[key] = key
+            self._buckets[key] = bucket = self._new_bucket(key, limit)
+            return bucket
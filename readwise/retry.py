@@ -0,0 +1,232 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Collection, Literal
+
+import requests
+from requests.exceptions import ChunkedEncodingError
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of making a request while the circuit breaker is open."""
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Waits grow exponentially from `backoff` up to `max_backoff` seconds and
+    are drawn at random below that bound ("full jitter"), so that clients
+    failing at the same time do not retry in lockstep. A `Retry-After`
+    header is honoured instead when the server sends one.
+
+    Requests that are not idempotent, e.g. POST, are only retried when the
+    server cannot have acted on them: after a 429, or when the connection
+    could not be established. Pass `idempotent=True` to the request to retry
+    them like GET requests.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 8,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        jitter: bool = True,
+        deadline: float | None = None,
+        retry_statuses: Collection[int] = (429, 500, 502, 503, 504),
+        retry_exceptions: tuple[type[Exception], ...] = (
+            requests.ConnectionError,
+            requests.Timeout,
+            ChunkedEncodingError,
+        ),
+    ):
+        """
+        Args:
+            max_attempts: Maximum number of attempts per request, including
+                the first one
+            backoff: Upper bound of the wait before the first retry, doubled
+                for every following retry
+            max_backoff: Maximum upper bound of a wait
+            jitter: Wait a random time below the bound instead of the bound
+            deadline: Maximum number of seconds from the first attempt after
+                which no retry is started
+            retry_statuses: HTTP status codes that are retried
+            retry_exceptions: Exceptions of requests that are retried
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = retry_exceptions
+
+    @classmethod
+    def never(cls) -> "RetryPolicy":
+        """Return a policy that does not retry."""
+        return cls(max_attempts=1)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Return the wait before retrying after the failed attempt `attempt`.
+        """
+        bound = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return random.uniform(0, bound) if self.jitter else bound
+
+    def retryable(
+        self,
+        method: str,
+        response: requests.Response | None = None,
+        error: Exception | None = None,
+        idempotent: bool | None = None,
+    ) -> bool:
+        """
+        Return whether a failed attempt may be retried, ignoring the limits
+        on attempts and time.
+
+        Args:
+            method: HTTP method of the request
+            response: Response of the attempt
+            error: Exception raised by the attempt instead of a response
+            idempotent: Whether the request may be repeated, by default
+                whether the method is idempotent
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if response is not None:
+            if response.status_code not in self.retry_statuses:
+                return False
+            return idempotent or response.status_code == 429
+        if not isinstance(error, self.retry_exceptions):
+            return False
+        return idempotent or isinstance(error, requests.ConnectTimeout)
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        started: float,
+        response: requests.Response | None = None,
+        error: Exception | None = None,
+        idempotent: bool | None = None,
+    ) -> float | None:
+        """
+        Return how long to wait before retrying a failed attempt, or None
+        when it is not retried.
+
+        Args:
+            method: HTTP method of the request
+            attempt: Number of the failed attempt, starting at 1
+            started: `time.monotonic()` of the first attempt
+            response: Response of the attempt
+            error: Exception raised by the attempt instead of a response
+            idempotent: Whether the request may be repeated, by default
+                whether the method is idempotent
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not self.retryable(method, response, error, idempotent):
+            return None
+        delay = _retry_after(response)
+        if delay is None:
+            delay = self.backoff_delay(attempt)
+        if self.deadline is not None:
+            if time.monotonic() - started + delay > self.deadline:
+                return None
+        return delay
+
+
+def _retry_after(response: requests.Response | None) -> float | None:
+    """Return the seconds of the `Retry-After` header of a response."""
+    if response is None:
+        return None
+    return _parse_retry_after(response.headers.get("Retry-After"))
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds of a `Retry-After` header, in seconds or a date."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the API appears to be down.
+
+    After `failure_threshold` consecutive failures (server errors, timeouts
+    or connection errors) the circuit opens and requests raise
+    CircuitOpenError without being sent. After `reset_timeout` seconds one
+    trial request is let through; its success closes the circuit, its
+    failure opens it again. The same breaker can be passed to several
+    clients.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Number of consecutive failures that open the
+                circuit
+            reset_timeout: Seconds the circuit stays open before a trial
+                request is let through
+        """
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> Literal["closed", "open", "half-open"]:
+        """State of the circuit."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def before_request(self):
+        """
+        Raise CircuitOpenError unless a request may be sent.
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or while the trial
+                request of a half-open circuit is in flight
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial:
+                raise CircuitOpenError(
+                    f"Circuit open after {self._failures} failures, "
+                    f"retry in {max(remaining, 0):.0f} seconds"
+                )
+            self._trial = True
+
+    def record_success(self):
+        """Record a request that reached a healthy API."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        """Record a request that failed because of the API or the network."""
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
@@ -0,0 +1,522 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Generator
+
+from pydantic_core import to_json
+
+from readwise.models import (
+    CompactExportHighlight,
+    CompactExportResults,
+    ReadwiseExportHighlight,
+    ReadwiseExportResults,
+    ReadwiseReaderDocument,
+    ReadwiseSearchResult,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT,
+    category TEXT,
+    source TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    note TEXT,
+    highlighted_at TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    category TEXT,
+    location TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS book_tags (
+    book_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (book_id, name)
+);
+CREATE TABLE IF NOT EXISTS highlight_tags (
+    highlight_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (highlight_id, name)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    watermark TEXT
+);
+CREATE INDEX IF NOT EXISTS books_category ON books (category);
+CREATE INDEX IF NOT EXISTS highlights_book_id ON highlights (book_id);
+CREATE INDEX IF NOT EXISTS highlights_updated_at ON highlights (updated_at);
+CREATE INDEX IF NOT EXISTS book_tags_name ON book_tags (name);
+CREATE INDEX IF NOT EXISTS highlight_tags_name ON highlight_tags (name);
+CREATE INDEX IF NOT EXISTS documents_category ON documents (category);
+CREATE INDEX IF NOT EXISTS documents_updated_at ON documents (updated_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS highlights_fts USING fts5 (
+    text, note, content = 'highlights', content_rowid = 'id'
+);
+CREATE TRIGGER IF NOT EXISTS highlights_fts_insert AFTER INSERT ON highlights BEGIN
+    INSERT INTO highlights_fts (rowid, text, note)
+    VALUES (new.id, new.text, new.note);
+END;
+CREATE TRIGGER IF NOT EXISTS highlights_fts_delete AFTER DELETE ON highlights BEGIN
+    INSERT INTO highlights_fts (highlights_fts, rowid, text, note)
+    VALUES ('delete', old.id, old.text, old.note);
+END;
+CREATE TRIGGER IF NOT EXISTS highlights_fts_update AFTER UPDATE ON highlights BEGIN
+    INSERT INTO highlights_fts (highlights_fts, rowid, text, note)
+    VALUES ('delete', old.id, old.text, old.note);
+    INSERT INTO highlights_fts (rowid, text, note)
+    VALUES (new.id, new.text, new.note);
+END;
+"""
+
+
+def account_id(token: str) -> str:
+    """
+    Return a stable identifier for the account of a token, to keep the
+    local data of several accounts apart without storing the token.
+
+    Args:
+        token: Readwise API token
+    """
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def default_path(token: str, directory: str | Path) -> Path:
+    """
+    Return the default database path for the account of a token.
+
+    Args:
+        token: Readwise API token
+        directory: Directory of the databases, e.g. the app directory of
+            the command line interface
+    """
+    return Path(directory) / f"{account_id(token)}.sqlite3"
+
+
+def _match_query(query: str) -> str:
+    """
+    Return an FTS5 query matching every word of `query`, quoted as FTS5
+    strings so that punctuation like in `don't` or `c++` is not read as
+    query syntax. A trailing `*` of a word is kept as prefix search.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*") if prefix else word
+        term = '"' + word.replace('"', '""') + '"'
+        terms.append(term + "*" if prefix else term)
+    return " ".join(terms)
+
+
+def _to_json(model: Any, exclude: set[str] | None = None) -> str:
+    """
+    Serialize a pydantic model or a compact model, e.g. of a client with
+    `CompactModelBuilder`, to the same JSON.
+    """
+    return to_json(model, exclude=exclude).decode()
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    """
+    Return a time in UTC as ISO 8601, so that stored times compare as
+    strings. A naive time is taken as UTC, like the API does.
+    """
+    if not value:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+class LocalStore:
+    """
+    A local SQLite copy of the books, highlights and Reader documents of one
+    Readwise account.
+
+    Every row keeps the full model as JSON in its `data` column, next to the
+    indexed columns that are queried on, so queries can be answered without
+    the network.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        """
+        Args:
+            path: Path of the SQLite database file
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        has_index = self._connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'highlights_fts'"
+        ).fetchone()
+        self._connection.executescript(SCHEMA)
+        if not has_index:
+            # Index the highlights of a database created before the search
+            # index existed.
+            self._connection.execute(
+                "INSERT INTO highlights_fts (highlights_fts) VALUES ('rebuild')"
+            )
+            self._connection.commit()
+
+    @classmethod
+    def for_account(cls, token: str, directory: str | Path) -> "LocalStore":
+        """
+        Open the default database of the account of a token.
+
+        Args:
+            token: Readwise API token
+            directory: Directory of the databases
+        """
+        return cls(default_path(token, directory))
+
+    def upsert_book(self, book: ReadwiseExportResults | CompactExportResults):
+        """
+        Insert or update a book, without its highlights.
+
+        Args:
+            book: Book from the export
+        """
+        self._connection.execute(
+            """
+            INSERT INTO books (id, title, author, category, source, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                title = excluded.title,
+                author = excluded.author,
+                category = excluded.category,
+                source = excluded.source,
+                data = excluded.data
+            """,
+            (
+                book.user_book_id,
+                book.title,
+                book.author,
+                book.category,
+                book.source,
+                _to_json(book, exclude={"highlights"}),
+            ),
+        )
+        self._connection.execute(
+            "DELETE FROM book_tags WHERE book_id = ?", (book.user_book_id,)
+        )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO book_tags (book_id, name) VALUES (?, ?)",
+            [(book.user_book_id, tag.name) for tag in book.book_tags],
+        )
+
+    def upsert_highlight(
+        self, highlight: ReadwiseExportHighlight | CompactExportHighlight
+    ):
+        """
+        Insert or update a highlight.
+
+        Args:
+            highlight: Highlight from the export
+        """
+        self._connection.execute(
+            """
+            INSERT INTO highlights
+                (id, book_id, text, note, highlighted_at, updated_at, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                book_id = excluded.book_id,
+                text = excluded.text,
+                note = excluded.note,
+                highlighted_at = excluded.highlighted_at,
+                updated_at = excluded.updated_at,
+                data = excluded.data
+            """,
+            (
+                highlight.id,
+                highlight.book_id,
+                highlight.text,
+                highlight.note,
+                _isoformat(highlight.highlighted_at),
+                _isoformat(highlight.updated_at),
+                _to_json(highlight),
+            ),
+        )
+        self._connection.execute(
+            "DELETE FROM highlight_tags WHERE highlight_id = ?", (highlight.id,)
+        )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO highlight_tags (highlight_id, name) VALUES (?, ?)",
+            [(highlight.id, tag.name) for tag in highlight.tags],
+        )
+
+    def delete_highlight(self, highlight_id: int):
+        """
+        Delete a highlight.
+
+        Args:
+            highlight_id: Readwise highlight ID
+        """
+        self._connection.execute("DELETE FROM highlights WHERE id = ?", (highlight_id,))
+        self._connection.execute(
+            "DELETE FROM highlight_tags WHERE highlight_id = ?", (highlight_id,)
+        )
+
+    def upsert_document(self, document: ReadwiseReaderDocument):
+        """
+        Insert or update a Reader document.
+
+        Args:
+            document: Document from the Reader API
+        """
+        self._connection.execute(
+            """
+            INSERT INTO documents (id, category, location, updated_at, data)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                category = excluded.category,
+                location = excluded.location,
+                updated_at = excluded.updated_at,
+                data = excluded.data
+            """,
+            (
+                document.id,
+                document.category,
+                document.location,
+                _isoformat(document.updated_at),
+                _to_json(document),
+            ),
+        )
+
+    def books(
+        self, category: str | None = None
+    ) -> Generator[ReadwiseExportResults, None, None]:
+        """
+        Get the stored books, without their highlights.
+
+        Args:
+            category: Only books of this category
+        Yields:
+            ReadwiseExportResults objects
+        """
+        query = "SELECT data FROM books"
+        args = []
+        if category:
+            query += " WHERE category = ?"
+            args.append(category)
+        for (data,) in self._connection.execute(query + " ORDER BY id", args):
+            yield ReadwiseExportResults.model_validate_json(data)
+
+    def count_highlights(self) -> dict[int, int]:
+        """
+        Return the number of stored highlights per book ID.
+        """
+        return dict(
+            self._connection.execute(
+                "SELECT book_id, COUNT(*) FROM highlights GROUP BY book_id"
+            )
+        )
+
+    def highlights(
+        self,
+        book_ids: list[int] | None = None,
+        tag: str | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        highlighted_at_after: datetime | None = None,
+        highlighted_at_before: datetime | None = None,
+    ) -> Generator[ReadwiseExportHighlight, None, None]:
+        """
+        Get the stored highlights.
+
+        Args:
+            book_ids: Only highlights of these books
+            tag: Only highlights with this tag
+            updated_after: Only highlights updated after this time
+            updated_before: Only highlights updated before this time
+            highlighted_at_after: Only highlights created after this time
+            highlighted_at_before: Only highlights created before this time
+        Yields:
+            ReadwiseExportHighlight objects
+        """
+        conditions = []
+        args: list[Any] = []
+        if book_ids:
+            conditions.append(f"book_id IN ({', '.join('?' for _ in book_ids)})")
+            args.extend(book_ids)
+        if tag:
+            conditions.append(
+                "id IN (SELECT highlight_id FROM highlight_tags WHERE name = ?)"
+            )
+            args.append(tag)
+        for column, operator, value in (
+            ("updated_at", ">", updated_after),
+            ("updated_at", "<", updated_before),
+            ("highlighted_at", ">", highlighted_at_after),
+            ("highlighted_at", "<", highlighted_at_before),
+        ):
+            if value:
+                conditions.append(f"{column} {operator} ?")
+                args.append(_isoformat(value))
+
+        query = "SELECT data FROM highlights"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        for (data,) in self._connection.execute(query + " ORDER BY id", args):
+            yield ReadwiseExportHighlight.model_validate_json(data)
+
+    def tag_counts(self) -> dict[str, int]:
+        """
+        Return the number of stored highlights per tag name.
+        """
+        return dict(
+            self._connection.execute(
+                "SELECT name, COUNT(*) FROM highlight_tags GROUP BY name ORDER BY name"
+            )
+        )
+
+    def documents(
+        self,
+        category: str | None = None,
+        location: str | None = None,
+        updated_after: datetime | None = None,
+    ) -> Generator[ReadwiseReaderDocument, None, None]:
+        """
+        Get the stored Reader documents.
+
+        Args:
+            category: Only documents of this category
+            location: Only documents in this location
+            updated_after: Only documents updated after this time
+        Yields:
+            ReadwiseReaderDocument objects
+        """
+        conditions = []
+        args: list[Any] = []
+        if category:
+            conditions.append("category = ?")
+            args.append(category)
+        if location:
+            conditions.append("location = ?")
+            args.append(location)
+        if updated_after:
+            conditions.append("updated_at > ?")
+            args.append(_isoformat(updated_after))
+
+        query = "SELECT data FROM documents"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        for (data,) in self._connection.execute(query + " ORDER BY updated_at", args):
+            yield ReadwiseReaderDocument.model_validate_json(data)
+
+    def search(
+        self,
+        query: str,
+        tags: list[str] | None = None,
+        book_ids: list[int] | None = None,
+        limit: int = 20,
+        raw: bool = False,
+    ) -> list[ReadwiseSearchResult]:
+        """
+        Search the text and notes of the stored highlights.
+
+        Args:
+            query: Words that all have to match, `stoic*` matches by prefix
+            tags: Only highlights with one of these tags
+            book_ids: Only highlights of these books
+            limit: Maximum number of results
+            raw: Pass `query` unchanged as SQLite FTS5 query, e.g.
+                `"deep work" OR focus`
+        Returns:
+            ReadwiseSearchResult objects, best match first
+        Raises:
+            sqlite3.OperationalError: If a raw query is not valid FTS5
+        """
+        conditions = ["highlights_fts MATCH ?"]
+        args: list[Any] = [query if raw else _match_query(query)]
+        if book_ids:
+            conditions.append(
+                f"highlights.book_id IN ({', '.join('?' for _ in book_ids)})"
+            )
+            args.extend(book_ids)
+        if tags:
+            conditions.append(
+                "highlights.id IN (SELECT highlight_id FROM highlight_tags"
+                f" WHERE name IN ({', '.join('?' for _ in tags)}))"
+            )
+            args.extend(tags)
+        args.append(limit)
+
+        rows = self._connection.execute(
+            f"""
+            SELECT
+                highlights.data,
+                books.title,
+                bm25(highlights_fts),
+                snippet(highlights_fts, -1, '[', ']', '...', 16)
+            FROM highlights_fts
+            JOIN highlights ON highlights.id = highlights_fts.rowid
+            LEFT JOIN books ON books.id = highlights.book_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY bm25(highlights_fts)
+            LIMIT ?
+            """,
+            args,
+        )
+        return [
+            ReadwiseSearchResult(
+                highlight=ReadwiseExportHighlight.model_validate_json(data),
+                book_title=title,
+                rank=rank,
+                snippet=snippet,
+            )
+            for data, title, rank, snippet in rows
+        ]
+
+    def get_watermark(self, resource: str) -> str | None:
+        """
+        Return the latest `updated_at` seen for a resource.
+
+        Args:
+            resource: Name of the synced resource
+        """
+        row = self._connection.execute(
+            "SELECT watermark FROM sync_state WHERE resource = ?", (resource,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, resource: str, watermark: str | None):
+        """
+        Save the latest `updated_at` seen for a resource.
+
+        Args:
+            resource: Name of the synced resource
+            watermark: ISO 8601 timestamp
+        """
+        self._connection.execute(
+            """
+            INSERT INTO sync_state (resource, watermark) VALUES (?, ?)
+            ON CONFLICT (resource) DO UPDATE SET watermark = excluded.watermark
+            """,
+            (resource, watermark),
+        )
+
+    def commit(self):
+        """Commit the pending changes."""
+        self._connection.commit()
+
+    def close(self):
+        """Commit the pending changes and close the database."""
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
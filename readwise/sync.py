@@ -0,0 +1,217 @@
+import json
+import logging
+from datetime import datetime
+from typing import Generator, Optional
+
+from pydantic import BaseModel
+
+from readwise.api import Readwise, ReadwiseReader
+from readwise.models import ReadwiseExportResults, ReadwiseReaderDocument
+from readwise.store import LocalStore
+
+HIGHLIGHTS = "highlights"
+DOCUMENTS = "documents"
+
+
+class SyncResult(BaseModel):
+    """Represents the outcome of syncing one resource."""
+
+    resource: str
+    upserted: int = 0
+    deleted: int = 0
+    watermark: Optional[str] = None
+    cursor: Optional[str] = None
+
+
+def _drain(generator: Generator):
+    """Consume a generator and return its return value."""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as stop:
+            return stop.value
+
+
+class SyncEngine:
+    """
+    Keeps a LocalStore up to date with a Readwise account.
+
+    The latest `updated_at` seen for each resource is saved in the store. The
+    next sync only requests what changed after it and merges the changes
+    into the store.
+
+    A sync with a deadline that stops before the last page keeps the old
+    watermark and saves the cursor of the next page; the next sync with the
+    same watermark continues from there.
+    """
+
+    def __init__(
+        self,
+        store: LocalStore,
+        readwise: Readwise | None = None,
+        reader: ReadwiseReader | None = None,
+    ):
+        """
+        Args:
+            store: Local store to sync into
+            readwise: Readwise API client, to sync books and highlights
+            reader: Readwise Reader API client, to sync documents
+        """
+        self.store = store
+        self.readwise = readwise
+        self.reader = reader
+
+    def _resume_cursor(self, resource: str, watermark: str | None) -> str | None:
+        """Return the cursor saved by a sync stopped at its deadline."""
+        saved = self.store.get_watermark(f"{resource}.resume")
+        if not saved:
+            return None
+        state = json.loads(saved)
+        if state["watermark"] != watermark:
+            return None
+        logging.info(f'Continuing the {resource} sync at cursor "{state["cursor"]}"')
+        return state["cursor"]
+
+    def _save_cursor(self, resource: str, watermark: str | None, cursor: str | None):
+        """Save the cursor a sync stopped at, or clear it."""
+        state = {"watermark": watermark, "cursor": cursor} if cursor else None
+        self.store.set_watermark(
+            f"{resource}.resume", json.dumps(state) if state else None
+        )
+
+    def iter_highlights(
+        self, full: bool = False, deadline: float | None = None
+    ) -> Generator[ReadwiseExportResults, None, SyncResult]:
+        """
+        Sync books and highlights, yielding every exported book after it has
+        been merged into the store.
+
+        Highlights marked as deleted are removed from the store.
+
+        Args:
+            full: Ignore the saved watermark and export everything
+            deadline: Seconds after which the sync stops after the current
+                page
+        Yields:
+            ReadwiseExportResults objects holding the changed highlights
+        Returns:
+            A SyncResult, with the cursor of the next page if the sync
+            stopped at the deadline
+        """
+        watermark = None if full else self.store.get_watermark(HIGHLIGHTS)
+        logging.info(f'Syncing highlights updated after "{watermark}"')
+        result = SyncResult(resource=HIGHLIGHTS, watermark=watermark)
+        latest = datetime.fromisoformat(watermark) if watermark else None
+
+        books = iter(
+            self.readwise.export_highlights(
+                updated_after=watermark,
+                deadline=deadline,
+                page_cursor=self._resume_cursor(HIGHLIGHTS, watermark),
+            )
+        )
+        while True:
+            try:
+                book = next(books)
+            except StopIteration as stop:
+                result.cursor = stop.value
+                break
+            self.store.upsert_book(book)
+            for highlight in book.highlights:
+                if highlight.is_deleted:
+                    self.store.delete_highlight(highlight.id)
+                    result.deleted += 1
+                else:
+                    self.store.upsert_highlight(highlight)
+                    result.upserted += 1
+                if highlight.updated_at and (
+                    latest is None or highlight.updated_at > latest
+                ):
+                    latest = highlight.updated_at
+            yield book
+
+        self._save_cursor(HIGHLIGHTS, watermark, result.cursor)
+        if latest and not result.cursor:
+            result.watermark = latest.isoformat()
+            self.store.set_watermark(HIGHLIGHTS, result.watermark)
+        self.store.commit()
+        return result
+
+    def iter_documents(
+        self, full: bool = False, deadline: float | None = None
+    ) -> Generator[ReadwiseReaderDocument, None, SyncResult]:
+        """
+        Sync Reader documents, yielding every document after it has been
+        merged into the store.
+
+        Args:
+            full: Ignore the saved watermark and list everything
+            deadline: Seconds after which the sync stops after the current
+                page
+        Yields:
+            ReadwiseReaderDocument objects that changed
+        Returns:
+            A SyncResult, with the cursor of the next page if the sync
+            stopped at the deadline
+        """
+        watermark = None if full else self.store.get_watermark(DOCUMENTS)
+        logging.info(f'Syncing documents updated after "{watermark}"')
+        result = SyncResult(resource=DOCUMENTS, watermark=watermark)
+        latest = datetime.fromisoformat(watermark) if watermark else None
+
+        params = {"updatedAfter": watermark} if watermark else {}
+        documents = iter(
+            self.reader.get_documents(
+                params=params,
+                deadline=deadline,
+                page_cursor=self._resume_cursor(DOCUMENTS, watermark),
+            )
+        )
+        while True:
+            try:
+                document = next(documents)
+            except StopIteration as stop:
+                result.cursor = stop.value
+                break
+            self.store.upsert_document(document)
+            result.upserted += 1
+            if latest is None or document.updated_at > latest:
+                latest = document.updated_at
+            yield document
+
+        self._save_cursor(DOCUMENTS, watermark, result.cursor)
+        if latest and not result.cursor:
+            result.watermark = latest.isoformat()
+            self.store.set_watermark(DOCUMENTS, result.watermark)
+        self.store.commit()
+        return result
+
+    def sync_highlights(
+        self, full: bool = False, deadline: float | None = None
+    ) -> SyncResult:
+        """
+        Sync books and highlights.
+
+        Args:
+            full: Ignore the saved watermark and export everything
+            deadline: Seconds after which the sync stops after the current
+                page
+        Returns:
+            A SyncResult
+        """
+        return _drain(self.iter_highlights(full, deadline))
+
+    def sync_documents(
+        self, full: bool = False, deadline: float | None = None
+    ) -> SyncResult:
+        """
+        Sync Reader documents.
+
+        Args:
+            full: Ignore the saved watermark and list everything
+            deadline: Seconds after which the sync stops after the current
+                page
+        Returns:
+            A SyncResult
+        """
+        return _drain(self.iter_documents(full, deadline))
@@ -0,0 +1,496 @@
+import csv
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Generator, Iterable, Literal, Sequence
+
+# Column name and type of the flattened rows. The types are "int", "float",
+# "bool", "str", "timestamp" and "list" (a list of strings).
+HIGHLIGHT_COLUMNS = [
+    ("book_id", "int"),
+    ("book_title", "str"),
+    ("book_author", "str"),
+    ("book_category", "str"),
+    ("book_source", "str"),
+    ("book_source_url", "str"),
+    ("book_readwise_url", "str"),
+    ("book_tags", "list"),
+    ("id", "int"),
+    ("text", "str"),
+    ("note", "str"),
+    ("location", "int"),
+    ("location_type", "str"),
+    ("color", "str"),
+    ("highlighted_at", "timestamp"),
+    ("created_at", "timestamp"),
+    ("updated_at", "timestamp"),
+    ("url", "str"),
+    ("readwise_url", "str"),
+    ("tags", "list"),
+    ("is_favorite", "bool"),
+    ("is_discard", "bool"),
+]
+
+HIGHLIGHT_LIST_COLUMNS = [
+    ("id", "int"),
+    ("book_id", "int"),
+    ("text", "str"),
+    ("note", "str"),
+    ("location", "int"),
+    ("location_type", "str"),
+    ("color", "str"),
+    ("highlighted_at", "timestamp"),
+    ("updated", "timestamp"),
+    ("url", "str"),
+    ("tags", "list"),
+]
+
+BOOK_COLUMNS = [
+    ("id", "int"),
+    ("title", "str"),
+    ("author", "str"),
+    ("category", "str"),
+    ("source", "str"),
+    ("num_highlights", "int"),
+    ("last_highlight_at", "timestamp"),
+    ("updated", "timestamp"),
+    ("cover_image_url", "str"),
+    ("highlights_url", "str"),
+    ("source_url", "str"),
+    ("asin", "str"),
+    ("tags", "list"),
+    ("document_note", "str"),
+]
+
+DOCUMENT_COLUMNS = [
+    ("id", "str"),
+    ("url", "str"),
+    ("source_url", "str"),
+    ("title", "str"),
+    ("author", "str"),
+    ("source", "str"),
+    ("category", "str"),
+    ("location", "str"),
+    ("tags", "list"),
+    ("site_name", "str"),
+    ("word_count", "int"),
+    ("created_at", "timestamp"),
+    ("updated_at", "timestamp"),
+    ("published_date", "str"),
+    ("summary", "str"),
+    ("reading_progress", "float"),
+    ("parent_id", "str"),
+]
+
+Format = Literal["json", "ndjson", "table", "csv", "parquet", "arrow"]
+
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _get(record: Any, name: str) -> Any:
+    """Get a field of a model or of a raw API record."""
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def _tag_names(tags: Iterable) -> list[str]:
+    return [_get(tag, "name") for tag in tags or []]
+
+
+def flatten_export(book: Any) -> Generator[dict, None, None]:
+    """
+    Flatten an exported book into one row per highlight, with the book
+    metadata and tags repeated on every row.
+
+    Args:
+        book: ReadwiseExportResults, CompactExportResults or a raw `/export/`
+            record
+    Yields:
+        Rows with the HIGHLIGHT_COLUMNS
+    """
+    book_row = {
+        "book_id": _get(book, "user_book_id"),
+        "book_title": _get(book, "title"),
+        "book_author": _get(book, "author"),
+        "book_category": _get(book, "category"),
+        "book_source": _get(book, "source"),
+        "book_source_url": _get(book, "source_url"),
+        "book_readwise_url": _get(book, "readwise_url"),
+        "book_tags": _tag_names(_get(book, "book_tags")),
+    }
+    for highlight in _get(book, "highlights") or []:
+        row = dict(book_row)
+        for name, _ in HIGHLIGHT_COLUMNS[len(book_row) :]:
+            row[name] = _get(highlight, name)
+        row["tags"] = _tag_names(row["tags"])
+        yield row
+
+
+def flatten_highlight(highlight: Any) -> dict:
+    """
+    Flatten a highlight into a row.
+
+    Args:
+        highlight: ReadwiseHighlight, a stored ReadwiseExportHighlight or a raw
+            `/highlights/` record
+    Returns:
+        A row with the HIGHLIGHT_LIST_COLUMNS
+    """
+    row = {name: _get(highlight, name) for name, _ in HIGHLIGHT_LIST_COLUMNS}
+    row["tags"] = _tag_names(row["tags"])
+    if row["updated"] is None:
+        row["updated"] = _get(highlight, "updated_at")
+    return row
+
+
+def flatten_book(book: Any) -> dict:
+    """
+    Flatten a book into a row.
+
+    Args:
+        book: ReadwiseBook or a raw `/books/` record
+    Returns:
+        A row with the BOOK_COLUMNS
+    """
+    row = {name: _get(book, name) for name, _ in BOOK_COLUMNS}
+    row["tags"] = _tag_names(row["tags"])
+    return row
+
+
+def flatten_document(document: Any) -> dict:
+    """
+    Flatten a Reader document into a row.
+
+    Args:
+        document: ReadwiseReaderDocument or a raw Reader `/list/` record
+    Returns:
+        A row with the DOCUMENT_COLUMNS
+    """
+    row = {name: _get(document, name) for name, _ in DOCUMENT_COLUMNS}
+    row["tags"] = list(row["tags"] or {})
+    return row
+
+
+def select_columns(
+    columns: list[tuple[str, str]], fields: Sequence[str] | None = None
+) -> list[tuple[str, str]]:
+    """
+    Select columns by name.
+
+    Args:
+        columns: Column names and types, e.g. HIGHLIGHT_COLUMNS
+        fields: Names of the columns to keep, in the order to write them; all
+            columns when empty
+    Returns:
+        The selected column names and types
+    Raises:
+        ValueError: If a field is not one of the columns
+    """
+    if not fields:
+        return columns
+    kinds = dict(columns)
+    unknown = [name for name in fields if name not in kinds]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields {', '.join(unknown)}; " f"choose from {', '.join(kinds)}"
+        )
+    return [(name, kinds[name]) for name in fields]
+
+
+def _text(value: Any) -> Any:
+    """Convert a value for the text formats."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class RowWriter:
+    """
+    Writes rows with a fixed set of columns to a file.
+
+    Writers are context managers; leaving the context flushes the buffered
+    rows and closes files opened by the writer.
+    """
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        self.columns = columns
+        self.rows = 0
+
+    def write(self, row: dict):
+        """Write a row."""
+        raise NotImplementedError
+
+    def write_all(self, rows: Iterable[dict]) -> int:
+        """
+        Write rows.
+
+        Returns:
+            The number of rows written by the writer so far
+        """
+        for row in rows:
+            self.write(row)
+        return self.rows
+
+    def close(self):
+        """Flush the buffered rows and close the output."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Buffer:
+    """Collects text and writes it to a file in chunks of `size` characters."""
+
+    def __init__(self, file: IO[str], size: int = 1 << 16):
+        self._file = file
+        self._size = size
+        self._parts: list[str] = []
+        self._length = 0
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._length += len(text)
+        if self._length >= self._size:
+            self.flush()
+
+    def flush(self):
+        self._file.write("".join(self._parts))
+        self._file.flush()
+        self._parts, self._length = [], 0
+
+
+class _TextWriter(RowWriter):
+    def __init__(self, output: str | Path | IO[str], columns: list[tuple[str, str]]):
+        super().__init__(columns)
+        if str(output) == "-":
+            self._file, self._owns_file = sys.stdout, False
+        elif isinstance(output, (str, Path)):
+            self._file = open(output, "w", newline="", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self._file, self._owns_file = output, False
+        self._buffer = _Buffer(self._file)
+
+    def _values(self, row: dict) -> dict:
+        return {name: _text(row.get(name)) for name, _ in self.columns}
+
+    def close(self):
+        self._buffer.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+class NDJSONWriter(_TextWriter):
+    """Writes one compact JSON object per line."""
+
+    def write(self, row: dict):
+        self._buffer.write(_COMPACT.encode(self._values(row)) + "\n")
+        self.rows += 1
+
+
+class JSONWriter(_TextWriter):
+    """Writes one indented JSON object per row, for reading."""
+
+    def write(self, row: dict):
+        self._buffer.write(
+            json.dumps(self._values(row), ensure_ascii=False, indent=2) + "\n"
+        )
+        self.rows += 1
+
+
+class TableWriter(_TextWriter):
+    """
+    Writes an aligned text table.
+
+    The column widths are taken from the first `sample` rows, so that rows
+    can be written without keeping the whole output; longer values are cut.
+    """
+
+    def __init__(
+        self,
+        output: str | Path | IO[str],
+        columns: list[tuple[str, str]],
+        sample: int = 100,
+        max_width: int = 50,
+    ):
+        super().__init__(output, columns)
+        self._sample = sample
+        self._max_width = max_width
+        self._pending: list[list[str]] | None = []
+        self._widths: list[int] = []
+
+    def _cells(self, row: dict) -> list[str]:
+        cells = []
+        for name, kind in self.columns:
+            value = _text(row.get(name))
+            if value is None:
+                value = ""
+            elif kind == "list":
+                value = ", ".join(value)
+            cells.append(" ".join(str(value).split()))
+        return cells
+
+    def _line(self, cells: list[str]):
+        parts = []
+        for cell, width in zip(cells, self._widths):
+            if len(cell) > width:
+                cell = cell[: width - 1] + "…"
+            parts.append(cell.ljust(width))
+        self._buffer.write("  ".join(parts).rstrip() + "\n")
+
+    def _start(self):
+        header = [name for name, _ in self.columns]
+        self._widths = [
+            min(max(map(len, cells)), self._max_width)
+            for cells in zip(header, *self._pending)
+        ]
+        self._line(header)
+        self._line(["-" * width for width in self._widths])
+        for cells in self._pending:
+            self._line(cells)
+        self._pending = None
+
+    def write(self, row: dict):
+        if self._pending is None:
+            self._line(self._cells(row))
+        else:
+            self._pending.append(self._cells(row))
+            if len(self._pending) >= self._sample:
+                self._start()
+        self.rows += 1
+
+    def close(self):
+        if self._pending is not None:
+            self._start()
+        super().close()
+
+
+class CSVWriter(_TextWriter):
+    """Writes CSV with a header row; lists are joined with commas."""
+
+    def __init__(self, output: str | Path | IO[str], columns: list[tuple[str, str]]):
+        super().__init__(output, columns)
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, row: dict):
+        values = []
+        for name, kind in self.columns:
+            value = _text(row.get(name))
+            values.append(",".join(value) if kind == "list" and value else value)
+        self._writer.writerow(values)
+        self.rows += 1
+
+
+class ArrowWriter(RowWriter):
+    """
+    Writes Parquet or Arrow IPC files with pyarrow.
+
+    Rows are buffered by column and written as one row group or record batch
+    every `batch_size` rows, so memory use does not grow with the export.
+    """
+
+    def __init__(
+        self,
+        output: str | Path,
+        columns: list[tuple[str, str]],
+        file_format: Literal["parquet", "arrow"] = "parquet",
+        batch_size: int = 10_000,
+    ):
+        """
+        Args:
+            output: Path of the file to write
+            columns: Column names and types
+            file_format: "parquet" or "arrow" for the Arrow IPC file format
+            batch_size: Number of rows per row group or record batch
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError(
+                "Writing Parquet or Arrow files needs pyarrow: pip install pyarrow"
+            ) from error
+
+        super().__init__(columns)
+        self._pa = pa
+        self.batch_size = batch_size
+        types = {
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "bool": pa.bool_(),
+            "str": pa.string(),
+            "timestamp": pa.timestamp("us", tz="UTC"),
+            "list": pa.list_(pa.string()),
+        }
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._buffer: dict[str, list] = {name: [] for name, _ in columns}
+        self._buffered = 0
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(str(output), self.schema)
+        else:
+            self._writer = pa.ipc.new_file(str(output), self.schema)
+
+    def write(self, row: dict):
+        for name, kind in self.columns:
+            value = row.get(name)
+            if kind == "timestamp" and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            self._buffer[name].append(value)
+        self._buffered += 1
+        self.rows += 1
+        if self._buffered >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffered:
+            table = self._pa.Table.from_pydict(self._buffer, schema=self.schema)
+            self._writer.write_table(table)
+            self._buffer = {name: [] for name, _ in self.columns}
+            self._buffered = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_writer(
+    file_format: Format,
+    output: str | Path | IO[str],
+    columns: list[tuple[str, str]],
+    batch_size: int = 10_000,
+) -> RowWriter:
+    """
+    Return a writer for a file format.
+
+    Examples:
+        >>> with open_writer("parquet", "highlights.parquet", HIGHLIGHT_COLUMNS) as w:
+        ...     for book in client.export_highlights(raw=True):
+        ...         w.write_all(flatten_export(book))
+
+    Args:
+        file_format: "json", "ndjson", "table", "csv", "parquet" or "arrow"
+        output: Path of the file to write, "-" for stdout, or an open text
+            file for the text formats
+        columns: Column names and types, e.g. HIGHLIGHT_COLUMNS
+        batch_size: Number of rows per row group for Parquet and Arrow
+    """
+    if file_format == "json":
+        return JSONWriter(output, columns)
+    if file_format == "ndjson":
+        return NDJSONWriter(output, columns)
+    if file_format == "table":
+        return TableWriter(output, columns)
+    if file_format == "csv":
+        return CSVWriter(output, columns)
+    if file_format in ("parquet", "arrow"):
+        if str(output) == "-" or not isinstance(output, (str, Path)):
+            raise ValueError(f"Writing {file_format} needs an output path")
+        return ArrowWriter(output, columns, file_format, batch_size)
+    raise ValueError(f'Unknown format "{file_format}"')
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from readwise.models import ReadwiseExportHighlight, ReadwiseExportResults, ReadwiseTag
+
+
+@pytest.fixture
+def export_highlight():
+    """Return a factory of ReadwiseExportHighlight objects."""
+
+    def export_highlight(
+        id, book_id=1, tags=(), updated_at="2020-01-01T00:00:00+00:00", **kwargs
+    ):
+        return ReadwiseExportHighlight(
+            id=id,
+            text=f"Highlight {id}",
+            location=1,
+            location_type="page",
+            note="",
+            color="yellow",
+            highlighted_at=None,
+            created_at=None,
+            updated_at=datetime.fromisoformat(updated_at),
+            external_id=None,
+            book_id=book_id,
+            readwise_url="https://example.com/readwise",
+            tags=[ReadwiseTag(id=index, name=name) for index, name in enumerate(tags)],
+            **kwargs,
+        )
+
+    return export_highlight
+
+
+@pytest.fixture
+def export_book():
+    """Return a factory of ReadwiseExportResults objects."""
+
+    def export_book(id=1, category="books", highlights=()):
+        return ReadwiseExportResults(
+            user_book_id=id,
+            title=f"Book {id}",
+            author="Test Author",
+            readable_title=f"Book {id}",
+            source="Test Source",
+            cover_image_url="https://example.com/image.jpg",
+            unique_url=None,
+            category=category,
+            document_note=None,
+            summary=None,
+            readwise_url=f"https://readwise.io/bookreview/{id}",
+            source_url=None,
+            highlights=list(highlights),
+        )
+
+    return export_book
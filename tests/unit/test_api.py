@@ -1,9 +1,14 @@
 from datetime import datetime
+from threading import Thread
 from unittest.mock import Mock, patch
 
-from requests import Session
+import pytest
+from requests import ConnectionError, HTTPError, Session
+from requests.adapters import HTTPAdapter
 
 from readwise.api import Readwise, ReadwiseReader
+from readwise.models import ReadwiseHighlightCreate
+from readwise.retry import RetryPolicy
 
 readwise_client = Readwise("test_token")
 readwise_reader = ReadwiseReader("test_token")
@@ -13,6 +18,7 @@ readwise_reader = ReadwiseReader("test_token")
 def test_paging(mock_get):
     page1 = Mock()
     page1.status_code = 200
+    page1.headers = {}
     page1.json.return_value = {
         "next": "https://example.com/api/v2/books/?page=2",
         "results": [
@@ -25,6 +31,7 @@ def test_paging(mock_get):
 
     page2 = Mock()
     page2.status_code = 200
+    page2.headers = {}
     page2.json.return_value = {
         "next": None,
         "results": [
@@ -360,3 +367,271 @@ def test_get_highlights(mock_get):
     assert highlights[0].tags[0].name == "test_tag"
     assert highlights[0].tags[1].id == 2
     assert highlights[0].tags[1].name == "test_tag_2"
+
+
+def test_session_is_reused():
+    client = Readwise("test_token")
+    assert client._session is client._session
+    assert client._session.headers["Authorization"] == "Token test_token"
+
+
+def test_shared_adapter_is_not_closed():
+    adapter = HTTPAdapter(pool_maxsize=4)
+    with patch.object(adapter, "close") as mock_close:
+        with Readwise("token_1", adapter=adapter) as client_1:
+            assert client_1._session.get_adapter("https://readwise.io") is adapter
+        with ReadwiseReader("token_2", adapter=adapter) as client_2:
+            assert client_2._session.get_adapter("https://readwise.io") is adapter
+        mock_close.assert_not_called()
+
+
+@patch.object(Session, "request")
+def test_paging_concurrent(mock_get):
+    def get_page(method, url, params, json, **kwargs):
+        response = Mock(status_code=200, headers={})
+        page = params["page"]
+        response.json.return_value = {
+            "count": 5,
+            "next": f"page={page + 1}" if page < 3 else None,
+            "results": [{"id": page * 2 - 1}, {"id": page * 2}][: 5 - page * 2 + 2],
+        }
+        return response
+
+    mock_get.side_effect = get_page
+    client = Readwise("test_token", rate_limiter=False)
+    pages = list(client.get_pagination_limit_20("/books/", page_size=2, max_workers=3))
+    assert [book["id"] for page in pages for book in page["results"]] == [1, 2, 3, 4, 5]
+    assert mock_get.call_count == 3
+
+
+@patch.object(Session, "request")
+def test_create_highlights_in_batches(mock_request):
+    created = Mock(status_code=200, headers={})
+    created.json.return_value = [{"id": 1, "modified_highlights": [10, 11]}]
+    failed = Mock(status_code=400, headers={})
+    failed.raise_for_status.side_effect = HTTPError("400", response=failed)
+    mock_request.side_effect = [created, failed]
+
+    client = Readwise("test_token", rate_limiter=False)
+    result = client.create_highlights(
+        [
+            {"text": "one", "title": "Book"},
+            ReadwiseHighlightCreate(text="two", title="Book"),
+            {"text": "three", "title": "Book"},
+        ],
+        batch_size=2,
+    )
+    assert mock_request.call_count == 2
+    assert mock_request.call_args_list[0].kwargs["json"] == {
+        "highlights": [
+            {"text": "one", "title": "Book"},
+            {"text": "two", "title": "Book"},
+        ]
+    }
+    assert result.created_ids == [10, 11]
+    assert list(result.errors) == [2]
+
+    created.json.return_value = [{"id": 1, "modified_highlights": [12]}]
+    mock_request.side_effect = [created]
+    client.retry_failed_highlights(result)
+    assert result.created_ids == [10, 11, 12]
+    assert result.errors == {}
+
+
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_create_highlights_retries_server_errors(mock_request, mock_sleep):
+    failed = Mock(status_code=502, headers={})
+    failed.raise_for_status.side_effect = HTTPError("502", response=failed)
+    created = Mock(status_code=200, headers={})
+    created.json.return_value = [{"id": 1, "modified_highlights": [10]}]
+    mock_request.side_effect = [failed, ConnectionError(), created]
+
+    client = Readwise("test_token", rate_limiter=False)
+    result = client.create_highlights([{"text": "one", "title": "Book"}])
+    assert result.created_ids == [10]
+    assert mock_sleep.call_count == 2
+
+    # Batches are only retried by the RetryPolicy.
+    mock_request.side_effect = [failed, created]
+    client = Readwise("test_token", rate_limiter=False, retry=RetryPolicy.never())
+    result = client.create_highlights([{"text": "one", "title": "Book"}])
+    assert result.failed[0].status_code == 502
+    assert mock_request.call_count == 4
+
+
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_save_documents(mock_request, mock_sleep):
+    def save(method, url, params, json, **kwargs):
+        if json["url"] == "https://example.com/flaky" and mock_request.call_count == 1:
+            failed = Mock(status_code=503, headers={})
+            failed.raise_for_status.side_effect = HTTPError("503", response=failed)
+            return failed
+        if json["url"] == "https://example.com/bad":
+            failed = Mock(status_code=400, headers={})
+            failed.raise_for_status.side_effect = HTTPError("400", response=failed)
+            return failed
+        status_code = 200 if json["url"] == "https://example.com/old" else 201
+        return Mock(status_code=status_code, headers={}, **{"json.return_value": {}})
+
+    mock_request.side_effect = save
+    known = Mock(source_url="https://example.com/known")
+    store = Mock(**{"documents.return_value": [known]})
+
+    client = ReadwiseReader("test_token", rate_limiter=False)
+    result = client.save_documents(
+        [
+            "https://example.com/flaky",
+            {"url": "https://example.com/old", "tags": ["news"]},
+            "https://example.com/known",
+            "https://example.com/flaky",
+            "https://example.com/bad",
+        ],
+        max_workers=1,
+        store=store,
+    )
+    assert [r.status for r in result.results] == [
+        "created",
+        "exists",
+        "skipped",
+        "skipped",
+        "failed",
+    ]
+    assert result.counts == {"created": 1, "exists": 1, "skipped": 2, "failed": 1}
+    assert result.results[-1].status_code == 400
+    # The 503 is retried by the RetryPolicy, the 400 is not.
+    assert mock_request.call_count == 4
+    assert mock_sleep.call_count == 1
+
+
+@patch.object(Session, "request")
+def test_save_documents_without_store(mock_request):
+    mock_request.return_value = Mock(
+        status_code=200, headers={}, **{"json.return_value": {"id": "1"}}
+    )
+
+    client = ReadwiseReader("test_token", rate_limiter=False)
+    result = client.save_documents(
+        ["https://example.com/old", "https://example.com/old"], max_workers=1
+    )
+    assert [r.status for r in result.results] == ["exists", "skipped"]
+    # Saved URLs are not looked up by listing the whole library.
+    assert [call.kwargs["url"] for call in mock_request.call_args_list] == [
+        "https://readwise.io/api/v3/save/"
+    ]
+
+
+@patch.object(Session, "request")
+def test_raw_records(mock_get):
+    record = {"id": 1, "title": "Test Book", "author": "Test Author", "extra": True}
+    mock_get.return_value = Mock(status_code=200, headers={})
+    mock_get.return_value.json.return_value = {"next": None, "results": [record]}
+    client = Readwise("test_token", rate_limiter=False)
+
+    assert list(client.get_books("books", raw=True)) == [record]
+    assert list(client.get_books("books", fields=["id", "title", "missing"])) == [
+        {"id": 1, "title": "Test Book"}
+    ]
+
+
+@patch.object(Session, "request")
+def test_get_books_categories(mock_request):
+    def get_page(method, url, params, json, **kwargs):
+        category = params["category"]
+        # A book that is listed in two categories is yielded once.
+        ids = [1] if category == "articles" else [1, 2] if category == "books" else []
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {
+            "next": None,
+            "results": [{"id": id, "category": category} for id in ids],
+        }
+        return response
+
+    mock_request.side_effect = get_page
+    client = Readwise("test_token", rate_limiter=False)
+
+    books = list(client.get_books(["articles", "books"], raw=True))
+    assert sorted(book["id"] for book in books) == [1, 2]
+
+    list(client.get_books("all", raw=True))
+    categories = {c.kwargs["params"]["category"] for c in mock_request.call_args_list}
+    assert categories == {"articles", "books", "tweets", "podcasts", "supplementals"}
+
+
+@patch.object(Session, "request")
+def test_get_highlights_for_books(mock_request):
+    def get_page(method, url, params, json, **kwargs):
+        book_id = params["book_id"]
+        response = Mock(status_code=200 if book_id != 2 else 404, headers={})
+        if book_id == 2:
+            response.raise_for_status.side_effect = HTTPError("404", response=response)
+        response.json.return_value = {
+            "next": None,
+            "results": [{"id": book_id * 10, "book_id": book_id}],
+        }
+        return response
+
+    mock_request.side_effect = get_page
+    client = Readwise("test_token", rate_limiter=False)
+
+    results = dict(client.get_highlights_for_books([1, 2, 3], raw=True))
+    assert results[1] == [{"id": 10, "book_id": 1}]
+    assert results[3] == [{"id": 30, "book_id": 3}]
+    assert isinstance(results[2], HTTPError)
+
+    with pytest.raises(HTTPError):
+        list(client.get_highlights_for_books([2], return_exceptions=False))
+
+
+@patch.object(Session, "request")
+def test_prefetch_stops_when_closed(mock_request):
+    def get_page(method, url, params, json, **kwargs):
+        response = Mock(status_code=200, headers={})
+        page = params["page"]
+        response.json.return_value = {"next": f"page={page + 1}", "results": [page]}
+        return response
+
+    mock_request.side_effect = get_page
+    client = Readwise("test_token", rate_limiter=False)
+    threads = []
+
+    def start_thread(*args, **kwargs):
+        thread = Thread(*args, **kwargs)
+        threads.append(thread)
+        return thread
+
+    with patch("readwise.concurrency.Thread", side_effect=start_thread):
+        pages = client.get_pagination_limit_20("/books/", prefetch=2)
+        assert [next(pages)["results"] for _ in range(3)] == [[1], [2], [3]]
+    pages.close()
+    # The background thread stops after the pages buffered ahead and the
+    # request in flight.
+    assert len(threads) == 1
+    threads[0].join(timeout=5)
+    assert not threads[0].is_alive()
+    assert mock_request.call_count <= 3 + 2 + 1
+
+
+@patch.object(Session, "request")
+def test_export_deadline_and_timeout(mock_request):
+    def get_page(method, url, params, json, **kwargs):
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {
+            "nextPageCursor": None if params.get("pageCursor") else "cursor_2",
+            "results": [],
+        }
+        return response
+
+    mock_request.side_effect = get_page
+    client = Readwise("test_token", rate_limiter=False, timeout=(1, 2))
+
+    export = client.export_highlights(deadline=0)
+    with pytest.raises(StopIteration) as stop:
+        next(export)
+    assert stop.value.value == "cursor_2"
+    assert mock_request.call_count == 1
+    assert mock_request.call_args.kwargs["timeout"] == (1, 2)
+
+    assert list(client.export_highlights(page_cursor="cursor_2")) == []
+    assert mock_request.call_args.kwargs["params"] == {"pageCursor": "cursor_2"}
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+from requests import Session
+
+from readwise.async_api import AsyncReadwise, AsyncReadwiseReader
+from readwise.cache import DiskCache, ResponseCache
+from readwise.ratelimit import FileTokenBucket, RateLimiter
+
+
+async def collect(generator):
+    return [item async for item in generator]
+
+
+def page(data):
+    return MagicMock(status_code=200, headers={}, **{"json.return_value": data})
+
+
+@patch.object(Session, "request")
+def test_async_get_highlights_paging(mock_request):
+    highlight = {
+        "id": 1,
+        "text": "Test Highlight",
+        "note": "Test Note",
+        "location": 1,
+        "location_type": "page",
+        "highlighted_at": "2020-01-01T00:00:00Z",
+        "url": None,
+        "color": "yellow",
+        "updated": None,
+        "book_id": 1,
+        "tags": [{"id": 1, "name": "test_tag"}],
+    }
+    mock_request.side_effect = [
+        page({"next": "page=2", "results": [highlight]}),
+        page({"next": None, "results": [{**highlight, "id": 2}]}),
+    ]
+    client = AsyncReadwise("test_token")
+    highlights = asyncio.run(collect(client.get_highlights()))
+    assert [highlight.id for highlight in highlights] == [1, 2]
+    assert highlights[0].tags[0].name == "test_tag"
+    assert mock_request.call_args_list[1].kwargs["params"]["page"] == 2
+
+
+@patch.object(Session, "request")
+def test_async_get_documents_cursor(mock_request):
+    document = {
+        "id": "1",
+        "url": "https://example.com",
+        "source_url": "https://example.com",
+        "title": "Test",
+        "author": "Test Author",
+        "source": "Test Source",
+        "category": "article",
+        "location": "new",
+        "tags": {},
+        "site_name": "example.com",
+        "word_count": 10,
+        "created_at": "2020-01-01T00:00:00+00:00",
+        "updated_at": "2020-01-01T00:00:00+00:00",
+        "notes": "",
+        "published_date": "2020-01-01",
+        "summary": "",
+        "image_url": "",
+        "parent_id": None,
+        "reading_progress": 0.0,
+    }
+    mock_request.side_effect = [
+        page({"nextPageCursor": "abc", "results": [document]}),
+        page({"nextPageCursor": None, "results": [{**document, "id": "2"}]}),
+    ]
+    client = AsyncReadwiseReader("test_token")
+    documents = asyncio.run(collect(client.get_documents()))
+    assert [document.id for document in documents] == ["1", "2"]
+    assert mock_request.call_args_list[1].kwargs["params"]["pageCursor"] == "abc"
+
+
+@patch.object(Session, "request")
+def test_async_context_manager(mock_request):
+    mock_request.return_value = page({})
+
+    client = AsyncReadwise("test_token")
+
+    async def run():
+        async with client:
+            await client.add_tag("1", "test_tag")
+
+    with patch.object(client._client, "close") as mock_close:
+        asyncio.run(run())
+    mock_close.assert_called_once()
+    assert mock_request.call_args.kwargs["json"] == {"name": "test_tag"}
+
+
+@patch.object(Session, "request")
+def test_async_prefetch(mock_request):
+    mock_request.side_effect = [
+        page({"next": "page=2", "results": [{"id": 1}]}),
+        page({"next": None, "results": [{"id": 2}]}),
+    ]
+    client = AsyncReadwise("test_token")
+    books = asyncio.run(collect(client.get_books("books", raw=True, prefetch=2)))
+    assert books == [{"id": 1}, {"id": 2}]
+
+
+@patch.object(Session, "request")
+def test_async_limiter_and_cache_run_off_the_loop(mock_request, tmp_path):
+    mock_request.return_value = MagicMock(
+        status_code=200,
+        headers={},
+        content=b'{"id": 1}',
+        **{"json.return_value": {"id": 1}},
+    )
+    client = AsyncReadwise(
+        "test_token",
+        rate_limiter=RateLimiter.for_readwise(state_dir=tmp_path / "limits"),
+        cache=ResponseCache(DiskCache(tmp_path / "cache.sqlite3")),
+    )
+    on_loop = []
+
+    def recorded(function):
+        def record(*args, **kwargs):
+            on_loop.append(threading.current_thread() is threading.main_thread())
+            return function(*args, **kwargs)
+
+        return record
+
+    with patch.object(
+        FileTokenBucket, "reserve", recorded(FileTokenBucket.reserve)
+    ), patch.object(DiskCache, "get", recorded(DiskCache.get)), patch.object(
+        DiskCache, "set", recorded(DiskCache.set)
+    ):
+        assert asyncio.run(client.get("/review/")).json() == {"id": 1}
+    assert on_loop == [False, False, False]
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from readwise.builders import BulkModelBuilder, CompactModelBuilder, ModelBuilder
+from readwise.models import CompactTag
+
+HIGHLIGHT = {
+    "id": 1,
+    "text": "Test Highlight",
+    "note": "Test Note",
+    "location": 1,
+    "location_type": "page",
+    "highlighted_at": "2020-01-01T00:00:00Z",
+    "url": "https://example.com/highlight",
+    "color": "yellow",
+    "updated": None,
+    "book_id": 1,
+    "tags": [{"id": 1, "name": "test_tag"}],
+}
+
+EXPORT_RESULT = {
+    "user_book_id": 1,
+    "title": "Test Book",
+    "author": "Test Author",
+    "readable_title": "Test Book",
+    "source": "kindle",
+    "cover_image_url": "https://example.com/image.jpg",
+    "unique_url": None,
+    "category": "books",
+    "document_note": None,
+    "summary": None,
+    "readwise_url": "https://readwise.io/bookreview/1",
+    "source_url": None,
+    "book_tags": [{"id": 1, "name": "test_tag"}],
+    "highlights": [
+        {
+            "id": 1,
+            "text": "Test Highlight",
+            "location": 1,
+            "location_type": "page",
+            "note": "",
+            "color": "yellow",
+            "highlighted_at": "2020-01-01T00:00:00Z",
+            "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": None,
+            "external_id": None,
+            "book_id": 1,
+            "readwise_url": "https://readwise.io/open/1",
+            "tags": [{"id": 2, "name": "test_tag_2"}],
+            "is_favorite": True,
+        }
+    ],
+}
+
+
+def test_bulk_builder_matches_default_builder():
+    default, bulk = ModelBuilder(), BulkModelBuilder()
+    assert bulk.highlights([HIGHLIGHT]) == default.highlights([HIGHLIGHT])
+    assert bulk.export_results([EXPORT_RESULT]) == default.export_results(
+        [EXPORT_RESULT]
+    )
+    assert bulk.export_results([EXPORT_RESULT])[0].highlights[0].is_favorite
+
+
+def test_compact_builder_shares_tags():
+    builder = CompactModelBuilder()
+    first, second = builder.export_results([EXPORT_RESULT, EXPORT_RESULT])
+    highlight = first.highlights[0]
+    assert highlight.tags == (CompactTag(id=2, name="test_tag_2"),)
+    assert highlight.tags is second.highlights[0].tags
+    assert highlight.highlighted_at == datetime.fromisoformat("2020-01-01T00:00:00Z")
+    assert highlight.is_favorite
+    assert [h.id for h in builder.highlights([HIGHLIGHT])] == [1]
+
+
+def test_compact_builder_null_fields():
+    highlight = {
+        **EXPORT_RESULT["highlights"][0],
+        "location_type": None,
+        "color": None,
+        "highlighted_at": None,
+    }
+    book = {**EXPORT_RESULT, "source": None, "highlights": [highlight]}
+    builder = CompactModelBuilder()
+
+    (result,) = builder.export_results([book])
+    assert result.source is None
+    assert result.highlights[0].location_type is None
+    assert result.highlights[0].color is None
+    assert result.highlights[0].highlighted_at is None
+    (result,) = builder.highlights([{**HIGHLIGHT, "color": None}])
+    assert result.color is None
+
+
+def test_compact_builder_bounds_shared_tags():
+    builder = CompactModelBuilder(max_tag_lists=2)
+    for tag_id in range(10):
+        tags = [{"id": tag_id, "name": f"tag_{tag_id}"}]
+        builder.highlights([{**HIGHLIGHT, "tags": tags}])
+    assert list(builder._tags) == [((8, "tag_8"),), ((9, "tag_9"),)]
@@ -0,0 +1,120 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+from requests import Session
+
+from readwise.api import Readwise
+from readwise.cache import DiskCache, MemoryCache, ResponseCache
+
+
+def response(status_code=200, content=b"[]", headers=None):
+    return MagicMock(
+        status_code=status_code,
+        ok=status_code < 400,
+        content=content,
+        headers=headers or {},
+        **{"json.return_value": json.loads(content)},
+    )
+
+
+def cached_client(cache):
+    return Readwise("test_token", rate_limiter=False, cache=cache)
+
+
+@patch.object(Session, "request")
+def test_fresh_response_served_from_cache(mock_request):
+    mock_request.return_value = response(content=b'[{"id": 1, "name": "tag"}]')
+    client = cached_client(ResponseCache())
+
+    assert [tag.name for tag in client.get_book_tags("1")] == ["tag"]
+    assert [tag.name for tag in client.get_book_tags("1")] == ["tag"]
+    assert mock_request.call_count == 1
+
+
+@patch.object(Session, "request")
+def test_stale_response_revalidated(mock_request):
+    cache = ResponseCache(ttls={"/review/": 0})
+    client = cached_client(cache)
+
+    mock_request.return_value = response(content=b"{}", headers={"ETag": '"v1"'})
+    client.get("/review/")
+    mock_request.return_value = response(status_code=304)
+    assert client.get("/review/").content == b"{}"
+    assert mock_request.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@patch.object(Session, "request")
+def test_not_modified_after_eviction(mock_request):
+    cache = ResponseCache(ttls={"/review/": 0})
+    client = cached_client(cache)
+
+    mock_request.return_value = response(content=b"{}", headers={"ETag": '"v1"'})
+    client.get("/review/")
+
+    def evicted(*args, **kwargs):
+        # The entry is evicted while the conditional request is in flight.
+        cache.clear()
+        return response(status_code=304)
+
+    mock_request.side_effect = evicted
+    assert client.get("/review/").content == b"{}"
+    assert mock_request.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+
+@patch.object(Session, "request")
+def test_cache_shared_between_accounts(mock_request, tmp_path):
+    cache = ResponseCache(DiskCache(tmp_path / "cache.sqlite3"))
+    first = Readwise("first_token", rate_limiter=False, cache=cache)
+    second = Readwise("second_token", rate_limiter=False, cache=cache)
+
+    mock_request.return_value = response(content=b'[{"id": 1, "name": "first"}]')
+    assert [tag.name for tag in first.get_book_tags("1")] == ["first"]
+    mock_request.return_value = response(content=b'[{"id": 2, "name": "second"}]')
+    assert [tag.name for tag in second.get_book_tags("1")] == ["second"]
+    assert [tag.name for tag in first.get_book_tags("1")] == ["first"]
+    assert mock_request.call_count == 2
+
+    # A change by one account keeps the responses of the other.
+    mock_request.return_value = response()
+    second.add_tag("1", "new_tag")
+    first.get_book_tags("1")
+    assert mock_request.call_count == 3
+
+
+@patch.object(Session, "request")
+def test_write_invalidates_collection(mock_request):
+    cache = ResponseCache()
+    client = cached_client(cache)
+
+    mock_request.return_value = response()
+    client.get("/books/1/tags/")
+    client.get("/books/2/tags/")
+    client.add_tag("1", "new_tag")
+    client.get("/books/1/tags/")
+    client.get("/books/2/tags/")
+    assert mock_request.call_count == 4
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    responses = ResponseCache(cache, default_ttl=60)
+    for path in ("/a/", "/b/"):
+        responses.store("https://example.com" + path, {}, response())
+    responses.lookup("https://example.com/a/", {})
+    responses.store("https://example.com/c/", {}, response())
+    assert responses.lookup("https://example.com/a/", {}) is not None
+    assert responses.lookup("https://example.com/b/", {}) is None
+
+
+def test_disk_cache_bounded_by_size(tmp_path):
+    responses = ResponseCache(
+        DiskCache(tmp_path / "cache.sqlite3", max_bytes=10), default_ttl=60
+    )
+    responses.store("https://example.com/a/", {}, response(content=b"123456"))
+    time.sleep(0.01)
+    responses.store("https://example.com/b/", {}, response(content=b"123456"))
+    assert responses.lookup("https://example.com/a/", {}) is None
+    entry = responses.lookup("https://example.com/b/", {})
+    assert entry.to_response().content == b"123456"
+    assert entry.fresh
@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+from requests import Session
+
+from readwise.api import Readwise
+from readwise.checkpoint import (
+    CheckpointMismatchError,
+    ExportCheckpoint,
+    JSONCheckpointStore,
+)
+from readwise.cli import cli
+from readwise.store import account_id
+
+
+def export_page(cursor, user_book_id):
+    response = Mock(status_code=200, headers={})
+    response.json.return_value = {
+        "nextPageCursor": cursor,
+        "results": [
+            {
+                "user_book_id": user_book_id,
+                "title": "Test Book",
+                "author": "Test Author",
+                "readable_title": "Test Book",
+                "source": "Test Source",
+                "cover_image_url": "https://example.com/image.jpg",
+                "unique_url": None,
+                "book_tags": [],
+                "category": "article",
+                "document_note": None,
+                "summary": None,
+                "readwise_url": "https://example.com/readwise",
+                "source_url": None,
+                "highlights": [],
+            }
+        ],
+    }
+    return response
+
+
+def test_checkpoint_store_roundtrip(tmp_path):
+    store = JSONCheckpointStore(tmp_path / "export.json")
+    assert store.load() is None
+    store.save(ExportCheckpoint(params={"ids": "1"}, page_cursor="abc"))
+    assert store.load() == ExportCheckpoint(params={"ids": "1"}, page_cursor="abc")
+    store.clear()
+    assert store.load() is None
+
+
+@patch.object(Session, "request")
+def test_export_resumes_from_checkpoint(mock_request, tmp_path):
+    store = JSONCheckpointStore(tmp_path / "export.json")
+    client = Readwise("test_token", rate_limiter=False)
+
+    mock_request.side_effect = [export_page("cursor_2", 1), export_page(None, 2)]
+    export = client.export_highlights(updated_after="2020-01-01", checkpoint=store)
+    assert next(export).user_book_id == 1
+    assert store.load().page_cursor is None
+    # The first page is done once the second one is requested.
+    assert next(export).user_book_id == 2
+    export.close()
+    assert store.load().page_cursor == "cursor_2"
+    assert not store.load().completed
+
+    mock_request.side_effect = [export_page(None, 2)]
+    books = list(client.export_highlights(checkpoint=store, resume=True))
+    assert [book.user_book_id for book in books] == [2]
+    params = mock_request.call_args.kwargs["params"]
+    assert params == {"updatedAfter": "2020-01-01", "pageCursor": "cursor_2"}
+    checkpoint = store.load()
+    assert checkpoint.completed
+    assert checkpoint.updated_after == checkpoint.started_at.isoformat()
+
+
+@patch.object(Session, "request")
+def test_resume_refuses_mismatched_checkpoint(mock_request, tmp_path):
+    store = JSONCheckpointStore(tmp_path / "export.json")
+    store.save(
+        ExportCheckpoint(
+            account=account_id("other_token"),
+            params={"ids": "1"},
+            page_cursor="cursor_2",
+            started_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+    client = Readwise("test_token", rate_limiter=False)
+
+    with pytest.raises(CheckpointMismatchError, match="another account"):
+        next(client.export_highlights(checkpoint=store, resume=True))
+
+    store.save(
+        ExportCheckpoint(
+            account=account_id("test_token"),
+            params={"ids": "1"},
+            page_cursor="cursor_2",
+            started_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+    with pytest.raises(CheckpointMismatchError, match="parameters"):
+        next(client.export_highlights(ids=["2"], checkpoint=store, resume=True))
+
+    mock_request.side_effect = [export_page(None, 1)]
+    books = list(client.export_highlights(ids=["1"], checkpoint=store, resume=True))
+    assert [book.user_book_id for book in books] == [1]
+    assert mock_request.call_args.kwargs["params"] == {
+        "ids": "1",
+        "pageCursor": "cursor_2",
+    }
+
+
+@patch.object(Session, "request")
+def test_cli_checkpoint_per_account(mock_request, tmp_path, monkeypatch):
+    monkeypatch.setattr("click.get_app_dir", lambda name: str(tmp_path))
+    path = tmp_path / f"export-{account_id('test_token')}.json"
+    JSONCheckpointStore(path).save(
+        ExportCheckpoint(
+            account=account_id("test_token"),
+            params={"ids": "1"},
+            page_cursor="cursor_2",
+            started_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+
+    result = CliRunner().invoke(
+        cli,
+        ["highlights", "export", "--resume", "-b", "2", "-t", "test_token"],
+    )
+    assert result.exit_code == 2
+    assert "was started with the parameters" in result.output
+    mock_request.assert_not_called()
+
+    mock_request.side_effect = [export_page(None, 1)]
+    result = CliRunner().invoke(
+        cli, ["highlights", "export", "--resume", "-t", "other_token", "-f", "json"]
+    )
+    assert result.exit_code == 0
+    assert (tmp_path / f"export-{account_id('other_token')}.json").exists()
+    assert JSONCheckpointStore(path).load().page_cursor == "cursor_2"
+
+
+@patch.object(Session, "request")
+def test_cli_export_without_checkpoint(mock_request, tmp_path, monkeypatch):
+    monkeypatch.setattr("click.get_app_dir", lambda name: str(tmp_path))
+    mock_request.side_effect = [export_page(None, 1)]
+
+    result = CliRunner().invoke(
+        cli, ["highlights", "export", "-t", "test_token", "-f", "json"]
+    )
+    assert result.exit_code == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+@patch.object(Session, "request")
+def test_cli_incremental_rejects_export_options(mock_request):
+    result = CliRunner().invoke(
+        cli,
+        ["highlights", "export", "-i", "-b", "1", "--stream", "-t", "test_token"],
+    )
+    assert result.exit_code == 2
+    assert "--incremental cannot be combined with --book_ids, --stream" in (
+        result.output
+    )
+    mock_request.assert_not_called()
@@ -1,6 +1,15 @@
+import threading
+from itertools import count
+from unittest.mock import MagicMock, patch
+
+import pytest
 from click.testing import CliRunner
 
-from readwise.cli import cli
+from readwise.api import Readwise, ReadwiseReader
+from readwise.cli import cli, write_rows
+from readwise.concurrency import read_ahead
+from readwise.models import ReadwiseBulkCreateResult
+from readwise.store import LocalStore
 
 
 def test_version():
@@ -9,3 +18,70 @@ def test_version():
         result = runner.invoke(cli, ["--version"])
         assert result.exit_code == 0
         assert result.output.startswith("cli, version ")
+
+
+@patch.object(Readwise, "create_highlights")
+def test_import_highlights_csv(mock_create, tmp_path):
+    rows = []
+
+    def create_highlights(highlights, batch_size):
+        rows.extend(highlights)
+        return ReadwiseBulkCreateResult()
+
+    mock_create.side_effect = create_highlights
+    path = tmp_path / "highlights.csv"
+    path.write_text("text,title,note\none,Book,\ntwo,Book,a note\n")
+    result = CliRunner().invoke(cli, ["highlights", "import", str(path), "-t", "token"])
+    assert result.exit_code == 0
+    assert rows == [
+        {"text": "one", "title": "Book"},
+        {"text": "two", "title": "Book", "note": "a note"},
+    ]
+
+
+@patch("readwise.cli.open_writer")
+def test_write_rows_failure_stops_prefetch(mock_open_writer):
+    closed = threading.Event()
+
+    def pages():
+        try:
+            yield from count()
+        finally:
+            closed.set()
+
+    def write_all(rows):
+        next(rows)
+        # The prefetching thread must not keep the interpreter alive.
+        assert all(
+            thread.daemon
+            for thread in threading.enumerate()
+            if thread is not threading.main_thread()
+        )
+        raise OSError("No space left on device")
+
+    writer = MagicMock()
+    writer.__enter__.return_value = writer
+    writer.write_all.side_effect = write_all
+    mock_open_writer.return_value = writer
+
+    rows = ({"id": page} for page in read_ahead(pages(), 2))
+    with pytest.raises(OSError):
+        write_rows(rows, [("id", "int")], ["id"], "ndjson", None, None)
+
+    assert closed.is_set()
+
+
+@patch.object(ReadwiseReader, "iter_save_documents", return_value=iter([]))
+def test_reader_save_uses_synced_store(mock_save, tmp_path, monkeypatch):
+    path = tmp_path / "readwise.sqlite3"
+    monkeypatch.setattr("readwise.store.default_path", lambda token, directory: path)
+    args = ["reader", "save", "-t", "token"]
+
+    result = CliRunner().invoke(cli, args, input="https://example.com\n")
+    assert result.exit_code == 0
+    assert mock_save.call_args.kwargs["store"] is None
+
+    LocalStore(path).close()
+    result = CliRunner().invoke(cli, args, input="https://example.com\n")
+    assert result.exit_code == 0
+    assert isinstance(mock_save.call_args.kwargs["store"], LocalStore)
@@ -0,0 +1,130 @@
+import json
+from unittest.mock import Mock, patch
+
+from requests import Session
+
+from readwise.api import Readwise
+from readwise.hooks import (
+    HookList,
+    Hooks,
+    PageEvent,
+    RequestEvent,
+    StatsCollector,
+    route,
+)
+from readwise.retry import RetryPolicy
+
+
+def page(results, status_code=200, next_page=None):
+    data = {"count": len(results), "next": next_page, "results": results}
+    content = json.dumps(data).encode()
+    return Mock(
+        status_code=status_code,
+        headers={},
+        content=content,
+        json=Mock(return_value=data),
+    )
+
+
+def book(book_id):
+    return {
+        "id": book_id,
+        "title": "Test Book",
+        "author": "Test Author",
+        "category": "books",
+        "source": "kindle",
+        "num_highlights": 1,
+        "last_highlight_at": "2024-01-01T00:00:00Z",
+        "updated": "2024-01-01T00:00:00Z",
+        "cover_image_url": "https://example.com/image.jpg",
+        "highlights_url": "https://example.com/highlights",
+        "source_url": "https://example.com",
+        "asin": "",
+        "tags": [],
+        "document_note": "",
+    }
+
+
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_stats_collector(mock_request, mock_sleep):
+    responses = [
+        page([], status_code=503),
+        page([book(1), book(2)], next_page="page_2"),
+        page([book(3)]),
+    ]
+    mock_request.side_effect = responses
+    stats = StatsCollector()
+    client = Readwise(
+        "test_token",
+        rate_limiter=False,
+        retry=RetryPolicy(jitter=False),
+        hooks=stats,
+    )
+
+    books = list(client.get_books("books"))
+
+    assert len(books) == 3
+    summary = stats.summary()
+    assert summary["requests"] == 3
+    assert summary["retries"] == 1
+    assert summary["statuses"] == {"200": 2, "503": 1}
+    assert summary["backoff_seconds"] == 1.0
+    assert summary["pages"] == 2
+    assert summary["records"] == 3
+    assert summary["bytes_received"] == sum(len(r.content) for r in responses)
+    assert summary["latency"]["/books/"]["count"] == 3
+    assert summary["build_seconds"] > 0
+    assert "/books/: 3 requests" in stats.format()
+
+
+def test_latency_percentiles():
+    stats = StatsCollector()
+    for elapsed in range(1, 101):
+        event = RequestEvent("GET", f"/books/{elapsed}/tags/", 1, 0.0)
+        event.status, event.elapsed = 200, elapsed / 1000
+        stats.request_finished(event)
+
+    latency = stats.latency("/books/1/tags/")
+    assert latency["count"] == 100
+    assert latency["p50"] == 0.05
+    assert latency["p99"] == 0.099
+    assert latency["max"] == 0.1
+    assert stats.latency("/highlights/") == {"count": 0}
+    assert route("/highlights/123") == "/highlights/{id}"
+
+
+def test_hook_errors_are_isolated(caplog):
+    class Broken(Hooks):
+        def page_received(self, event):
+            raise ValueError("broken")
+
+    stats = StatsCollector()
+    hooks = HookList([Broken(), stats])
+
+    hooks.page_received(PageEvent("/export/", 10, 1000, 0.1))
+
+    assert stats.records == 10
+    assert "Error in hook" in caplog.text
+
+
+@patch.object(Session, "request")
+def test_streamed_pages_are_reported(mock_request):
+    bodies = [
+        json.dumps({"nextPageCursor": "cursor_2", "results": [{"id": 1}]}).encode(),
+        json.dumps(
+            {"nextPageCursor": None, "results": [{"id": 2}, {"id": 3}]}
+        ).encode(),
+    ]
+    mock_request.side_effect = [
+        Mock(status_code=200, headers={}, iter_content=lambda size, body=body: [body])
+        for body in bodies
+    ]
+    stats = StatsCollector()
+    client = Readwise("test_token", rate_limiter=False, hooks=stats)
+
+    assert len(list(client.export_highlights(stream=True, raw=True))) == 3
+
+    assert stats.pages == 2
+    assert stats.records == 3
+    assert stats.bytes_received == sum(map(len, bodies))
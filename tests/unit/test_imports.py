@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["requests", "pydantic", "sqlite3", "readwise.api", "readwise.models"]
+
+
+def loaded_modules(code: str) -> set[str]:
+    """Run `code` in a new interpreter and return the heavy modules it loaded."""
+    script = f"{code}\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split()) & set(HEAVY)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import readwise",
+        "import readwise.cli",
+        "from readwise.cli import cli\ntry:\n    cli(['--help'])\nexcept SystemExit:\n    pass",
+        "from readwise.cli import cli\ntry:\n    cli(['books', 'list', '--help'])\n"
+        "except SystemExit:\n    pass",
+    ],
+)
+def test_startup_does_not_import_clients(code):
+    assert loaded_modules(code) == set()
+
+
+def test_clients_are_imported_on_use():
+    assert loaded_modules("from readwise import Readwise") >= {
+        "requests",
+        "readwise.api",
+    }
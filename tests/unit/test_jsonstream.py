@@ -0,0 +1,107 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from requests import Session
+from requests.exceptions import ChunkedEncodingError, ConnectionError
+
+from readwise.api import Readwise
+from readwise.jsonstream import iter_array
+
+
+def parse(document: bytes, chunk_size: int):
+    chunks = [
+        document[start : start + chunk_size]
+        for start in range(0, len(document), chunk_size)
+    ]
+    items = []
+    results = iter_array(chunks)
+    while True:
+        try:
+            items.append(next(results))
+        except StopIteration as stop:
+            return items, stop.value
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_iter_array(chunk_size):
+    results = [
+        {
+            "id": 1,
+            "text": 'Brackets ]}{[ and "quotes" in a string, ünïcödé',
+            "highlights": [{"id": 10, "tags": [{"id": 1, "name": "a"}]}],
+        },
+        {"id": 2, "highlights": []},
+    ]
+    document = {"count": 12345, "results": results, "nextPageCursor": "abc"}
+
+    items, rest = parse(json.dumps(document).encode(), chunk_size)
+    assert items == results
+    assert rest == {"count": 12345, "results": [], "nextPageCursor": "abc"}
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b'{"results": [1.', b"5]}"],
+        [b'{"results": [1', b".5]}"],
+        [b'{"results": [1.5e', b"-3, -", b"2]}"],
+    ],
+)
+def test_iter_array_split_number(chunks):
+    results = iter_array(chunks)
+    assert list(results) == json.loads(b"".join(chunks))["results"]
+
+
+def test_iter_array_truncated_document():
+    with pytest.raises(json.JSONDecodeError):
+        parse(b'{"results": [{"id": 1}, {"id"', 4)
+
+
+def book(user_book_id):
+    return {
+        "user_book_id": user_book_id,
+        "title": "Test Book",
+        "author": "Test Author",
+        "readable_title": "Test Book",
+        "source": "Test Source",
+        "cover_image_url": "https://example.com/image.jpg",
+        "unique_url": None,
+        "book_tags": [],
+        "category": "article",
+        "document_note": None,
+        "summary": None,
+        "readwise_url": "https://example.com/readwise",
+        "source_url": None,
+        "highlights": [],
+    }
+
+
+def streamed_page(cursor, books, broken=None):
+    body = json.dumps({"nextPageCursor": cursor, "results": books}).encode()
+    middle = len(body) // 2
+
+    def iter_content(chunk_size):
+        yield body[:middle]
+        if broken:
+            raise broken()
+        yield body[middle:]
+
+    return Mock(status_code=200, headers={}, iter_content=iter_content)
+
+
+@pytest.mark.parametrize("error", [ChunkedEncodingError, ConnectionError])
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_streamed_export(mock_request, mock_sleep, error):
+    mock_request.side_effect = [
+        streamed_page("cursor_2", [book(1), book(2)], broken=error),
+        streamed_page("cursor_2", [book(1), book(2)]),
+        streamed_page(None, [book(3)]),
+    ]
+    client = Readwise("test_token", rate_limiter=False)
+
+    books = list(client.export_highlights(stream=True))
+    assert [book.user_book_id for book in books] == [1, 2, 3]
+    assert mock_request.call_args_list[0].kwargs["stream"]
+    assert mock_request.call_args.kwargs["params"] == {"pageCursor": "cursor_2"}
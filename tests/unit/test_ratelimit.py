@@ -0,0 +1,123 @@
+import asyncio
+import time
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import Session
+
+from readwise.api import Readwise
+from readwise.ratelimit import FileTokenBucket, RateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=2, per=1)
+    with patch.object(bucket, "_now", return_value=bucket._updated):
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5
+        assert bucket.reserve() == 1.0
+
+
+def test_bucket_pause():
+    bucket = TokenBucket(rate=60)
+    with patch.object(bucket, "_now", return_value=bucket._updated):
+        bucket.pause(30)
+        assert bucket.reserve() == pytest.approx(30)
+
+
+def test_bucket_acquire_async():
+    bucket = TokenBucket(rate=60)
+    assert asyncio.run(bucket.acquire_async()) == 0
+
+
+def test_file_bucket_shares_state(tmp_path):
+    first = FileTokenBucket(tmp_path / "bucket.json", rate=1, per=60)
+    second = FileTokenBucket(tmp_path / "bucket.json", rate=1, per=60)
+    assert first.reserve() == 0
+    assert second.reserve() > 50
+
+
+def test_file_bucket_shares_rate(tmp_path):
+    first = FileTokenBucket(tmp_path / "bucket.json", rate=60, per=60)
+    second = FileTokenBucket(tmp_path / "bucket.json", rate=60, per=60)
+    first.set_rate(30)
+    second.reserve()
+    assert (second.capacity, second.rate) == (30, 0.5)
+
+
+@pytest.mark.parametrize("state_dir", [None, "state"])
+def test_limit_header_updates_endpoint_bucket(tmp_path, state_dir):
+    if state_dir:
+        state_dir = tmp_path / state_dir
+    limiter = RateLimiter.for_readwise(state_dir=state_dir)
+    headers = {"X-RateLimit-Limit": "10"}
+
+    limiter.update("GET", "/review/", 200, headers)
+    assert limiter.bucket("GET", "/review/").capacity == 10
+    assert limiter.bucket("POST", "/highlights/").capacity == 240
+    limiter.update("GET", "/export/", 200, headers)
+    assert limiter.bucket("GET", "/export/").capacity == 10
+    assert limiter.bucket("GET", "/books/").capacity == 10
+
+    reader = RateLimiter.for_reader(state_dir=state_dir)
+    reader.update("GET", "/list/", 429, headers, "limited")
+    assert reader.bucket("GET", "/list/", "limited").capacity == 10
+    assert reader.bucket("GET", "/list/", "limited").reserve() > 50
+    assert reader.bucket("GET", "/list/").capacity == 20
+
+
+def test_limit_header_splits_bucket_per_route(tmp_path):
+    limiter = RateLimiter.for_readwise(state_dir=tmp_path)
+    headers = {"X-RateLimit-Limit": "10"}
+
+    limiter.update("GET", "/books/1/tags/", 200, headers)
+    limiter.update("GET", "/books/2/tags/", 200, headers)
+    bucket = limiter.bucket("GET", "/books/3/tags/")
+    assert bucket is limiter.bucket("GET", "/books/1/tags/")
+    assert bucket.capacity == 10
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "GET-books-id-tags.json",
+        "default.json",
+        "limited.json",
+    ]
+
+
+def test_http_date_retry_after_pauses_bucket():
+    limiter = RateLimiter.for_readwise()
+    bucket = limiter.bucket("GET", "/review/")
+    limiter.update("GET", "/review/", 429, {"Retry-After": "not a date"})
+    assert bucket.reserve() == pytest.approx(60, abs=1)
+
+    limiter = RateLimiter.for_readwise()
+    bucket = limiter.bucket("GET", "/review/")
+    retry_after = formatdate(time.time() + 30, usegmt=True)
+    limiter.update("GET", "/review/", 429, {"Retry-After": retry_after})
+    assert bucket.reserve() == pytest.approx(30, abs=2)
+
+
+def test_readwise_limiter_buckets():
+    limiter = RateLimiter.for_readwise()
+    assert limiter.bucket("GET", "/export/").capacity == 20
+    assert limiter.bucket("GET", "/highlights/").capacity == 20
+    assert limiter.bucket("POST", "/highlights/").capacity == 240
+    assert limiter.bucket("GET", "/review/").capacity == 240
+    assert limiter.bucket("GET", "/review/", "limited").capacity == 20
+
+
+def test_reader_limiter_buckets():
+    limiter = RateLimiter.for_reader()
+    assert limiter.bucket("GET", "/list/").capacity == 20
+    assert limiter.bucket("POST", "/save/").capacity == 50
+    assert limiter.bucket("GET", "/list/", "limited").capacity == 20
+
+
+@patch.object(Session, "request")
+def test_retry_after_pauses_bucket(mock_request):
+    limited = MagicMock(status_code=429, headers={"Retry-After": "3"})
+    ok = MagicMock(status_code=200, headers={})
+    mock_request.side_effect = [limited, ok]
+    client = Readwise("test_token")
+    with patch("readwise.api.sleep") as mock_sleep:
+        assert client.get_with_limit_20("/books/") is ok
+    assert mock_sleep.call_args[0][0] >= 2.9
@@ -0,0 +1,122 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from requests import Session
+
+from readwise.api import Readwise, ReadwiseRateLimitException
+from readwise.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def response(status_code, headers=None):
+    return Mock(status_code=status_code, headers=headers or {})
+
+
+def test_retry_policy_decisions():
+    policy = RetryPolicy(max_attempts=3, backoff=2, jitter=False)
+    started = 0.0
+
+    with patch("readwise.retry.time.monotonic", return_value=0.0):
+        assert policy.next_delay("GET", 1, started, response(503)) == 2
+        assert policy.next_delay("GET", 2, started, response(503)) == 4
+        assert policy.next_delay("GET", 3, started, response(503)) is None
+        assert policy.next_delay("GET", 1, started, response(404)) is None
+        assert (
+            policy.next_delay("GET", 1, started, response(429, {"Retry-After": "7"}))
+            == 7
+        )
+
+        # POST is only retried when the server cannot have acted on it.
+        assert policy.next_delay("POST", 1, started, response(503)) is None
+        assert (
+            policy.next_delay("POST", 1, started, response(503), idempotent=True) == 2
+        )
+        assert policy.next_delay("POST", 1, started, response(429)) == 2
+        assert (
+            policy.next_delay("POST", 1, started, error=requests.ConnectTimeout()) == 2
+        )
+        assert (
+            policy.next_delay("POST", 1, started, error=requests.ReadTimeout()) is None
+        )
+        assert policy.next_delay("GET", 1, started, error=ValueError()) is None
+
+    deadline = RetryPolicy(backoff=10, jitter=False, deadline=5)
+    with patch("readwise.retry.time.monotonic", return_value=0.0):
+        assert deadline.next_delay("GET", 1, started, response(503)) is None
+
+
+def test_jitter_stays_below_the_bound():
+    policy = RetryPolicy(backoff=1, max_backoff=4)
+    delays = [policy.backoff_delay(attempt) for attempt in range(1, 10)]
+    assert all(0 <= delay <= 4 for delay in delays)
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # A trial request is let through once the timeout has passed.
+    breaker.reset_timeout = 0
+    assert breaker.state == "half-open"
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_request_retries(mock_request, mock_sleep):
+    ok = response(200)
+    mock_request.side_effect = [response(503), requests.ConnectionError(), ok]
+    client = Readwise("test_token", rate_limiter=False)
+    assert client.get("/books/") is ok
+    assert mock_sleep.call_count == 2
+
+    mock_request.side_effect = [response(429, {"Retry-After": "1"})] * 2
+    client = Readwise("test_token", rate_limiter=False, retry=RetryPolicy(2))
+    with pytest.raises(ReadwiseRateLimitException) as error:
+        client.get("/books/")
+    assert error.value.response.status_code == 429
+
+
+@patch.object(Session, "request")
+def test_rate_limit_error_is_isolated(mock_request):
+    limited = response(429)
+    created = response(200)
+    created.json.return_value = [{"modified_highlights": [1]}]
+    mock_request.side_effect = [created, limited]
+    client = Readwise("test_token", rate_limiter=False, retry=RetryPolicy.never())
+
+    result = client.create_highlights([{"text": "one"}, {"text": "two"}], batch_size=1)
+
+    assert result.created_ids == [1]
+    assert result.failed[0].status_code == 429
+
+    mock_request.side_effect = [limited]
+    [(book_id, error)] = client.get_highlights_for_books([1])
+    assert isinstance(error, ReadwiseRateLimitException)
+
+
+@patch("readwise.api.sleep")
+@patch.object(Session, "request")
+def test_circuit_breaker_fails_fast(mock_request, mock_sleep):
+    mock_request.side_effect = requests.ConnectionError()
+    client = Readwise(
+        "test_token",
+        rate_limiter=False,
+        retry=RetryPolicy.never(),
+        circuit_breaker=CircuitBreaker(failure_threshold=2),
+    )
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            client.get("/books/")
+    with pytest.raises(CircuitOpenError):
+        client.get("/books/")
+    assert mock_request.call_count == 2
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+
+import pytest
+from click.testing import CliRunner
+
+from readwise.builders import CompactModelBuilder, ModelBuilder
+from readwise.cli import cli
+from readwise.store import LocalStore
+
+
+@pytest.fixture
+def fill(export_highlight, export_book):
+    """Return a function filling a store with two books and three highlights."""
+
+    def fill(store):
+        store.upsert_book(export_book(1, "books"))
+        store.upsert_book(export_book(2, "articles"))
+        store.upsert_highlight(export_highlight(1, 1, ["philosophy", "favorite"]))
+        store.upsert_highlight(
+            export_highlight(2, 1, ["favorite"], updated_at="2020-02-01T00:00:00+00:00")
+        )
+        store.upsert_highlight(export_highlight(3, 2))
+        store.commit()
+
+    return fill
+
+
+def test_store_queries(fill, export_highlight):
+    store = LocalStore()
+    fill(store)
+
+    assert [book.user_book_id for book in store.books("articles")] == [2]
+    assert store.count_highlights() == {1: 2, 2: 1}
+    assert store.tag_counts() == {"favorite": 2, "philosophy": 1}
+    assert [h.id for h in store.highlights(book_ids=[1])] == [1, 2]
+    assert [h.id for h in store.highlights(tag="philosophy")] == [1]
+    updated_after = datetime.fromisoformat("2020-01-15T00:00:00+00:00")
+    assert [h.id for h in store.highlights(updated_after=updated_after)] == [2]
+
+    store.upsert_highlight(export_highlight(1, 1))
+    store.delete_highlight(2)
+    assert store.tag_counts() == {}
+
+
+def test_updated_after_compares_in_utc(export_highlight):
+    store = LocalStore()
+    store.upsert_highlight(export_highlight(1, updated_at="2020-01-01T12:00:00+02:00"))
+    store.upsert_highlight(export_highlight(2, updated_at="2020-01-01T11:00:00Z"))
+
+    def updated_after(value):
+        after = datetime.fromisoformat(value)
+        return [h.id for h in store.highlights(updated_after=after)]
+
+    assert updated_after("2020-01-01T10:30:00+00:00") == [2]
+    assert updated_after("2020-01-01T06:30:00-04:00") == [2]
+    # Naive times are UTC, like in the API.
+    assert updated_after("2020-01-01T09:30:00") == [1, 2]
+    assert updated_after("2020-01-01T11:00:00") == []
+
+
+def test_store_compact_models(export_highlight, export_book):
+    record = export_book(highlights=[export_highlight(1)]).model_dump(mode="json")
+    record["source"] = None
+    record["highlights"][0]["color"] = None
+    store = LocalStore()
+    (book,) = CompactModelBuilder().export_results([record])
+    store.upsert_book(book)
+    store.upsert_highlight(book.highlights[0])
+
+    (expected,) = ModelBuilder().export_results([record])
+    assert list(store.books()) == [expected.model_copy(update={"highlights": []})]
+    assert list(store.highlights()) == expected.highlights
+
+
+def test_cli_offline(tmp_path, fill):
+    path = tmp_path / "readwise.sqlite3"
+    with LocalStore(path) as store:
+        fill(store)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["tags", "list", "--offline", "--db", str(path), "-t", "token"]
+    )
+    assert result.exit_code == 0
+    assert result.output == "favorite: 2\nphilosophy: 1\n"
+
+    result = runner.invoke(
+        cli, ["books", "list", "books", "--offline", "--db", str(path), "-t", "token"]
+    )
+    assert result.exit_code == 0
+    book = json.loads(result.output)
+    assert (book["id"], book["num_highlights"]) == (1, 2)
+
+
+def test_search(fill, export_highlight):
+    store = LocalStore()
+    fill(store)
+    store.upsert_highlight(
+        export_highlight(4, 2, ["favorite"]).model_copy(
+            update={"text": "The obstacle is the way", "note": "stoic idea"}
+        )
+    )
+    store.upsert_highlight(
+        export_highlight(5, 1).model_copy(update={"text": "Stoic calm"})
+    )
+
+    results = store.search("stoic")
+    assert {result.highlight.id for result in results} == {4, 5}
+    assert [r.highlight.id for r in store.search("stoic", tags=["favorite"])] == [4]
+    assert [r.highlight.id for r in store.search("stoic", book_ids=[1])] == [5]
+    assert store.search("obstacle")[0].snippet == "The [obstacle] is the way"
+    assert store.search("obstacle")[0].book_title == "Book 2"
+
+    store.delete_highlight(4)
+    assert store.search("obstacle") == []
+
+
+def test_search_punctuation(fill, export_highlight):
+    store = LocalStore()
+    fill(store)
+    store.upsert_highlight(
+        export_highlight(4, 2).model_copy(
+            update={"text": "Don't learn c++ in a day", "note": 'the "best" way'}
+        )
+    )
+
+    assert [r.highlight.id for r in store.search("don't")] == [4]
+    assert [r.highlight.id for r in store.search('"don\'t"')] == [4]
+    assert [r.highlight.id for r in store.search("c++")] == [4]
+    assert [r.highlight.id for r in store.search("lea* c++")] == [4]
+    assert store.search("c++ rust") == []
+    assert [r.highlight.id for r in store.search("c OR rust", raw=True)] == [4]
+
+
+def test_search_cli(tmp_path, fill):
+    path = tmp_path / "readwise.sqlite3"
+    with LocalStore(path) as store:
+        fill(store)
+
+    result = CliRunner().invoke(
+        cli, ["highlights", "search", "Highlight 3", "--db", str(path), "-t", "token"]
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["id"] == 3
+
+    for query in ["don't", "c++"]:
+        result = CliRunner().invoke(
+            cli, ["highlights", "search", query, "--db", str(path), "-t", "token"]
+        )
+        assert result.exit_code == 0
+        assert result.output == ""
+
+    result = CliRunner().invoke(
+        cli, ["highlights", "search", "c++", "--raw", "--db", str(path), "-t", "token"]
+    )
+    assert result.exit_code == 2
+    assert "Invalid search query" in result.output
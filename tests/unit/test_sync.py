@@ -0,0 +1,114 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+from readwise.models import ReadwiseReaderDocument
+from readwise.store import LocalStore
+from readwise.sync import SyncEngine
+
+
+def document(id, updated_at):
+    return ReadwiseReaderDocument(
+        id=id,
+        url="https://example.com",
+        source_url="https://example.com",
+        title="Test",
+        author="Test Author",
+        source="Test Source",
+        category="article",
+        location="new",
+        tags={},
+        site_name="example.com",
+        word_count=10,
+        created_at=datetime.fromisoformat(updated_at),
+        updated_at=datetime.fromisoformat(updated_at),
+        notes="",
+        published_date="2020-01-01",
+        summary="",
+        image_url="",
+        reading_progress=0.0,
+    )
+
+
+def test_sync_highlights_merges_deltas(export_highlight, export_book):
+    store = LocalStore()
+    client = Mock()
+    engine = SyncEngine(store, readwise=client)
+
+    client.export_highlights.return_value = [
+        export_book(
+            highlights=[
+                export_highlight(1, updated_at="2020-01-01T00:00:00+00:00"),
+                export_highlight(2, updated_at="2020-01-02T00:00:00+00:00"),
+            ]
+        )
+    ]
+    result = engine.sync_highlights()
+    client.export_highlights.assert_called_with(
+        updated_after=None, deadline=None, page_cursor=None
+    )
+    assert result.upserted == 2
+    assert result.watermark == "2020-01-02T00:00:00+00:00"
+
+    client.export_highlights.return_value = [
+        export_book(
+            highlights=[
+                export_highlight(
+                    1, updated_at="2020-01-03T00:00:00+00:00", is_deleted=True
+                ),
+                export_highlight(3, updated_at="2020-01-04T00:00:00+00:00"),
+            ]
+        )
+    ]
+    result = engine.sync_highlights()
+    client.export_highlights.assert_called_with(
+        updated_after="2020-01-02T00:00:00+00:00", deadline=None, page_cursor=None
+    )
+    assert (result.upserted, result.deleted) == (1, 1)
+    assert store.get_watermark("highlights") == "2020-01-04T00:00:00+00:00"
+    ids = store._connection.execute("SELECT id FROM highlights ORDER BY id")
+    assert [row[0] for row in ids] == [2, 3]
+
+
+def test_sync_documents_uses_watermark():
+    store = LocalStore()
+    reader = Mock()
+    engine = SyncEngine(store, reader=reader)
+
+    reader.get_documents.return_value = [document("a", "2020-01-01T00:00:00+00:00")]
+    engine.sync_documents()
+    reader.get_documents.return_value = [document("a", "2020-01-05T00:00:00+00:00")]
+    result = engine.sync_documents()
+
+    reader.get_documents.assert_called_with(
+        params={"updatedAfter": "2020-01-01T00:00:00+00:00"},
+        deadline=None,
+        page_cursor=None,
+    )
+    assert result.watermark == "2020-01-05T00:00:00+00:00"
+    count = store._connection.execute("SELECT COUNT(*) FROM documents").fetchone()
+    assert count[0] == 1
+
+
+def test_sync_stopped_at_deadline_resumes():
+    store = LocalStore()
+    reader = Mock()
+    engine = SyncEngine(store, reader=reader)
+
+    def stopped(**kwargs):
+        yield document("a", "2020-01-01T00:00:00+00:00")
+        return "cursor_2"
+
+    reader.get_documents.side_effect = stopped
+    result = engine.sync_documents(deadline=60)
+    assert result.cursor == "cursor_2"
+    assert store.get_watermark("documents") is None
+
+    reader.get_documents.side_effect = None
+    reader.get_documents.return_value = [document("b", "2020-01-02T00:00:00+00:00")]
+    result = engine.sync_documents()
+    reader.get_documents.assert_called_with(
+        params={}, deadline=None, page_cursor="cursor_2"
+    )
+    assert result.cursor is None
+    assert result.watermark == "2020-01-02T00:00:00+00:00"
+    assert engine._resume_cursor("documents", None) is None
@@ -0,0 +1,163 @@
+import csv
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+from requests import Session
+
+from readwise.builders import CompactModelBuilder
+from readwise.cli import cli
+from readwise.writers import (
+    HIGHLIGHT_COLUMNS,
+    flatten_document,
+    flatten_export,
+    open_writer,
+)
+
+BOOK = {
+    "user_book_id": 1,
+    "title": "Test Book",
+    "author": "Test Author",
+    "readable_title": "Test Book",
+    "source": "kindle",
+    "cover_image_url": None,
+    "unique_url": None,
+    "category": "books",
+    "document_note": None,
+    "summary": None,
+    "readwise_url": "https://readwise.io/bookreview/1",
+    "source_url": None,
+    "asin": None,
+    "book_tags": [{"id": 1, "name": "reading"}],
+    "highlights": [
+        {
+            "id": index,
+            "text": f"Highlight {index}, with a comma",
+            "location": index,
+            "location_type": "location",
+            "note": "",
+            "color": "yellow",
+            "highlighted_at": "2024-01-01T12:00:00+00:00",
+            "created_at": None,
+            "updated_at": "2024-01-02T12:00:00+00:00",
+            "external_id": None,
+            "end_location": None,
+            "url": None,
+            "book_id": 1,
+            "tags": [{"id": 2, "name": "a"}, {"id": 3, "name": "b"}],
+            "is_favorite": False,
+            "is_discard": False,
+            "readwise_url": f"https://readwise.io/open/{index}",
+        }
+        for index in range(3)
+    ],
+}
+
+
+def test_flatten_export_raw_and_models():
+    rows = list(flatten_export(BOOK))
+    assert [row["id"] for row in rows] == [0, 1, 2]
+    assert rows[0]["book_title"] == "Test Book"
+    assert rows[0]["book_tags"] == ["reading"]
+    assert rows[0]["tags"] == ["a", "b"]
+    assert list(rows[0]) == [name for name, _ in HIGHLIGHT_COLUMNS]
+
+    (book,) = CompactModelBuilder().export_results([BOOK])
+    model_rows = list(flatten_export(book))
+    assert model_rows[0]["tags"] == ["a", "b"]
+    assert model_rows[0]["highlighted_at"].isoformat() == "2024-01-01T12:00:00+00:00"
+
+
+def test_flatten_document():
+    row = flatten_document({"id": "a", "title": "Doc", "tags": {"x": {}, "y": {}}})
+    assert row["tags"] == ["x", "y"]
+    assert row["url"] is None
+
+
+def test_text_writers(tmp_path):
+    rows = list(flatten_export(BOOK))
+    with open_writer("ndjson", tmp_path / "out.ndjson", HIGHLIGHT_COLUMNS) as writer:
+        assert writer.write_all(rows) == 3
+    with open_writer("csv", tmp_path / "out.csv", HIGHLIGHT_COLUMNS) as writer:
+        writer.write_all(rows)
+
+    lines = (tmp_path / "out.ndjson").read_text().splitlines()
+    assert json.loads(lines[1])["tags"] == ["a", "b"]
+    with open(tmp_path / "out.csv", newline="") as file:
+        records = list(csv.DictReader(file))
+    assert records[2]["text"] == "Highlight 2, with a comma"
+    assert records[2]["tags"] == "a,b"
+
+
+def test_open_writer_errors():
+    with pytest.raises(ValueError):
+        open_writer("parquet", "-", HIGHLIGHT_COLUMNS)
+    with pytest.raises(ValueError):
+        open_writer("xml", "out.xml", HIGHLIGHT_COLUMNS)
+
+
+def test_parquet_writer(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    with open_writer("parquet", path, HIGHLIGHT_COLUMNS, batch_size=2) as writer:
+        writer.write_all(flatten_export(BOOK))
+
+    table = pq.read_table(path)
+    assert table.num_rows == 3
+    assert table.column("tags").to_pylist()[0] == ["a", "b"]
+
+
+@patch.object(Session, "request")
+def test_export_to_csv(mock_request, tmp_path):
+    mock_request.return_value = Mock(status_code=200, headers={})
+    mock_request.return_value.json.return_value = {
+        "results": [BOOK],
+        "nextPageCursor": None,
+    }
+    path = tmp_path / "out.csv"
+    result = CliRunner().invoke(
+        cli,
+        ["highlights", "export", "-t", "token", "-f", "csv", "-o", str(path)],
+    )
+    assert result.exit_code == 0, result.output
+    with open(path, newline="") as file:
+        records = list(csv.DictReader(file))
+    assert [record["id"] for record in records] == ["0", "1", "2"]
+    assert records[0]["book_id"] == "1"
+
+
+@patch.object(Session, "request")
+def test_books_list_formats(mock_request):
+    book = {
+        "id": 1,
+        "title": "Test Book",
+        "author": "Test Author",
+        "category": "books",
+        "tags": [{"id": 1, "name": "a"}],
+    }
+    mock_request.return_value = Mock(status_code=200, headers={})
+    mock_request.return_value.json.return_value = {
+        "next": None,
+        "results": [book, dict(book, id=2, title="Another Book")],
+    }
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ["books", "list", "-t", "token", "-f", "ndjson", "--fields", "id,tags"],
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines() == [
+        '{"id":1,"tags":["a"]}',
+        '{"id":2,"tags":["a"]}',
+    ]
+
+    result = runner.invoke(cli, ["books", "list", "-t", "token", "-f", "table"])
+    lines = result.output.splitlines()
+    assert lines[0].split()[:3] == ["id", "title", "author"]
+    assert lines[2].startswith("1   Test Book")
+
+    result = runner.invoke(cli, ["books", "list", "-t", "token", "--fields", "nope"])
+    assert result.exit_code == 2
+    assert "Unknown fields nope" in result.output